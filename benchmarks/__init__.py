@@ -0,0 +1 @@
+"""Stage benchmarks with deterministic local backends (see benchmarks/run.py)"""
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Stage benchmarks with regression baselines
+
+Runs every pipeline stage against deterministic local stand-ins (stub LLM
+script/plan, tone-generator TTS voice, seeded gradient images, prompt-based
+captions) at several script lengths, writes the timings as JSON and compares
+them with a stored baseline.
+
+    python -m benchmarks.run                         # 2/30/120 minute scales
+    python -m benchmarks.run --scales 2 --stages text_chunking,tts_stub
+    python -m benchmarks.run --update-baseline       # accept current numbers
+
+Exits with status 1 when a stage is slower than its baseline by more than
+--threshold (relative) and --min-delta (absolute seconds).
+"""
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.utils.config import Config  # noqa: E402
+
+from .stages import HEAVY_STAGES, STAGES, Scale, cleanup  # noqa: E402
+
+
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+DEFAULT_RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def _load_config(config_path: str, workdir: Path, minutes: float):
+    config = Config.load(config_path)
+    for name in ("output", "temp", "data", "cache", "logs"):
+        setattr(config.paths, name, str(workdir / name))
+    # Chunk size and a few planner knobs follow the target video length
+    config.content.video_length_minutes = int(minutes)
+    return config
+
+
+def run_benchmarks(scales: List[float], stages: List[str], repeat: int, render_segments: int,
+                   config_path: str) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for minutes in scales:
+        workdir = Path(tempfile.mkdtemp(prefix=f"bench_{minutes:g}m_"))
+        try:
+            scale = Scale(_load_config(config_path, workdir, minutes), minutes, workdir, render_segments)
+            for name in stages:
+                key = f"{name}@{minutes:g}m"
+                try:
+                    seconds, metrics = STAGES[name](scale, 1 if name in HEAVY_STAGES else repeat)
+                except Exception as e:
+                    results[key] = {"error": f"{type(e).__name__}: {e}"}
+                    print(f"  {key:<28} ERROR {e}")
+                    continue
+                if seconds is None:
+                    results[key] = metrics
+                    print(f"  {key:<28} skipped ({metrics.get('skipped')})")
+                    continue
+                items = metrics.get("items") or 0
+                entry = {"seconds": round(seconds, 6), **metrics}
+                if items:
+                    entry["per_item_ms"] = round(seconds * 1000.0 / items, 4)
+                results[key] = entry
+                print(f"  {key:<28} {seconds:10.4f}s  {items:7d} items")
+        finally:
+            cleanup(workdir)
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            min_delta: float) -> List[str]:
+    """Human-readable regressions (empty when everything is within bounds)"""
+    regressions = []
+    for key, entry in results.items():
+        base = baseline.get(key)
+        if not base or "seconds" not in entry or "seconds" not in base:
+            continue
+        if base.get("items") != entry.get("items"):
+            continue  # different workload (e.g. another --render-segments); not comparable
+        now, then = entry["seconds"], base["seconds"]
+        if now > then * (1.0 + threshold) and now - then > min_delta:
+            regressions.append(f"{key}: {then:.4f}s -> {now:.4f}s (+{(now / then - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pipeline stage benchmarks")
+    parser.add_argument("--scales", default="2,30,120", help="Script lengths in minutes, comma separated")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Subset of: {', '.join(STAGES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per in-process stage (fastest is kept)")
+    parser.add_argument("--render-segments", type=int, default=6,
+                        help="Timeline clips to encode per scale for segment_encode/final_render")
+    parser.add_argument("--config", default=str(ROOT / "configs" / "config.yaml"))
+    parser.add_argument("--out", default=None, help="Results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="Ignore slowdowns smaller than this (seconds)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results as the new baseline")
+    args = parser.parse_args()
+
+    # The pipelines log every chunk/segment; keep the benchmark output readable
+    logging.getLogger("video_ai").setLevel(logging.WARNING)
+
+    scales = [float(s) for s in args.scales.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    results = run_benchmarks(scales, stages, args.repeat, args.render_segments, args.config)
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "render_segments": args.render_segments,
+        "wall_seconds": round(time.perf_counter() - started, 2),
+        "results": results,
+    }
+
+    out = Path(args.out) if args.out else DEFAULT_RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results: {out}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline updated: {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Benchmarked pipeline stages
+
+Each stage takes a `Scale` (one script length with its lazily built inputs)
+and returns (seconds, metrics). Stages call the real repo code; only the
+model backends come from `benchmarks.stubs`.
+"""
+
+import asyncio
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.content_generation.alignment import force_align, map_beats_to_times
+from src.media_generation.image_prompt_builder import build_prompts
+from src.media_generation.media_models import AudioGenerationRequest
+from src.media_generation.qa.qa_rules import passes_similarity, check_diversity
+from src.utils.similarity import cosine_sim
+from src.video_assembly.timeline_builder import build_timeline
+
+from .stubs import StubTTSEngine, beat_texts, stub_caption, stub_image, stub_script, stub_visual_plan, write_tone_wav
+
+
+class Scale:
+    """Inputs for one script length, built once and shared by the stages"""
+
+    def __init__(self, config, minutes: float, workdir: Path, render_segments: int = 6):
+        self.config = config
+        self.minutes = minutes
+        self.workdir = workdir
+        self.render_segments = render_segments
+
+        self.script = stub_script(minutes)
+        self.plan = stub_visual_plan(self.script)
+        self.beat_texts = beat_texts(self.script, self.plan)
+        self.audio_seconds = len(self.script.split()) / 2.5
+        self.tts = StubTTSEngine(config)
+        self._prompts: Optional[List[Dict[str, Any]]] = None
+        self._segments: Optional[List[Path]] = None
+        self._render_segments_meta: List[Any] = []
+
+    @property
+    def prompts(self) -> List[Dict[str, Any]]:
+        if self._prompts is None:
+            self._prompts = _build_prompts(self)
+        return self._prompts
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """Fastest of `repeat` runs (and the last result)"""
+    best, result = float("inf"), None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _build_prompts(scale: Scale) -> List[Dict[str, Any]]:
+    alignment = force_align("", scale.script)
+    beats = map_beats_to_times(scale.plan["beats"], alignment, scale.audio_seconds)
+    style = scale.config.image_generation.get_style_for_topic("mythology")
+    return build_prompts(
+        visual_plan={"beats": beats},
+        style_template={"base_style": style.base_style, "colors": style.colors, "mood": style.mood},
+        topic="mythology",
+        adapters=getattr(scale.config, "topic_adapters", {}) or {},
+        seed_namespace=scale.config.continuity.seed_namespace,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+def text_chunking(scale: Scale, repeat: int):
+    seconds, chunks = _best_of(lambda: scale.tts._prepare_chunks(scale.script, quiet=True), repeat)
+    return seconds, {"items": len(chunks), "chars": len(scale.script)}
+
+
+def tts_stub(scale: Scale, repeat: int):
+    request = AudioGenerationRequest(script_text=scale.script)
+    seconds, segments = _best_of(lambda: asyncio.run(scale.tts.generate_audio(request)), repeat)
+    scale.audio_seconds = sum(s.duration for s in segments) or scale.audio_seconds
+    return seconds, {"items": len(segments), "audio_seconds": round(scale.audio_seconds, 1)}
+
+
+def prompt_building(scale: Scale, repeat: int):
+    seconds, prompts = _best_of(lambda: _build_prompts(scale), repeat)
+    scale._prompts = prompts
+    return seconds, {"items": len(prompts), "beats": len(scale.plan["beats"])}
+
+
+def qa_similarity(scale: Scale, repeat: int):
+    prompts = scale.prompts
+    beat_text = dict(zip((b["id"] for b in scale.plan["beats"]), scale.beat_texts))
+
+    def run():
+        passed = 0
+        for p in prompts:
+            caption = stub_caption(p["prompt"], p["seed"])
+            text = beat_text.get(p.get("beat_id"), "")
+            cosine_sim(caption, text, "stub")
+            passed += passes_similarity(caption, text, 0.3)
+        check_diversity([p.get("shot_type", "") for p in prompts])
+        return passed
+
+    seconds, passed = _best_of(run, repeat)
+    return seconds, {"items": len(prompts), "passed": passed}
+
+
+def timeline_build(scale: Scale, repeat: int):
+    out = scale.workdir / "timeline.json"
+
+    def run():
+        timeline = build_timeline(scale.prompts)
+        out.write_text(json.dumps(timeline), encoding="utf-8")
+        return timeline
+
+    seconds, timeline = _best_of(run, repeat)
+    return seconds, {"items": len(timeline)}
+
+
+def _assembler(scale: Scale):
+    from src.video_assembly.video_assembler import VideoAssembler
+
+    assembler = VideoAssembler(scale.config)
+    if not assembler.ffmpeg_available:
+        return None
+    assembler._nvenc_available = False  # measure the portable libx264 path
+    return assembler
+
+
+def _render_request(scale: Scale, segments, audio_path: Path):
+    from src.video_assembly.video_models import AudioTrack, VideoAssemblyRequest, VideoMetadata
+
+    return VideoAssemblyRequest(
+        segments=segments,
+        audio_tracks=[AudioTrack(file_path=audio_path)],
+        metadata=VideoMetadata(
+            title=f"benchmark {scale.minutes}m",
+            output_path=scale.workdir / "render.mp4",
+            total_duration=sum(s.duration for s in segments),
+        ),
+    )
+
+
+def segment_encode(scale: Scale, repeat: int):
+    """First `render_segments` timeline clips (encode cost is per clip, so this extrapolates)"""
+    from src.video_assembly.video_models import VideoSegment
+
+    assembler = _assembler(scale)
+    if assembler is None:
+        return None, {"skipped": "ffmpeg not available"}
+    clips = build_timeline(scale.prompts)[: scale.render_segments]
+    segments = []
+    for i, clip in enumerate(clips):
+        image = stub_image(scale.workdir / "images" / f"img_{i:04d}.png", seed=i)
+        duration = max(1.0, float(clip["end_s"]) - float(clip["start_s"]))
+        segments.append(VideoSegment(image_path=image, start_time=float(clip["start_s"]), duration=duration))
+    request = _render_request(scale, segments, scale.workdir / "render_audio.wav")
+
+    async def run():
+        return [await assembler._process_single_segment(seg, request, i) for i, seg in enumerate(segments)]
+
+    seconds, paths = _best_of(lambda: asyncio.run(run()), repeat)
+    scale._segments = paths
+    scale._render_segments_meta = segments
+    video_seconds = sum(s.duration for s in segments)
+    return seconds, {"items": len(paths), "video_seconds": round(video_seconds, 1),
+                     "realtime_factor": round(video_seconds / seconds, 2) if seconds else None}
+
+
+def final_render(scale: Scale, repeat: int):
+    """Concat + audio mux of the encoded segments with libx264/aac"""
+    from src.video_assembly.video_models import RenderProgress
+
+    if not scale._segments:
+        segment_encode(scale, 1)
+    if not scale._segments:
+        return None, {"skipped": "no encoded segments"}
+    assembler = _assembler(scale)
+    segments = scale._render_segments_meta
+    audio = scale.workdir / "render_audio.wav"
+    write_tone_wav(audio, sum(s.duration for s in segments), sample_rate=22050)
+    request = _render_request(scale, segments, audio)
+
+    seconds, out = _best_of(
+        lambda: asyncio.run(assembler._render_final_video(request, scale._segments, RenderProgress())), repeat
+    )
+    return seconds, {"items": len(scale._segments), "output_mb": round(Path(out).stat().st_size / 1e6, 2)}
+
+
+STAGES: Dict[str, Callable] = {
+    "text_chunking": text_chunking,
+    "tts_stub": tts_stub,
+    "prompt_building": prompt_building,
+    "qa_similarity": qa_similarity,
+    "timeline_build": timeline_build,
+    "segment_encode": segment_encode,
+    "final_render": final_render,
+}
+
+# Stages that shell out to ffmpeg run once per scale, not `repeat` times
+HEAVY_STAGES = {"tts_stub", "segment_encode", "final_render"}
+
+
+def cleanup(workdir: Path) -> None:
+    shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,142 @@
+"""Deterministic local stand-ins for the LLM, TTS voice, captioner and image model
+
+Everything here is seeded, so two runs over the same scale produce the same
+script, plan, audio lengths and images and the timings are comparable.
+"""
+
+import random
+import struct
+import wave
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.media_generation.tts_engine import TTSEngine
+
+
+WORDS_PER_MINUTE = 150
+
+_VOCAB = (
+    "ancient temple gods thunder olympus titan empire river stars orbit legend hero "
+    "kingdom desert ocean mountain storm oracle prophecy battle harvest festival city "
+    "scholar library bronze iron marble sky night dawn sun moon comet galaxy planet "
+    "ritual sacrifice journey voyage exile return victory defeat memory silence"
+).split()
+_NAMES = ["Zeus", "Hera", "Athena", "Apollo", "Alexander", "Cleopatra", "Kepler", "Galileo"]
+_CUES = ["[MUSIC SWELLS]", "(pause)", "[SFX: wind]"]
+
+
+# ---------------------------------------------------------------------------
+# LLM stand-ins
+# ---------------------------------------------------------------------------
+def stub_script(minutes: float, seed: int = 7) -> str:
+    """Narration of ~`minutes` at 150 wpm, with the cues/labels real scripts contain"""
+    rng = random.Random(f"script:{seed}:{minutes}")
+    target_words = int(minutes * WORDS_PER_MINUTE)
+    paragraphs, words = [], 0
+    while words < target_words:
+        sentences = []
+        for _ in range(rng.randint(3, 7)):
+            n = rng.randint(8, 22)
+            tokens = [rng.choice(_VOCAB) for _ in range(n)]
+            tokens[rng.randrange(n)] = rng.choice(_NAMES) + rng.choice(["", "'s"])
+            sentences.append(" ".join(tokens).capitalize() + rng.choice([".", ".", ".", "?", "!"]))
+            words += n
+        text = " ".join(sentences)
+        if rng.random() < 0.15:
+            text = f"{rng.choice(_CUES)} {text}"
+        if rng.random() < 0.1:
+            text = f"NARRATOR: {text}"
+        paragraphs.append(text)
+    return "\n\n".join(paragraphs)
+
+
+def stub_visual_plan(script_text: str, seconds_per_beat: float = 10.0, prompts_per_beat: int = 2) -> Dict[str, Any]:
+    """Planner output: one beat per ~10s of narration, each with image prompts"""
+    words = script_text.split()
+    per_beat = max(1, int(seconds_per_beat * WORDS_PER_MINUTE / 60))
+    shots = ["establishing", "medium_detail", "insert", "diagram", "map"]
+    beats = []
+    for i, start in enumerate(range(0, len(words), per_beat)):
+        end = min(len(words), start + per_beat)
+        snippet = " ".join(words[start:end])
+        beat_id = f"beat_{i + 1:04d}"
+        beats.append({
+            "id": beat_id,
+            "narration_span": {"start_token": start, "end_token": end},
+            "shot_type": shots[i % len(shots)],
+            "seed_group": beat_id,
+            "prompts": [
+                {"prompt": f"{snippet[:160]} variant {k}", "negatives": "logos, watermarks"}
+                for k in range(prompts_per_beat)
+            ],
+        })
+    return {"beats": beats}
+
+
+def stub_caption(prompt: str, seed: int) -> str:
+    """Captioner stand-in: a seeded subset of the prompt words plus filler"""
+    rng = random.Random(seed)
+    words = prompt.split()
+    keep = [w for w in words if rng.random() < 0.6]
+    return " ".join(keep + rng.sample(_VOCAB, 4))
+
+
+# ---------------------------------------------------------------------------
+# Audio / image stand-ins
+# ---------------------------------------------------------------------------
+def write_tone_wav(path: Path, seconds: float, sample_rate: int = 8000, freq: float = 220.0) -> None:
+    """Mono 16-bit tone; one second is built once and repeated"""
+    import math
+    one_second = b"".join(
+        struct.pack("<h", int(6000 * math.sin(2 * math.pi * freq * i / sample_rate)))
+        for i in range(sample_rate)
+    )
+    whole, frac = divmod(max(0.0, seconds), 1.0)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(one_second * int(whole) + one_second[: int(frac * sample_rate) * 2])
+
+
+def stub_image(path: Path, seed: int, size=(1920, 1080)) -> Path:
+    """Image model stand-in: a seeded two-colour gradient"""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    a = [rng.randrange(256) for _ in range(3)]
+    b = [rng.randrange(256) for _ in range(3)]
+    ramp = Image.linear_gradient("L").resize(size)
+    img = Image.merge("RGB", [ramp.point(lambda v, lo=lo, hi=hi: lo + (hi - lo) * v // 255)
+                              for lo, hi in zip(a, b)])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    img.save(path)
+    return path
+
+
+class StubTTSEngine(TTSEngine):
+    """TTSEngine with the real chunking/segment path and a tone generator as the voice"""
+
+    def __init__(self, config, sample_rate: int = 8000):
+        super().__init__(config)
+        self.stub_sample_rate = sample_rate
+        self.test_mode = False
+        self.prefer_sapi = False
+
+    async def initialize(self):
+        self.is_loaded = True
+
+    def _is_coqui_available(self) -> bool:
+        return False
+
+    async def _generate_with_fallback(self, text: str, output_file: Path, request) -> float:
+        duration = self._estimate_speech_duration(text)
+        write_tone_wav(output_file, duration, self.stub_sample_rate)
+        return duration
+
+
+def beat_texts(script_text: str, plan: Dict[str, Any]) -> List[str]:
+    words = script_text.split()
+    return [" ".join(words[b["narration_span"]["start_token"]:b["narration_span"]["end_token"]])
+            for b in plan["beats"]]
@@ -11,29 +11,26 @@ import os
 from pathlib import Path
 from typing import Optional
 
-import torch
-import yaml
-from rich.console import Console
-from rich.logging import RichHandler
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
-from dotenv import load_dotenv
+from src.utils.startup_profile import profile as startup_profile
 
-# Load local env for API keys
-try:
-    load_dotenv(dotenv_path=Path(__file__).parent / ".env.local")
-except Exception:
-    pass
+# Heavy stacks (torch, cv2, ffmpeg, librosa, diffusers) are imported by the
+# pipelines, which are only built on first use below
+with startup_profile.phase("cli imports"):
+    from rich.console import Console
+    from dotenv import load_dotenv
 
-# Add src to Python path
-sys.path.append(str(Path(__file__).parent / "src"))
+    # Load local env for API keys
+    try:
+        load_dotenv(dotenv_path=Path(__file__).parent / ".env.local")
+    except Exception:
+        pass
+
+    # Add src to Python path
+    sys.path.append(str(Path(__file__).parent / "src"))
 
-from src.utils.config import Config
-from src.utils.logger import setup_logging
-from src.content_generation.content_pipeline import ContentPipeline
-from src.media_generation.media_pipeline import MediaPipeline
-# TODO: Add these when video assembly and automation are implemented
-from src.video_assembly.video_assembler import VideoAssembler  
-from src.automation.scheduler import VideoScheduler
+    from src.utils.config import Config
+    from src.utils.logger import setup_logging
+    from src.utils import tracing
 
 # Ensure UTF-8 console output on Windows to avoid emoji/encoding errors
 try:
@@ -49,7 +46,9 @@ class VideoAISystem:
     """Main system coordinator for automated video generation"""
     
     def __init__(self, config_path: str = "configs/config.yaml", test_mode: bool = False):
-        self.config = Config.load(config_path)
+        with startup_profile.phase("config"):
+            self.config = Config.load(config_path)
+        startup_profile.budget_ms = float(self.config.debug.get('startup_budget_ms', 1000))
         self.test_mode = test_mode
         
         # Apply test mode overrides if enabled
@@ -57,29 +56,66 @@ class VideoAISystem:
             self._apply_test_mode_config()
             console.print("[yellow]🧪[/yellow] Test mode enabled - generating 1-2 minute video")
         
-        self.logger = setup_logging(self.config)
-        
-        # Check CUDA availability for RTX 5080
-        self._check_cuda_setup()
+        with startup_profile.phase("logging"):
+            self.logger = setup_logging(self.config)
         
-        # Initialize pipeline components
-        self.content_pipeline = ContentPipeline(self.config)
-        self.media_pipeline = MediaPipeline(self.config)
-        
-        # Initialize video assembly
-        self.video_assembler = VideoAssembler(self.config)
-        
-        # Initialize automation scheduler
-        self.scheduler = VideoScheduler(self.config)
-        self.scheduler.inject_dependencies(
-            self.content_pipeline,
-            self.media_pipeline, 
-            self.video_assembler,
-            self.content_pipeline.topic_queue
-        )
+        # Pipelines, the assembler and the scheduler are built on first use,
+        # so listing topics or starting the scheduler doesn't load models
+        self._content_pipeline = None
+        self._media_pipeline = None
+        self._video_assembler = None
+        self._scheduler = None
+        self._gpu_checked = False
         
         console.print("[green]✓[/green] Video AI System initialized successfully!")
     
+    @property
+    def content_pipeline(self):
+        if self._content_pipeline is None:
+            with startup_profile.phase("content pipeline"):
+                from src.content_generation.content_pipeline import ContentPipeline
+                self._content_pipeline = ContentPipeline(self.config)
+        return self._content_pipeline
+    
+    @property
+    def media_pipeline(self):
+        if self._media_pipeline is None:
+            # Check CUDA availability for RTX 5080 before any model is touched
+            self._ensure_gpu()
+            with startup_profile.phase("media pipeline"):
+                from src.media_generation.media_pipeline import MediaPipeline
+                self._media_pipeline = MediaPipeline(self.config)
+        return self._media_pipeline
+    
+    @property
+    def video_assembler(self):
+        if self._video_assembler is None:
+            with startup_profile.phase("video assembler"):
+                from src.video_assembly.video_assembler import VideoAssembler
+                self._video_assembler = VideoAssembler(self.config)
+        return self._video_assembler
+    
+    @property
+    def scheduler(self):
+        if self._scheduler is None:
+            with startup_profile.phase("scheduler"):
+                from src.automation.scheduler import VideoScheduler
+                self._scheduler = VideoScheduler(self.config)
+            # Dependencies resolve when the first job needs them
+            self._scheduler.inject_dependency_factories(
+                content_pipeline=lambda: self.content_pipeline,
+                media_pipeline=lambda: self.media_pipeline,
+                video_assembler=lambda: self.video_assembler,
+                topic_queue=lambda: self.content_pipeline.topic_queue,
+            )
+        return self._scheduler
+    
+    def _ensure_gpu(self):
+        if not self._gpu_checked:
+            with startup_profile.phase("gpu check"):
+                self._check_cuda_setup()
+            self._gpu_checked = True
+    
     def _apply_test_mode_config(self):
         """Apply test mode configuration overrides for faster generation"""
         # Override content settings for 1-2 minute video
@@ -101,6 +137,8 @@ class VideoAISystem:
     
     def _check_cuda_setup(self):
         """Verify CUDA setup for RTX 5080 - STRICT VALIDATION, NO FALLBACKS"""
+        import torch
+        
         console.print("[blue]🔍[/blue] Validating RTX 5080 GPU setup...")
         
         # Check 1: CUDA availability
@@ -148,8 +186,13 @@ class VideoAISystem:
         
         console.print("[green]🚀[/green] RTX 5080 validation PASSED - GPU acceleration enabled")
     
-    async def generate_single_video(self, topic: Optional[str] = None, subtopic: Optional[str] = None) -> str:
-        """Generate a single video on demand for any topic"""
+    async def generate_single_video(self, topic: Optional[str] = None, subtopic: Optional[str] = None,
+                                    proxy_only: bool = False) -> str:
+        """Generate a single video on demand for any topic.
+        
+        With `proxy_only`, stops after the review proxy and writes review.json
+        next to the timeline; `approve_render(review.json)` renders the full video.
+        """
         console.print("[blue]🎬[/blue] Starting video generation process...")
         
         if self.test_mode:
@@ -169,6 +212,10 @@ class VideoAISystem:
                 console.print(f"[yellow]💡[/yellow] Available topics: {', '.join(available_topics)}")
                 topic = None
         
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+        
+        # Span trace of the whole run -> <artifacts>/<run_id>/trace.json (debug.trace)
+        trace = tracing.begin("single_video", self.config)
         try:
             with Progress(
                 SpinnerColumn(),
@@ -190,7 +237,16 @@ class VideoAISystem:
                         progress.update(content_task, completed=percent, description=f"[cyan]📝 {message}")
                         content_progress_callback.last_percent = percent
                 
-                content_data = await self.content_pipeline.generate_content(topic, subtopic, content_progress_callback)
+                # Narration TTS can start on finished paragraphs while later beats are written
+                narration_stream = self.media_pipeline.start_narration_stream(topic)
+                try:
+                    content_data = await self.content_pipeline.generate_content(
+                        topic, subtopic, content_progress_callback, narration_sink=narration_stream
+                    )
+                except Exception:
+                    if narration_stream is not None:
+                        await narration_stream.cancel()
+                    raise
                 progress.update(content_task, completed=100, description="[cyan]📝 Content generation complete")
                 
                 # Step 2: Audio Generation
@@ -202,7 +258,9 @@ class VideoAISystem:
                         progress.update(audio_task, completed=percent, description=f"[yellow]🎵 {message}")
                         audio_progress_callback.last_percent = percent
                 
-                audio_path = await self.media_pipeline.generate_audio(content_data.video_script, topic, audio_progress_callback)
+                audio_path = await self.media_pipeline.generate_audio(
+                    content_data.video_script, topic, audio_progress_callback, narration_stream=narration_stream
+                )
                 progress.update(audio_task, completed=100, description="[yellow]🎵 Audio generation complete")
                 
                 # Step 3: Image Generation (use enhanced prompts path to enable QA logs)
@@ -226,6 +284,23 @@ class VideoAISystem:
                     )
                 progress.update(image_task, completed=100, description="[green]🖼️ Image generation complete")
                 
+                timeline_path = self.media_pipeline.artifacts_dir / "timeline.json"
+                timeline_arg = str(timeline_path) if timeline_path.exists() else None
+                
+                if proxy_only:
+                    proxy_task = progress.add_task("[magenta]👀 Rendering review proxy...", total=100)
+                    proxy_result = await self.video_assembler.render_proxy(
+                        content_data.video_script, audio_path, image_paths, topic, timeline_path=timeline_arg
+                    )
+                    progress.update(proxy_task, completed=100)
+                    if not proxy_result.success:
+                        raise Exception(f"Proxy render failed: {'; '.join(proxy_result.errors)}")
+                    review_path = self._write_review(content_data.video_script, audio_path, image_paths, topic,
+                                                     timeline_arg, proxy_result.proxy_path)
+                    console.print(f"\n[green]👀[/green] Review proxy: {proxy_result.proxy_path}")
+                    console.print(f"[green]📝[/green] Approve with: python main.py --approve {review_path}")
+                    return str(review_path)
+                
                 # Step 4: Video Assembly
                 video_task = progress.add_task("[magenta]🎞️ Assembling final video...", total=100)
                 
@@ -236,8 +311,6 @@ class VideoAISystem:
                                       description=f"[magenta]🎞️ {assembly_progress.current_step}")
                         assembly_progress_callback.last_percent = assembly_progress.progress_percent
                 
-                timeline_path = self.media_pipeline.artifacts_dir / "timeline.json"
-                timeline_arg = str(timeline_path) if timeline_path.exists() else None
                 assembly_result = await self.video_assembler.assemble_video(
                     content_data.video_script,
                     audio_path,
@@ -256,6 +329,8 @@ class VideoAISystem:
                 console.print(f"[green]💾[/green] File size: {assembly_result.file_size_mb:.1f}MB")
                 console.print(f"[green]⏱️[/green] Render time: {assembly_result.render_time_seconds:.1f}s")
                 console.print(f"[green]✅[/green] Video saved: {assembly_result.output_path}")
+                if assembly_result.proxy_path:
+                    console.print(f"[green]👀[/green] Review proxy: {assembly_result.proxy_path}")
                 
                 if self.test_mode:
                     actual_min = max(1, int(round(assembly_result.total_duration / 60)))
@@ -269,6 +344,59 @@ class VideoAISystem:
             self.logger.error(f"Video generation failed: {e}")
             console.print(f"[red]❌[/red] Error: {e}")
             raise
+        finally:
+            trace_path = tracing.end(trace)
+            if trace_path:
+                console.print(f"[blue]📈[/blue] Trace: {trace_path} (open in ui.perfetto.dev)")
+    
+    def _write_review(self, video_script, audio_path, image_paths, topic: Optional[str],
+                      timeline_path: Optional[str], proxy_path) -> Path:
+        """Everything approve_render needs to render the full video from the reviewed timeline"""
+        import json
+        review = {
+            "topic": topic,
+            "audio_path": str(audio_path),
+            "image_paths": [str(p) for p in image_paths],
+            "timeline_path": timeline_path,
+            "proxy_path": str(proxy_path),
+            "video_script": video_script.model_dump(mode="json"),
+        }
+        review_path = Path(timeline_path).parent / "review.json" if timeline_path else \
+            Path(self.media_pipeline.artifacts_dir) / "review.json"
+        review_path.parent.mkdir(parents=True, exist_ok=True)
+        review_path.write_text(json.dumps(review, indent=2), encoding='utf-8')
+        return review_path
+    
+    async def approve_render(self, review_path: str) -> str:
+        """Render the full-quality video for a proxy written by `--proxy-only`"""
+        import json
+        from src.content_generation.content_models import VideoScript
+        
+        review = json.loads(Path(review_path).read_text(encoding='utf-8'))
+        video_script = VideoScript.model_validate(review["video_script"])
+        console.print(f"[blue]🎬[/blue] Rendering approved video from {review.get('timeline_path') or 'script timing'}...")
+        
+        trace = tracing.begin("approve_render", self.config)
+        try:
+            result = await self.video_assembler.assemble_video(
+                video_script,
+                Path(review["audio_path"]),
+                [Path(p) for p in review["image_paths"]],
+                review.get("topic"),
+                timeline_path=review.get("timeline_path"),
+                proxy=False
+            )
+            if not result.success:
+                raise Exception(f"Video assembly failed: {'; '.join(result.errors)}")
+            console.print(f"[green]✅[/green] Video saved: {result.output_path}")
+            console.print(f"[green]⏱️[/green] Render time: {result.render_time_seconds:.1f}s")
+            return str(result.output_path)
+        except Exception as e:
+            self.logger.error(f"Approved render failed: {e}")
+            console.print(f"[red]❌[/red] Error: {e}")
+            raise
+        finally:
+            tracing.end(trace)
     
     async def start_automated_mode(self):
         """Start automated daily video generation"""
@@ -300,6 +428,7 @@ class VideoAISystem:
             console.print(f"  • {schedule.name} - Next: {schedule.next_run}")
         
         console.print("[blue]🚀[/blue] Starting scheduler... (Press Ctrl+C to stop)")
+        self._start_metrics_server()
         
         try:
             await self.scheduler.start_scheduler()
@@ -308,6 +437,34 @@ class VideoAISystem:
             self.scheduler.stop_scheduler()
             console.print("[green]✅[/green] Automation stopped")
     
+    def _start_metrics_server(self):
+        """Serve Prometheus metrics from a daemon thread (automation.metrics_*)"""
+        automation_cfg = getattr(self.config, 'automation', {}) or {}
+        if not automation_cfg.get('metrics_enabled', True):
+            return None
+        from src.utils import metrics
+        host = automation_cfg.get('metrics_host', '127.0.0.1')
+        port = int(automation_cfg.get('metrics_port', 9464))
+        try:
+            server = metrics.start_http_server(port, host)
+        except OSError as e:
+            self.logger.warning(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        console.print(f"[blue]📈[/blue] Metrics: http://{host}:{server.server_port}/metrics")
+        return server
+    
+    async def start_worker_mode(self, shared_dir: Optional[str] = None, worker_id: Optional[str] = None):
+        """Run as one worker of a pool sharing a queue directory"""
+        shared = Path(shared_dir) if shared_dir else Path(self.config.paths.data) / "worker_queue"
+        console.print(f"[blue]🛠️[/blue] Starting worker on shared queue: {shared} (Press Ctrl+C to stop)")
+        self._start_metrics_server()
+        
+        try:
+            processed = await self.scheduler.run_worker(shared, worker_id)
+            console.print(f"[green]✅[/green] Worker stopped after {processed} jobs")
+        except KeyboardInterrupt:
+            console.print("\n[yellow]⏹️[/yellow] Stopping worker...")
+    
     def run_interactive_mode(self):
         """Interactive mode for testing and manual generation"""
         console.print("\n[bold blue]🚀 Long Video AI - Interactive Mode[/bold blue]\n")
@@ -402,7 +559,7 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Long Video AI Automation System")
-    parser.add_argument("--mode", choices=["interactive", "auto", "single"], 
+    parser.add_argument("--mode", choices=["interactive", "auto", "single", "worker"], 
                        default="interactive", help="Operation mode")
     parser.add_argument("--topic", type=str, help="Topic category for single video generation")
     parser.add_argument("--subtopic", type=str, help="Specific subject within the topic")
@@ -410,18 +567,46 @@ def main():
                        help="Path to configuration file")
     parser.add_argument("--test", action="store_true",
                        help="Quick test mode: generate 1-2 minute video for testing")
+    parser.add_argument("--shared-dir", type=str, default=None,
+                       help="Worker mode: shared queue directory (default: <data>/worker_queue)")
+    parser.add_argument("--worker-id", type=str, default=None,
+                       help="Worker mode: stable worker identifier (default: host-pid-random)")
+    parser.add_argument("--startup-report", action="store_true",
+                       help="Print per-subsystem startup/import timings before running")
+    parser.add_argument("--proxy", action="store_true",
+                       help="Also render a low-res review proxy (<output>_proxy.mp4) alongside the full render")
+    parser.add_argument("--proxy-only", action="store_true",
+                       help="Single mode: stop after the review proxy and write review.json for --approve")
+    parser.add_argument("--approve", type=str, default=None, metavar="REVIEW_JSON",
+                       help="Render the full video for a proxy reviewed with --proxy-only")
     
     args = parser.parse_args()
     
     try:
         system = VideoAISystem(args.config, test_mode=args.test)
+        if args.proxy:
+            system.config.video.proxy_render = True
+        if args.mode in ("auto", "worker"):
+            system.scheduler  # cheap; pipelines stay deferred until the first job
+        
+        report = startup_profile.report()
+        if args.startup_report:
+            console.print(report, markup=False, highlight=False)
+        elif startup_profile.elapsed_ms() > startup_profile.budget_ms:
+            system.logger.warning(f"Startup exceeded budget\n{report}")
+        else:
+            system.logger.debug(report)
         
-        if args.mode == "interactive":
+        if args.approve:
+            asyncio.run(system.approve_render(args.approve))
+        elif args.mode == "interactive":
             system.run_interactive_mode()
         elif args.mode == "auto":
             asyncio.run(system.start_automated_mode())
         elif args.mode == "single":
-            asyncio.run(system.generate_single_video(args.topic, args.subtopic))
+            asyncio.run(system.generate_single_video(args.topic, args.subtopic, proxy_only=args.proxy_only))
+        elif args.mode == "worker":
+            asyncio.run(system.start_worker_mode(args.shared_dir, args.worker_id))
             
     except KeyboardInterrupt:
         console.print("\n[yellow]⏹️[/yellow] Stopped by user")
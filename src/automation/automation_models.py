@@ -86,6 +86,7 @@ class VideoJob(BaseModel):
     video_path: Optional[Path] = None
     thumbnail_path: Optional[Path] = None
     audio_path: Optional[Path] = None
+    proxy_path: Optional[Path] = None  # low-res review proxy, when rendered
     
     # Statistics
     render_time_seconds: Optional[float] = None
@@ -96,6 +97,7 @@ class VideoJob(BaseModel):
     error_message: Optional[str] = None
     retry_count: int = 0
     max_retries: int = 3
+    next_attempt_at: Optional[datetime] = None  # backoff: not eligible before this time
     
     # Quality metrics
     content_quality_score: Optional[float] = None
@@ -0,0 +1,144 @@
+"""
+Job Checkpoints
+
+Stage-level checkpoints keyed by job id so a retried or restarted job
+resumes from the first incomplete stage instead of regenerating research,
+script, TTS and images after (say) an ffmpeg failure.
+
+Each job gets <root>/<job_id>/manifest.json recording, per stage, a small
+JSON payload plus the sha256 and size of every file the stage produced.
+A stage only counts as complete if all of its files still exist and hash
+to the recorded values; an invalid stage also invalidates every later one.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Pipeline order; later stages depend on earlier ones
+STAGES = ["content", "audio", "images"]
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class JobCheckpoints:
+    """Per-job stage manifests with hash validation"""
+
+    def __init__(self, root: Path):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # (job_id, stage, completed_at) already hash-validated in this process
+        self._validated = set()
+
+    def job_dir(self, job_id: str) -> Path:
+        path = self.root / job_id
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    # ------------------------------------------------------------------
+    def _manifest_path(self, job_id: str) -> Path:
+        return self.root / job_id / 'manifest.json'
+
+    def _read_manifest(self, job_id: str) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"job_id": job_id, "stages": {}}
+
+    def _write_manifest(self, job_id: str, manifest: Dict[str, Any]) -> None:
+        path = self._manifest_path(job_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".manifest.{uuid.uuid4().hex}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------------
+    async def save(self, job_id: str, stage: str, data: Dict[str, Any], files: Iterable[str]) -> None:
+        """Record a completed stage; hashing runs off the event loop"""
+        files = [str(f) for f in files if f]
+        entries = await asyncio.to_thread(self._describe_files, files)
+        manifest = self._read_manifest(job_id)
+        manifest["stages"][stage] = {
+            "data": data,
+            "files": entries,
+            "completed_at": datetime.now().isoformat(),
+        }
+        # Anything recorded after this stage was built from older inputs
+        for later in STAGES[STAGES.index(stage) + 1:] if stage in STAGES else []:
+            manifest["stages"].pop(later, None)
+        self._write_manifest(job_id, manifest)
+        self.logger.info(f"Checkpointed stage '{stage}' for job {job_id} ({len(entries)} files)")
+
+    async def load(self, job_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Return the stage payload if every earlier stage and its files still validate"""
+        manifest = self._read_manifest(job_id)
+        stages = manifest.get("stages", {})
+        order = STAGES[:STAGES.index(stage) + 1] if stage in STAGES else [stage]
+        for name in order:
+            entry = stages.get(name)
+            if entry is None:
+                return None
+            key = (job_id, name, entry.get("completed_at"))
+            if key in self._validated:
+                continue
+            ok = await asyncio.to_thread(self._validate_files, entry.get("files", []))
+            if ok:
+                self._validated.add(key)
+            else:
+                self.logger.warning(f"Checkpoint for job {job_id} stage '{name}' is stale; recomputing from there")
+                self._invalidate_from(job_id, name)
+                return None
+        return stages[stage].get("data", {})
+
+    def completed_stages(self, job_id: str) -> List[str]:
+        """Stages recorded in the manifest (not re-validated)"""
+        return [s for s in STAGES if s in self._read_manifest(job_id).get("stages", {})]
+
+    def clear(self, job_id: str) -> None:
+        self._validated = {k for k in self._validated if k[0] != job_id}
+        shutil.rmtree(self.root / job_id, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    def _invalidate_from(self, job_id: str, stage: str) -> None:
+        manifest = self._read_manifest(job_id)
+        start = STAGES.index(stage) if stage in STAGES else 0
+        for name in STAGES[start:]:
+            manifest["stages"].pop(name, None)
+        self._write_manifest(job_id, manifest)
+
+    @staticmethod
+    def _describe_files(files: List[str]) -> List[Dict[str, Any]]:
+        return [{"path": f, "size": os.path.getsize(f), "sha256": file_sha256(f)} for f in files]
+
+    @staticmethod
+    def _validate_files(entries: List[Dict[str, Any]]) -> bool:
+        for entry in entries:
+            path = entry.get("path")
+            try:
+                # Cheap size check first; hash only if sizes agree
+                if os.path.getsize(path) != entry.get("size"):
+                    return False
+                if file_sha256(path) != entry.get("sha256"):
+                    return False
+            except OSError:
+                return False
+        return True
@@ -0,0 +1,260 @@
+"""
+Job Store
+
+SQLite (WAL) persistence for video jobs: single-row upserts, indexed
+lookups by status/date/topic, aggregate stats in SQL and throttled,
+coalesced progress writes.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, Iterable, List, Optional
+
+from .automation_models import VideoJob, ScheduleStatus
+
+
+TERMINAL_STATUSES = (ScheduleStatus.COMPLETED.value, ScheduleStatus.FAILED.value, ScheduleStatus.CANCELLED.value)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    schedule_id TEXT,
+    topic_category TEXT,
+    topic_title TEXT,
+    status TEXT NOT NULL,
+    current_step TEXT,
+    progress_percent REAL DEFAULT 0,
+    retry_count INTEGER DEFAULT 0,
+    created_at TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    render_time_seconds REAL,
+    file_size_mb REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_completed_at ON jobs(completed_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_topic ON jobs(topic_category);
+"""
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class JobStore:
+    """WAL-mode SQLite store for VideoJob records"""
+
+    def __init__(self, db_path: Path, progress_interval_s: float = 2.0):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.progress_interval_s = max(0.0, float(progress_interval_s))
+
+        self._lock = RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        # Coalesced progress: job_id -> latest unsaved snapshot
+        self._dirty: Dict[str, VideoJob] = {}
+        self._last_progress_write: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def upsert(self, job: VideoJob) -> None:
+        """Persist a job immediately (state transitions)"""
+        with self._lock:
+            self._dirty.pop(job.id, None)
+            self._last_progress_write[job.id] = time.monotonic()
+            self._conn.execute(
+                """
+                INSERT INTO jobs (id, schedule_id, topic_category, topic_title, status, current_step,
+                                  progress_percent, retry_count, created_at, started_at, completed_at,
+                                  render_time_seconds, file_size_mb, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    schedule_id=excluded.schedule_id,
+                    topic_category=excluded.topic_category,
+                    topic_title=excluded.topic_title,
+                    status=excluded.status,
+                    current_step=excluded.current_step,
+                    progress_percent=excluded.progress_percent,
+                    retry_count=excluded.retry_count,
+                    created_at=excluded.created_at,
+                    started_at=excluded.started_at,
+                    completed_at=excluded.completed_at,
+                    render_time_seconds=excluded.render_time_seconds,
+                    file_size_mb=excluded.file_size_mb,
+                    data=excluded.data
+                """,
+                (
+                    job.id, job.schedule_id, job.topic_category, job.topic_title,
+                    job.status.value, job.current_step, job.progress_percent, job.retry_count,
+                    _iso(job.created_at), _iso(job.started_at), _iso(job.completed_at),
+                    job.render_time_seconds, job.file_size_mb,
+                    json.dumps(job.dict(), default=str),
+                ),
+            )
+            self._conn.commit()
+
+    def update_progress(self, job: VideoJob, force: bool = False) -> bool:
+        """Record progress, writing at most once per `progress_interval_s` per job.
+
+        Intermediate updates are coalesced; the latest snapshot is kept and
+        written by the next allowed call or `flush_progress()`. Returns True
+        if a row was written.
+        """
+        with self._lock:
+            now = time.monotonic()
+            last = self._last_progress_write.get(job.id, 0.0)
+            if not force and now - last < self.progress_interval_s:
+                self._dirty[job.id] = job
+                return False
+            self._dirty.pop(job.id, None)
+            self._last_progress_write[job.id] = now
+            self._conn.execute(
+                "UPDATE jobs SET current_step=?, progress_percent=?, data=? WHERE id=?",
+                (job.current_step, job.progress_percent, json.dumps(job.dict(), default=str), job.id),
+            )
+            self._conn.commit()
+            return True
+
+    def flush_progress(self) -> int:
+        """Write any coalesced progress snapshots"""
+        with self._lock:
+            pending = list(self._dirty.values())
+        for job in pending:
+            self.update_progress(job, force=True)
+        return len(pending)
+
+    def delete(self, job_ids: Iterable[str]) -> int:
+        ids = list(job_ids)
+        if not ids:
+            return 0
+        with self._lock:
+            cur = self._conn.executemany("DELETE FROM jobs WHERE id=?", [(i,) for i in ids])
+            self._conn.commit()
+            for i in ids:
+                self._dirty.pop(i, None)
+                self._last_progress_write.pop(i, None)
+            return cur.rowcount
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def _jobs(self, sql: str, params: tuple = ()) -> List[VideoJob]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        jobs = []
+        for row in rows:
+            try:
+                jobs.append(VideoJob(**json.loads(row["data"])))
+            except Exception as e:
+                self.logger.warning(f"Skipping unreadable job row {row['id']}: {e}")
+        return jobs
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        jobs = self._jobs("SELECT id, data FROM jobs WHERE id=?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def list_by_status(self, *statuses: ScheduleStatus) -> List[VideoJob]:
+        values = tuple(s.value for s in statuses)
+        marks = ",".join("?" * len(values))
+        return self._jobs(f"SELECT id, data FROM jobs WHERE status IN ({marks}) ORDER BY created_at", values)
+
+    def recent_history(self, limit: int = 100) -> List[VideoJob]:
+        """Most recent finished jobs, oldest first (matches the old history list order)"""
+        marks = ",".join("?" * len(TERMINAL_STATUSES))
+        jobs = self._jobs(
+            f"SELECT id, data FROM jobs WHERE status IN ({marks}) ORDER BY completed_at DESC LIMIT ?",
+            TERMINAL_STATUSES + (int(limit),),
+        )
+        jobs.reverse()
+        return jobs
+
+    def finished_before(self, cutoff: datetime) -> List[VideoJob]:
+        marks = ",".join("?" * len(TERMINAL_STATUSES))
+        return self._jobs(
+            f"SELECT id, data FROM jobs WHERE status IN ({marks}) AND completed_at < ?",
+            TERMINAL_STATUSES + (cutoff.isoformat(),),
+        )
+
+    def count(self, status: Optional[ScheduleStatus] = None, since: Optional[datetime] = None) -> int:
+        """Count jobs, optionally by status and completion time"""
+        sql, params = "SELECT COUNT(*) FROM jobs WHERE 1=1", []
+        if status is not None:
+            sql += " AND status=?"
+            params.append(status.value)
+        if since is not None:
+            sql += " AND completed_at >= ?"
+            params.append(since.isoformat())
+        with self._lock:
+            return int(self._conn.execute(sql, tuple(params)).fetchone()[0])
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: int(row[1]) for row in rows}
+
+    def completion_aggregates(self) -> Dict[str, Any]:
+        """Averages over completed jobs with a recorded render time"""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT COUNT(*), AVG(render_time_seconds), AVG(COALESCE(file_size_mb, 0)), MAX(completed_at)
+                FROM jobs WHERE status=? AND render_time_seconds IS NOT NULL AND render_time_seconds > 0
+                """,
+                (ScheduleStatus.COMPLETED.value,),
+            ).fetchone()
+        return {
+            "count": int(row[0] or 0),
+            "average_render_time": float(row[1] or 0.0),
+            "average_file_size_mb": float(row[2] or 0.0),
+            "last_completion": datetime.fromisoformat(row[3]) if row[3] else None,
+        }
+
+    def topic_distribution(self, *statuses: ScheduleStatus) -> Dict[str, int]:
+        values = tuple(s.value for s in statuses)
+        marks = ",".join("?" * len(values))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT topic_category, COUNT(*) FROM jobs WHERE status IN ({marks}) GROUP BY topic_category",
+                values,
+            ).fetchall()
+        return {row[0]: int(row[1]) for row in rows}
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def import_json_history(self, json_path: Path) -> int:
+        """One-time migration from the legacy job_history.json file"""
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        with open(json_path) as f:
+            data = json.load(f)
+        imported = 0
+        for job_data in data:
+            try:
+                self.upsert(VideoJob(**job_data))
+                imported += 1
+            except Exception as e:
+                self.logger.warning(f"Skipping legacy job record: {e}")
+        json_path.rename(json_path.with_suffix(".json.migrated"))
+        return imported
+
+    def close(self) -> None:
+        self.flush_progress()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,110 @@
+"""
+Resource Slots
+
+Per-resource-class concurrency limits for stage-level pipelining across
+jobs: a job holds a resource only while one of its stages runs, so job B
+can render images on the GPU while job A encodes on the CPU.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from ..utils import metrics, tracing
+
+
+# Pipeline stage -> resource class
+DEFAULT_STAGE_RESOURCES = {
+    "content": "llm",
+    "tts": "tts",
+    "images": "gpu",
+    "assembly": "cpu",
+}
+
+# Resource class -> concurrent slots
+DEFAULT_RESOURCE_SLOTS = {
+    "llm": 2,
+    "tts": 1,
+    "gpu": 1,
+    "cpu": 1,
+}
+
+
+class ResourceSlots:
+    """FIFO semaphores per resource class with busy-time accounting"""
+
+    def __init__(self, resource_slots: Optional[Dict[str, int]] = None,
+                 stage_resources: Optional[Dict[str, str]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.resource_slots = dict(DEFAULT_RESOURCE_SLOTS)
+        self.resource_slots.update(resource_slots or {})
+        self.stage_resources = dict(DEFAULT_STAGE_RESOURCES)
+        self.stage_resources.update(stage_resources or {})
+
+        self._semaphores = {name: asyncio.Semaphore(max(1, int(n))) for name, n in self.resource_slots.items()}
+        self._in_use: Dict[str, int] = {name: 0 for name in self._semaphores}
+        self._busy_seconds: Dict[str, float] = {name: 0.0 for name in self._semaphores}
+        self._wait_seconds: Dict[str, float] = {name: 0.0 for name in self._semaphores}
+        self._started = time.monotonic()
+
+    def resource_for(self, stage: str) -> str:
+        resource = self.stage_resources.get(stage, stage)
+        if resource not in self._semaphores:
+            # Unknown stage/resource: give it its own single slot
+            self._semaphores[resource] = asyncio.Semaphore(1)
+            self._in_use[resource] = 0
+            self._busy_seconds[resource] = 0.0
+            self._wait_seconds[resource] = 0.0
+        return resource
+
+    def is_saturated(self, stage: str) -> bool:
+        return self._semaphores[self.resource_for(stage)].locked()
+
+    @asynccontextmanager
+    async def stage(self, stage: str, on_wait=None):
+        """Hold the resource slot for `stage` for the duration of the block.
+
+        `on_wait` is called (sync) if the slot is not immediately available.
+        """
+        resource = self.resource_for(stage)
+        semaphore = self._semaphores[resource]
+        if semaphore.locked() and on_wait:
+            try:
+                on_wait(resource)
+            except Exception:
+                pass
+        wait_start = time.monotonic()
+        await semaphore.acquire()
+        acquired = time.monotonic()
+        self._wait_seconds[resource] += acquired - wait_start
+        self._in_use[resource] += 1
+        metrics.histogram("video_ai_stage_wait_seconds", "Time a stage queued for its resource slot",
+                          ["stage"]).labels(stage=stage).observe(acquired - wait_start)
+        in_use = metrics.gauge("video_ai_resource_slots_in_use", "Busy slots per resource class", ["resource"])
+        in_use.labels(resource=resource).set(self._in_use[resource])
+        try:
+            with tracing.span(f"stage.{stage}", cat="scheduler", resource=resource,
+                              wait_s=round(acquired - wait_start, 3)):
+                yield resource
+        finally:
+            self._in_use[resource] -= 1
+            self._busy_seconds[resource] += time.monotonic() - acquired
+            semaphore.release()
+            in_use.labels(resource=resource).set(self._in_use[resource])
+            metrics.histogram("video_ai_stage_seconds", "Pipeline stage duration (slot held)",
+                              ["stage"]).labels(stage=stage).observe(time.monotonic() - acquired)
+
+    def get_utilization(self) -> Dict[str, Any]:
+        """Busy fraction (slot-seconds / wall time / slots) and queueing per resource"""
+        elapsed = max(1e-6, time.monotonic() - self._started)
+        return {
+            name: {
+                "slots": self.resource_slots.get(name, 1),
+                "in_use": self._in_use[name],
+                "utilization": round(self._busy_seconds[name] / elapsed / max(1, self.resource_slots.get(name, 1)), 4),
+                "wait_seconds": round(self._wait_seconds[name], 2),
+            }
+            for name in self._semaphores
+        }
@@ -5,13 +5,16 @@ Automated video generation scheduler with queue management.
 """
 
 import asyncio
+import contextlib
+import heapq
+import itertools
 import logging
 import json
 import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Callable
+from typing import List, Optional, Dict, Any, Callable, Set, Tuple
 import yaml
 from threading import Lock
 import psutil
@@ -21,7 +24,34 @@ from .automation_models import (
     ScheduleConfig, VideoJob, AutomationResult, AutomationStats,
     HealthCheck, QueueMetrics, ScheduleStatus, ScheduleFrequency
 )
+from .job_store import JobStore
+from .resource_slots import ResourceSlots
+from .worker_pool import QueueWorker
+from .checkpoints import JobCheckpoints
 from ..content_generation.topic_queue import TopicQueue
+from ..content_generation.content_models import ContentGenerationResult
+from ..utils import metrics, tracing
+
+class _Dependency:
+    """Scheduler dependency injected either as an instance or as a factory"""
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj._dependencies.get(self.name)
+        if value is None:
+            factory = obj._dependency_factories.get(self.name)
+            if factory is not None:
+                value = factory()
+                obj._dependencies[self.name] = value
+        return value
+    
+    def __set__(self, obj, value):
+        obj._dependencies[self.name] = value
+
 
 class VideoScheduler:
     """
@@ -36,6 +66,11 @@ class VideoScheduler:
     - Error recovery
     """
     
+    content_pipeline = _Dependency()
+    media_pipeline = _Dependency()
+    video_assembler = _Dependency()
+    topic_queue = _Dependency()
+    
     def __init__(self, config):
         self.config = config
         self.logger = logging.getLogger(__name__)
@@ -52,11 +87,44 @@ class VideoScheduler:
         # State management
         self.schedules: Dict[str, ScheduleConfig] = {}
         self.active_jobs: Dict[str, VideoJob] = {}
-        self.job_history: List[VideoJob] = []
         self.is_running = False
         self.state_lock = Lock()
         
+        # Persistent job store (finished jobs live only here, not in memory)
+        automation_cfg = getattr(config, 'automation', {}) or {}
+        self.job_store = JobStore(
+            self.jobs_dir / 'jobs.db',
+            progress_interval_s=automation_cfg.get('progress_write_interval_s', 2.0)
+        )
+        
+        # Event-driven loop: timer heap of (due_ts, seq, key) + wakeup event
+        # max_concurrent_jobs = jobs in flight across all stages; stages are
+        # further limited per resource class so jobs pipeline instead of contending
+        self.max_concurrent_jobs = int(automation_cfg.get('max_concurrent_jobs', 3))
+        self.resource_slots = ResourceSlots(
+            resource_slots=automation_cfg.get('resource_slots'),
+            stage_resources=automation_cfg.get('stage_resources')
+        )
+        self.retry_backoff_base_s = float(automation_cfg.get('retry_backoff_base_s', 60))
+        self.retry_backoff_max_s = float(automation_cfg.get('retry_backoff_max_s', 3600))
+        self.housekeeping_interval_s = float(automation_cfg.get('housekeeping_interval_s', 60))
+        self._timers: List[Tuple[float, int, str]] = []
+        self._timer_seq = itertools.count()
+        self._deferred_schedules: Set[str] = set()
+        self._job_tasks: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Stage checkpoints so retries/restarts resume from the first incomplete stage
+        self.checkpoints = JobCheckpoints(self.jobs_dir / 'checkpoints')
+        
+        # Worker mode: new jobs go to a shared queue instead of active_jobs
+        self.worker: Optional[QueueWorker] = None
+        self._queue_owned: Set[str] = set()  # jobs whose in-flight state lives in the shared queue
+        
         # Dependencies (injected)
+        self._dependencies: Dict[str, Any] = {}
+        self._dependency_factories: Dict[str, Callable[[], Any]] = {}
         self.content_pipeline = None
         self.media_pipeline = None
         self.video_assembler = None
@@ -80,6 +148,15 @@ class VideoScheduler:
         self.topic_queue = topic_queue
         self.logger.info("Dependencies injected into scheduler")
     
+    def inject_dependency_factories(self, **factories: Callable[[], Any]):
+        """Inject zero-arg factories; each dependency is built on first access"""
+        self._dependency_factories.update(factories)
+        self.logger.info(f"Deferred dependencies registered: {', '.join(sorted(factories))}")
+    
+    def _has_dependency(self, name: str) -> bool:
+        """True if a dependency is injected or can be built, without building it"""
+        return self._dependencies.get(name) is not None or name in self._dependency_factories
+    
     def add_schedule(self, schedule: ScheduleConfig) -> str:
         """Add a new schedule"""
         schedule_id = str(uuid.uuid4())
@@ -92,10 +169,24 @@ class VideoScheduler:
         
         # Save to disk
         self._save_schedule(schedule_id, schedule)
+        self._schedule_timer(schedule_id, schedule)
         
         self.logger.info(f"Added schedule '{schedule.name}' (ID: {schedule_id})")
         return schedule_id
     
+    def update_schedule(self, schedule_id: str, schedule: ScheduleConfig) -> bool:
+        """Replace an existing schedule and re-arm its timer"""
+        with self.state_lock:
+            if schedule_id not in self.schedules:
+                return False
+            schedule.next_run = self._calculate_next_run(schedule)
+            self.schedules[schedule_id] = schedule
+        
+        self._save_schedule(schedule_id, schedule)
+        self._schedule_timer(schedule_id, schedule)
+        self.logger.info(f"Updated schedule '{schedule.name}' (ID: {schedule_id})")
+        return True
+    
     def remove_schedule(self, schedule_id: str) -> bool:
         """Remove a schedule"""
         with self.state_lock:
@@ -108,9 +199,15 @@ class VideoScheduler:
                     schedule_file.unlink()
                 
                 self.logger.info(f"Removed schedule {schedule_id}")
-                return True
+                removed = True
+            else:
+                removed = False
         
-        return False
+        if removed:
+            # Stale heap entries are skipped lazily; wake so the sleep is recomputed
+            self._deferred_schedules.discard(schedule_id)
+            self._wake()
+        return removed
     
     def get_schedules(self) -> Dict[str, ScheduleConfig]:
         """Get all schedules"""
@@ -124,8 +221,7 @@ class VideoScheduler:
     
     def get_job_history(self, limit: int = 100) -> List[VideoJob]:
         """Get recent job history"""
-        with self.state_lock:
-            return self.job_history[-limit:].copy()
+        return self.job_store.recent_history(limit)
     
     async def start_scheduler(self) -> None:
         """Start the automated scheduler"""
@@ -134,39 +230,191 @@ class VideoScheduler:
             return
         
         self.is_running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._rebuild_timers()
         self.logger.info("Starting video scheduler...")
         
+        next_housekeeping = 0.0
         try:
             while self.is_running:
-                # Check for scheduled jobs
+                # Clear first so wakeups raised while we work are not lost
+                self._wakeup.clear()
+                
+                # Check for scheduled jobs that are due
                 await self._check_schedules()
                 
-                # Process pending jobs
+                # Admit pending jobs (non-blocking; completions wake the loop)
                 await self._process_job_queue()
                 
-                # Cleanup old files
-                await self._cleanup_old_files()
-                
-                # Update statistics
-                self._update_stats()
+                if time.time() >= next_housekeeping:
+                    # Cleanup old files
+                    await self._cleanup_old_files()
+                    
+                    # Update statistics
+                    self._update_stats()
+                    
+                    # Health check
+                    health = await self._perform_health_check()
+                    self._publish_metrics(health)
+                    next_housekeeping = time.time() + self.housekeeping_interval_s
                 
-                # Health check
-                await self._perform_health_check()
-                
-                # Wait before next cycle
-                await asyncio.sleep(60)  # Check every minute
+                # Sleep exactly until the next timer, housekeeping, or an explicit wakeup
+                timeout = max(0.0, min(self._next_timer_due(), next_housekeeping) - time.time())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
                 
         except Exception as e:
             self.logger.error(f"Scheduler error: {e}")
         finally:
             self.is_running = False
+            self.job_store.flush_progress()
             self.logger.info("Scheduler stopped")
     
     def stop_scheduler(self) -> None:
         """Stop the scheduler"""
         self.is_running = False
+        self._wake()
         self.logger.info("Stopping scheduler...")
     
+    def submit_job(self, topic_category: str, subtopic: Optional[str] = None,
+                   topic_title: Optional[str] = None) -> str:
+        """Queue a job for the running scheduler and wake it immediately"""
+        job = VideoJob(
+            id=str(uuid.uuid4()),
+            schedule_id="manual",
+            topic_category=topic_category,
+            topic_title=topic_title or subtopic or f"Random {topic_category} topic",
+            subtopic=subtopic,
+            status=ScheduleStatus.PENDING
+        )
+        self._enqueue_job(job)
+        self.logger.info(f"Submitted job {job.id}: {job.topic_title}")
+        return job.id
+    
+    def _enqueue_job(self, job: VideoJob) -> None:
+        """Hand a new job to the local queue, or to the shared queue in worker mode"""
+        if self.worker is not None:
+            self.worker.queue.enqueue(json.loads(json.dumps(job.dict(), default=str)))
+            return
+        with self.state_lock:
+            self.active_jobs[job.id] = job
+        self._save_job(job)
+        self._wake()
+    
+    async def run_worker(self, shared_dir: Path, worker_id: Optional[str] = None,
+                         max_jobs: Optional[int] = None) -> int:
+        """Run as one of N workers claiming jobs from a shared directory.
+        
+        Every worker executes jobs; whichever worker holds the leader lease
+        also evaluates schedules and reclaims jobs from dead workers. Schedule
+        files are reloaded on becoming leader, so the data directory should be
+        shared as well when workers run on several hosts.
+        """
+        if not self._check_dependencies():
+            raise RuntimeError("Dependencies not available")
+        
+        automation_cfg = getattr(self.config, 'automation', {}) or {}
+        self.worker = QueueWorker(
+            Path(shared_dir),
+            execute=self._execute_shared_job,
+            worker_id=worker_id,
+            leader_tick=self._leader_tick,
+            lease_ttl_s=automation_cfg.get('worker_lease_ttl_s', 60),
+            poll_interval_s=automation_cfg.get('worker_poll_interval_s', 2.0)
+        )
+        self.is_running = True
+        try:
+            return await self.worker.run(max_jobs=max_jobs)
+        finally:
+            self.is_running = False
+            self.job_store.flush_progress()
+            self.worker = None
+    
+    async def _leader_tick(self, newly_elected: bool) -> None:
+        """Leader-only: evaluate due schedules, enqueueing jobs to the shared queue"""
+        if newly_elected:
+            # Another worker may have advanced next_run while it led
+            with self.state_lock:
+                self.schedules = {}
+            self._load_schedules()
+            self._rebuild_timers()
+        await self._check_schedules()
+    
+    async def _execute_shared_job(self, job_data: Dict[str, Any]):
+        """Run a claimed job; returns (outcome, job_dict, not_before) for the worker"""
+        job = VideoJob(**{k: v for k, v in job_data.items() if k in VideoJob.__fields__})
+        with self.state_lock:
+            self.active_jobs[job.id] = job
+            self._queue_owned.add(job.id)
+        try:
+            await self._execute_job(job)
+        finally:
+            with self.state_lock:
+                self.active_jobs.pop(job.id, None)
+                self._queue_owned.discard(job.id)
+        
+        result = dict(job_data)
+        result.update(json.loads(json.dumps(job.dict(), default=str)))
+        if job.status == ScheduleStatus.COMPLETED:
+            return "completed", result, 0.0
+        if job.status == ScheduleStatus.PENDING and job.next_attempt_at:
+            return "retry", result, job.next_attempt_at.timestamp()
+        return "failed", result, 0.0
+    
+    # ------------------------------------------------------------------
+    # Timer heap helpers
+    # ------------------------------------------------------------------
+    def _wake(self) -> None:
+        """Wake the scheduler loop (safe from any thread)"""
+        loop, event = self._loop, self._wakeup
+        if loop is None or event is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass
+    
+    def _push_timer(self, due: datetime, key: str) -> None:
+        with self.state_lock:
+            heapq.heappush(self._timers, (due.timestamp(), next(self._timer_seq), key))
+        self._wake()
+    
+    def _schedule_timer(self, schedule_id: str, schedule: ScheduleConfig) -> None:
+        if schedule.enabled and schedule.next_run:
+            self._push_timer(schedule.next_run, f"schedule:{schedule_id}")
+        else:
+            self._wake()
+    
+    def _rebuild_timers(self) -> None:
+        with self.state_lock:
+            self._timers = []
+            for schedule_id, schedule in self.schedules.items():
+                if schedule.enabled and schedule.next_run:
+                    self._timers.append((schedule.next_run.timestamp(), next(self._timer_seq), f"schedule:{schedule_id}"))
+            for job in self.active_jobs.values():
+                if job.status == ScheduleStatus.PENDING and job.next_attempt_at:
+                    self._timers.append((job.next_attempt_at.timestamp(), next(self._timer_seq), f"retry:{job.id}"))
+            heapq.heapify(self._timers)
+    
+    def _next_timer_due(self) -> float:
+        with self.state_lock:
+            return self._timers[0][0] if self._timers else float('inf')
+    
+    def _pop_due_timers(self) -> List[str]:
+        now = time.time()
+        keys = []
+        with self.state_lock:
+            while self._timers and self._timers[0][0] <= now:
+                keys.append(heapq.heappop(self._timers)[2])
+        return keys
+    
+    def _retry_delay_seconds(self, retry_count: int) -> float:
+        """Exponential backoff: base * 2^(n-1), capped"""
+        return min(self.retry_backoff_max_s, self.retry_backoff_base_s * (2 ** max(0, retry_count - 1)))
+    
     async def generate_video_manual(self, 
                                   topic_category: str,
                                   subtopic: Optional[str] = None,
@@ -197,14 +445,19 @@ class VideoScheduler:
         return await self._execute_job(job)
     
     async def _check_schedules(self) -> None:
-        """Check for schedules that need to run"""
+        """Run schedules whose timers are due (plus any deferred for capacity)"""
         now = datetime.now()
+        due_ids = {key.split(":", 1)[1] for key in self._pop_due_timers() if key.startswith("schedule:")}
+        due_ids |= self._deferred_schedules
+        self._deferred_schedules = set()
         
         with self.state_lock:
             schedules_to_run = []
             
-            for schedule_id, schedule in self.schedules.items():
-                if (schedule.enabled and 
+            for schedule_id in due_ids:
+                schedule = self.schedules.get(schedule_id)
+                # Lazy invalidation: edited/removed schedules leave stale heap entries
+                if (schedule and schedule.enabled and 
                     schedule.next_run and 
                     schedule.next_run <= now):
                     schedules_to_run.append((schedule_id, schedule))
@@ -212,6 +465,11 @@ class VideoScheduler:
         # Execute scheduled jobs
         for schedule_id, schedule in schedules_to_run:
             await self._execute_schedule(schedule_id, schedule)
+            if schedule.next_run and schedule.next_run <= now:
+                # Still due (concurrency limit): retry when a job completes
+                self._deferred_schedules.add(schedule_id)
+            else:
+                self._schedule_timer(schedule_id, schedule)
     
     async def _execute_schedule(self, schedule_id: str, schedule: ScheduleConfig) -> None:
         """Execute a scheduled job"""
@@ -247,8 +505,7 @@ class VideoScheduler:
                     status=ScheduleStatus.PENDING
                 )
                 
-                with self.state_lock:
-                    self.active_jobs[job_id] = job
+                self._enqueue_job(job)
                 
                 jobs_created += 1
                 self.logger.info(f"Created job {job_id} for schedule {schedule_id}")
@@ -264,83 +521,148 @@ class VideoScheduler:
             self.logger.error(f"Failed to execute schedule {schedule_id}: {e}")
     
     async def _process_job_queue(self) -> None:
-        """Process pending jobs in the queue"""
+        """Admit pending jobs whose retry time has passed into free slots"""
+        now = datetime.now()
         with self.state_lock:
             pending_jobs = [job for job in self.active_jobs.values() 
-                          if job.status == ScheduleStatus.PENDING]
+                          if job.status == ScheduleStatus.PENDING
+                          and job.id not in self._job_tasks
+                          and (job.next_attempt_at is None or job.next_attempt_at <= now)]
         
         # Process jobs concurrently (limited by config)
-        max_concurrent = getattr(self.config.automation, 'max_concurrent_jobs', 2)
-        running_count = sum(1 for job in self.active_jobs.values() 
-                          if job.status == ScheduleStatus.RUNNING)
-        
-        available_slots = max_concurrent - running_count
+        available_slots = self.max_concurrent_jobs - len(self._job_tasks)
         
         if available_slots > 0 and pending_jobs:
             # Sort by creation time (FIFO)
             pending_jobs.sort(key=lambda j: j.created_at)
             
-            # Execute jobs
-            tasks = []
+            # Launch without waiting; completion wakes the loop to refill the slot
             for job in pending_jobs[:available_slots]:
                 task = asyncio.create_task(self._execute_job(job))
-                tasks.append(task)
-            
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+                self._job_tasks[job.id] = task
+                task.add_done_callback(lambda _t, job_id=job.id: self._on_job_task_done(job_id))
+    
+    def _on_job_task_done(self, job_id: str) -> None:
+        self._job_tasks.pop(job_id, None)
+        self._wake()
     
     async def _execute_job(self, job: VideoJob) -> AutomationResult:
-        """Execute a single video generation job"""
+        """Execute a single video generation job (one trace file per job when tracing is on)"""
+        trace = tracing.begin(f"job_{job.id}", self.config)
+        try:
+            with tracing.span("job", cat="scheduler", job_id=job.id, topic=job.topic_title):
+                return await self._run_job(job)
+        finally:
+            tracing.end(trace)
+    
+    async def _run_job(self, job: VideoJob) -> AutomationResult:
         start_time = time.time()
         
         try:
             # Update job status
             job.status = ScheduleStatus.RUNNING
+            job.next_attempt_at = None
             job.started_at = datetime.now()
             job.current_step = "starting"
             self._save_job(job)
             
             self.logger.info(f"Starting job {job.id}: {job.topic_title}")
             
-            # Step 1: Content Generation
-            job.current_step = "generating_content"
-            job.progress_percent = 10.0
-            self._save_job(job)
-            
-            content_data = await self.content_pipeline.generate_content(
-                job.topic_category, job.subtopic
-            )
+            def waiting(resource):
+                job.current_step = f"waiting_for_{resource}"
+                self.job_store.update_progress(job)
             
-            # Step 2: Media Generation
-            job.current_step = "generating_media"
-            job.progress_percent = 40.0
-            self._save_job(job)
-            
-            audio_path = await self.media_pipeline.generate_audio(
-                content_data.video_script, job.topic_category
-            )
+            # Streaming narration holds the TTS slot from script writing through the audio stage
+            narration_stream = None
+            tts_hold = contextlib.AsyncExitStack()
+            try:
+                # Step 1: Content Generation (resumable from checkpoint)
+                content_data = None
+                content_ckpt = await self.checkpoints.load(job.id, "content")
+                if content_ckpt:
+                    try:
+                        content_data = ContentGenerationResult.load_from_file(content_ckpt["result_path"])
+                        self.logger.info(f"Job {job.id}: resuming with checkpointed content")
+                    except Exception as e:
+                        self.logger.warning(f"Job {job.id}: content checkpoint unreadable ({e}); regenerating")
+                if content_data is None:
+                    async with self.resource_slots.stage("content", on_wait=waiting):
+                        job.current_step = "generating_content"
+                        job.progress_percent = 10.0
+                        self._save_job(job)
+                        
+                        # Synthesize finished paragraphs while later beats are written, but only
+                        # if the TTS slot is free now; never queue the LLM behind another job's TTS
+                        if not self.resource_slots.is_saturated("tts"):
+                            await tts_hold.enter_async_context(self.resource_slots.stage("tts"))
+                            narration_stream = self.media_pipeline.start_narration_stream(job.topic_category)
+                            if narration_stream is None:
+                                await tts_hold.aclose()
+                        
+                        content_data = await self.content_pipeline.generate_content(
+                            job.topic_category, job.subtopic, narration_sink=narration_stream
+                        )
+                    result_path = self.checkpoints.job_dir(job.id) / "content.json"
+                    content_data.save_to_file(str(result_path))
+                    await self.checkpoints.save(job.id, "content", {"result_path": str(result_path)}, [result_path])
+                
+                # Step 2: Media Generation (TTS and images hold separate resources)
+                audio_ckpt = await self.checkpoints.load(job.id, "audio")
+                if audio_ckpt:
+                    audio_path = audio_ckpt["audio_path"]
+                    self.logger.info(f"Job {job.id}: resuming with checkpointed audio")
+                else:
+                    tts_slot = tts_hold if narration_stream is not None else \
+                        self.resource_slots.stage("tts", on_wait=waiting)
+                    async with tts_slot:
+                        job.current_step = "generating_audio"
+                        job.progress_percent = 40.0
+                        self._save_job(job)
+                        
+                        audio_path = await self.media_pipeline.generate_audio(
+                            content_data.video_script, job.topic_category, narration_stream=narration_stream
+                        )
+                        narration_stream = None  # consumed
+                    await self.checkpoints.save(job.id, "audio", {"audio_path": audio_path}, [audio_path])
+                job.audio_path = audio_path
+            finally:
+                if narration_stream is not None:
+                    await narration_stream.cancel()
+                await tts_hold.aclose()
             
-            image_paths = await self.media_pipeline.generate_images(
-                content_data.video_script.image_prompts, job.topic_category
-            )
+            images_ckpt = await self.checkpoints.load(job.id, "images")
+            if images_ckpt:
+                image_paths = images_ckpt["image_paths"]
+                self.logger.info(f"Job {job.id}: resuming with {len(image_paths)} checkpointed images")
+            else:
+                async with self.resource_slots.stage("images", on_wait=waiting):
+                    job.current_step = "generating_images"
+                    job.progress_percent = 55.0
+                    self._save_job(job)
+                    
+                    image_paths = await self.media_pipeline.generate_images(
+                        content_data.video_script.image_prompts, job.topic_category
+                    )
+                await self.checkpoints.save(job.id, "images", {"image_paths": image_paths}, image_paths)
             
             # Step 3: Video Assembly
-            job.current_step = "assembling_video"
-            job.progress_percent = 70.0
-            self._save_job(job)
-            
-            def progress_callback(progress):
-                job.progress_percent = 70.0 + (progress.progress_percent * 0.25)
-                job.current_step = f"assembling: {progress.current_step}"
+            async with self.resource_slots.stage("assembly", on_wait=waiting):
+                job.current_step = "assembling_video"
+                job.progress_percent = 70.0
                 self._save_job(job)
-            
-            assembly_result = await self.video_assembler.assemble_video(
-                content_data.video_script,
-                audio_path,
-                image_paths,
-                job.topic_category,
-                progress_callback
-            )
+                
+                def progress_callback(progress):
+                    job.progress_percent = 70.0 + (progress.progress_percent * 0.25)
+                    job.current_step = f"assembling: {progress.current_step}"
+                    self.job_store.update_progress(job)
+                
+                assembly_result = await self.video_assembler.assemble_video(
+                    content_data.video_script,
+                    audio_path,
+                    image_paths,
+                    job.topic_category,
+                    progress_callback
+                )
             
             if not assembly_result.success:
                 raise Exception(f"Video assembly failed: {'; '.join(assembly_result.errors)}")
@@ -353,17 +675,17 @@ class VideoScheduler:
             job.video_path = assembly_result.output_path
             job.thumbnail_path = assembly_result.thumbnail_path
             job.audio_path = audio_path
+            job.proxy_path = assembly_result.proxy_path
             job.render_time_seconds = assembly_result.render_time_seconds
             job.file_size_mb = assembly_result.file_size_mb
             job.video_duration_seconds = assembly_result.total_duration
             
-            # Move to history
+            # Move to history; outputs are final so checkpoints are no longer needed
+            self._save_job(job)
+            self.checkpoints.clear(job.id)
             with self.state_lock:
                 if job.id in self.active_jobs:
                     del self.active_jobs[job.id]
-                self.job_history.append(job)
-            
-            self._save_job(job)
             
             # Create result
             result = AutomationResult(
@@ -377,6 +699,7 @@ class VideoScheduler:
             )
             
             self.logger.info(f"Job {job.id} completed successfully in {result.execution_time_seconds:.1f}s")
+            self._record_job_metrics("completed", result.execution_time_seconds, job)
             return result
             
         except Exception as e:
@@ -391,19 +714,23 @@ class VideoScheduler:
                 with self.state_lock:
                     if job.id in self.active_jobs:
                         del self.active_jobs[job.id]
-                    self.job_history.append(job)
                 
                 self.logger.error(f"Job {job.id} failed permanently: {e}")
             else:
-                # Reset for retry
+                # Reset for retry with exponential backoff
+                delay = self._retry_delay_seconds(job.retry_count)
                 job.status = ScheduleStatus.PENDING
                 job.current_step = "retry_queued"
                 job.started_at = None
                 job.progress_percent = 0.0
+                job.next_attempt_at = datetime.now() + timedelta(seconds=delay)
+                self._push_timer(job.next_attempt_at, f"retry:{job.id}")
                 
-                self.logger.warning(f"Job {job.id} failed, will retry ({job.retry_count}/{job.max_retries}): {e}")
+                self.logger.warning(f"Job {job.id} failed, will retry in {delay:.0f}s ({job.retry_count}/{job.max_retries}): {e}")
             
             self._save_job(job)
+            self._record_job_metrics("failed" if job.status == ScheduleStatus.FAILED else "retried",
+                                     time.time() - start_time, job)
             
             return AutomationResult(
                 success=False,
@@ -425,8 +752,8 @@ class VideoScheduler:
                 if topic_data:
                     topics.append({
                         'category': category,
-                        'title': topic_data.get('title', 'Unknown'),
-                        'subtopic': topic_data.get('subtopic')
+                        'title': topic_data.title,
+                        'subtopic': topic_data.subtopic
                     })
         
         # Fallback: generate generic topics
@@ -487,35 +814,39 @@ class VideoScheduler:
     
     def _check_dependencies(self) -> bool:
         """Check if all required dependencies are available"""
-        return all([
-            self.content_pipeline is not None,
-            self.media_pipeline is not None,
-            self.video_assembler is not None
-        ])
+        return all(self._has_dependency(name)
+                   for name in ('content_pipeline', 'media_pipeline', 'video_assembler'))
     
     async def _cleanup_old_files(self) -> None:
         """Clean up old generated files"""
         try:
             # Get cleanup threshold
-            cleanup_days = getattr(self.config.automation, 'cleanup_after_days', 30)
+            cleanup_days = (getattr(self.config, 'automation', {}) or {}).get('cleanup_after_days', 30)
             cutoff_date = datetime.now() - timedelta(days=cleanup_days)
             
-            # Clean up old jobs
-            old_jobs = [job for job in self.job_history 
-                       if job.completed_at and job.completed_at < cutoff_date]
+            # Clean up old jobs (indexed query on completed_at)
+            old_jobs = self.job_store.finished_before(cutoff_date)
             
             for job in old_jobs:
-                # Remove video files
-                for path in [job.video_path, job.thumbnail_path, job.audio_path]:
+                # Remove video files (plus the review proxy and the preview sprite written next to the thumbnail)
+                paths = [job.video_path, job.thumbnail_path, job.audio_path, job.proxy_path]
+                if job.video_path:
+                    video = Path(job.video_path)
+                    paths.append(video.with_name(f"{video.stem}_proxy.mp4"))
+                if job.thumbnail_path:
+                    thumb = Path(job.thumbnail_path)
+                    paths += [thumb.with_name(f"{thumb.stem}_sprite.jpg"), thumb.with_name(f"{thumb.stem}_sprite.vtt")]
+                for path in paths:
                     if path and Path(path).exists():
                         try:
                             Path(path).unlink()
                         except Exception as e:
                             self.logger.warning(f"Failed to delete {path}: {e}")
                 
-                # Remove from history
-                if job in self.job_history:
-                    self.job_history.remove(job)
+            # Remove from history
+            for job in old_jobs:
+                self.checkpoints.clear(job.id)
+            self.job_store.delete(job.id for job in old_jobs)
             
             if old_jobs:
                 self.logger.info(f"Cleaned up {len(old_jobs)} old jobs")
@@ -525,31 +856,28 @@ class VideoScheduler:
     
     def _update_stats(self) -> None:
         """Update automation statistics"""
+        counts = self.job_store.status_counts()
+        aggregates = self.job_store.completion_aggregates()
         with self.state_lock:
             # Count jobs
-            self.stats.total_jobs = len(self.job_history) + len(self.active_jobs)
-            self.stats.completed_jobs = sum(1 for job in self.job_history 
-                                          if job.status == ScheduleStatus.COMPLETED)
-            self.stats.failed_jobs = sum(1 for job in self.job_history 
-                                       if job.status == ScheduleStatus.FAILED)
+            self.stats.total_jobs = sum(counts.values())
+            self.stats.completed_jobs = counts.get(ScheduleStatus.COMPLETED.value, 0)
+            self.stats.failed_jobs = counts.get(ScheduleStatus.FAILED.value, 0)
             self.stats.pending_jobs = sum(1 for job in self.active_jobs.values() 
                                         if job.status == ScheduleStatus.PENDING)
             
             # Calculate averages
-            completed_jobs = [job for job in self.job_history 
-                            if job.status == ScheduleStatus.COMPLETED and job.render_time_seconds]
-            
-            if completed_jobs:
-                self.stats.average_render_time = sum(job.render_time_seconds for job in completed_jobs) / len(completed_jobs)
-                self.stats.average_file_size_mb = sum(job.file_size_mb or 0 for job in completed_jobs) / len(completed_jobs)
+            if aggregates["count"]:
+                self.stats.average_render_time = aggregates["average_render_time"]
+                self.stats.average_file_size_mb = aggregates["average_file_size_mb"]
             
             # Success rate
             if self.stats.total_jobs > 0:
                 self.stats.success_rate_percent = (self.stats.completed_jobs / self.stats.total_jobs) * 100
             
             # Recent activity
-            if completed_jobs:
-                self.stats.last_job_completion = max(job.completed_at for job in completed_jobs)
+            if aggregates["last_completion"]:
+                self.stats.last_job_completion = aggregates["last_completion"]
             
             # System uptime
             self.stats.system_uptime_hours = (datetime.now() - self.start_time).total_seconds() / 3600
@@ -560,9 +888,9 @@ class VideoScheduler:
         
         try:
             # Component checks
-            health.content_generation = self.content_pipeline is not None
-            health.media_generation = self.media_pipeline is not None
-            health.video_assembly = self.video_assembler is not None
+            health.content_generation = self._has_dependency('content_pipeline')
+            health.media_generation = self._has_dependency('media_pipeline')
+            health.video_assembly = self._has_dependency('video_assembler')
             
             # Resource checks
             health.disk_space_gb = shutil.disk_usage('.').free / (1024**3)
@@ -578,10 +906,8 @@ class VideoScheduler:
             
             # Queue status
             health.pending_jobs = self.stats.pending_jobs
-            health.failed_jobs_24h = sum(1 for job in self.job_history 
-                                       if (job.status == ScheduleStatus.FAILED and 
-                                           job.completed_at and 
-                                           job.completed_at > datetime.now() - timedelta(hours=24)))
+            health.failed_jobs_24h = self.job_store.count(ScheduleStatus.FAILED,
+                                                          since=datetime.now() - timedelta(hours=24))
             
             # Performance
             health.success_rate_24h = self.stats.success_rate_percent
@@ -608,6 +934,45 @@ class VideoScheduler:
             health.alerts.append(f"Health check failed: {e}")
             return health
     
+    def _record_job_metrics(self, outcome: str, seconds: float, job: VideoJob) -> None:
+        metrics.counter("video_ai_jobs_total", "Finished job attempts by outcome", ["outcome"]).labels(
+            outcome=outcome).inc()
+        metrics.histogram("video_ai_job_seconds", "Wall time per job attempt", ["outcome"]).labels(
+            outcome=outcome).observe(seconds)
+        if outcome == "completed" and job.video_duration_seconds:
+            metrics.counter("video_ai_video_seconds_total", "Seconds of finished video produced").inc(
+                job.video_duration_seconds)
+    
+    def _publish_metrics(self, health: Optional[HealthCheck] = None) -> None:
+        """Copy scheduler state into gauges (housekeeping; scrapes only read the registry)"""
+        try:
+            queue = self.get_queue_metrics()
+            jobs = metrics.gauge("video_ai_queue_jobs", "Jobs in the scheduler queue by state", ["state"])
+            jobs.labels(state="pending").set(queue.pending_count)
+            jobs.labels(state="running").set(queue.running_count)
+            metrics.gauge("video_ai_jobs_completed_today", "Jobs completed since midnight").set(queue.completed_today)
+            metrics.gauge("video_ai_jobs_failed_today", "Jobs failed since midnight").set(queue.failed_today)
+            metrics.gauge("video_ai_success_rate_percent", "Completed / total jobs").set(self.stats.success_rate_percent)
+            metrics.gauge("video_ai_average_render_seconds", "Average render time of completed jobs").set(
+                self.stats.average_render_time)
+            metrics.gauge("video_ai_uptime_hours", "Scheduler uptime").set(self.stats.system_uptime_hours)
+            
+            utilization = metrics.gauge("video_ai_resource_utilization", "Busy fraction per resource class",
+                                        ["resource"])
+            waits = metrics.gauge("video_ai_resource_wait_seconds", "Cumulative slot wait per resource class",
+                                  ["resource"])
+            for name, usage in self.get_resource_utilization().items():
+                utilization.labels(resource=name).set(usage["utilization"])
+                waits.labels(resource=name).set(usage["wait_seconds"])
+            
+            if health is not None:
+                metrics.gauge("video_ai_disk_free_gb", "Free disk space").set(health.disk_space_gb)
+                metrics.gauge("video_ai_memory_used_percent", "System memory in use").set(health.memory_usage_percent)
+                metrics.gauge("video_ai_healthy", "1 when the last health check was healthy").set(
+                    1 if health.overall_status == "healthy" else 0)
+        except Exception as e:
+            self.logger.debug(f"Metrics publish failed: {e}")
+    
     def get_queue_metrics(self) -> QueueMetrics:
         """Get queue performance metrics"""
         metrics = QueueMetrics()
@@ -619,22 +984,16 @@ class VideoScheduler:
             metrics.running_count = sum(1 for job in self.active_jobs.values() 
                                       if job.status == ScheduleStatus.RUNNING)
             
-            # Today's stats
-            today = datetime.now().date()
-            metrics.completed_today = sum(1 for job in self.job_history 
-                                        if (job.completed_at and 
-                                            job.completed_at.date() == today and
-                                            job.status == ScheduleStatus.COMPLETED))
-            metrics.failed_today = sum(1 for job in self.job_history 
-                                     if (job.completed_at and 
-                                         job.completed_at.date() == today and
-                                         job.status == ScheduleStatus.FAILED))
-            
             # Topic distribution
             for job in self.active_jobs.values():
                 category = job.topic_category
                 metrics.topic_distribution[category] = metrics.topic_distribution.get(category, 0) + 1
         
+        # Today's stats
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        metrics.completed_today = self.job_store.count(ScheduleStatus.COMPLETED, since=midnight)
+        metrics.failed_today = self.job_store.count(ScheduleStatus.FAILED, since=midnight)
+        
         return metrics
     
     def _load_schedules(self) -> None:
@@ -666,34 +1025,40 @@ class VideoScheduler:
             self.logger.error(f"Failed to save schedule {schedule_id}: {e}")
     
     def _load_jobs(self) -> None:
-        """Load job history from disk"""
+        """Load unfinished jobs from the job store (migrating legacy JSON history once)"""
         try:
-            job_file = self.jobs_dir / "job_history.json"
+            legacy_file = self.jobs_dir / "job_history.json"
+            if legacy_file.exists():
+                imported = self.job_store.import_json_history(legacy_file)
+                self.logger.info(f"Migrated {imported} jobs from job_history.json")
             
-            if job_file.exists():
-                with open(job_file) as f:
-                    data = json.load(f)
-                
-                self.job_history = [VideoJob(**job_data) for job_data in data]
-                self.logger.info(f"Loaded {len(self.job_history)} jobs from history")
+            # Jobs left RUNNING by a previous process were interrupted; queue them again
+            for job in self.job_store.list_by_status(ScheduleStatus.PENDING, ScheduleStatus.RUNNING):
+                if job.status == ScheduleStatus.RUNNING:
+                    job.status = ScheduleStatus.PENDING
+                    job.current_step = "requeued_after_restart"
+                    self.job_store.upsert(job)
+                self.active_jobs[job.id] = job
+            
+            self.logger.info(f"Loaded {len(self.active_jobs)} unfinished jobs from job store")
                 
         except Exception as e:
             self.logger.error(f"Failed to load job history: {e}")
     
     def _save_job(self, job: VideoJob) -> None:
-        """Save job to history file"""
+        """Persist a single job row"""
         try:
             # Update job in memory
             with self.state_lock:
                 if job.id in self.active_jobs:
                     self.active_jobs[job.id] = job
+                queue_owned = job.id in self._queue_owned
             
-            # Save complete history
-            job_file = self.jobs_dir / "job_history.json"
-            
-            with open(job_file, 'w') as f:
-                all_jobs = list(self.active_jobs.values()) + self.job_history
-                json.dump([job.dict() for job in all_jobs], f, indent=2, default=str)
+            # Shared-queue jobs: only outcomes go to local history, never a PENDING/RUNNING
+            # row that _load_jobs would pick up and run again in --mode auto
+            if queue_owned and job.status not in (ScheduleStatus.COMPLETED, ScheduleStatus.FAILED):
+                return
+            self.job_store.upsert(job)
                 
         except Exception as e:
             self.logger.error(f"Failed to save job {job.id}: {e}")
@@ -702,5 +1067,9 @@ class VideoScheduler:
         """Get current automation statistics"""
         self._update_stats()
         return self.stats
+    
+    def get_resource_utilization(self) -> Dict[str, Any]:
+        """Per-resource slot usage for stage pipelining"""
+        return self.resource_slots.get_utilization()
 
 
@@ -0,0 +1,364 @@
+"""
+Worker Pool
+
+Multi-process / multi-host job distribution over a shared directory.
+
+Layout under the shared root:
+    queue/pending/<created_ms>_<job_id>.json   jobs waiting to be claimed
+    queue/claimed/<job_id>.json                jobs owned by a worker
+    queue/done/<job_id>.json, queue/failed/... finished jobs
+    leases/<job_id>.lease                      per-job heartbeat lease
+    leader/leader-<generation>.lease           leader election for schedules
+
+Claims are a single atomic rename (pending -> claimed), so exactly one worker
+wins. Workers renew a lease while running a job; the leader moves claimed
+jobs whose lease expired back to pending. Leases compare wall-clock time,
+so hosts sharing a directory are expected to run NTP.
+
+Only the standard library is used and jobs are plain dicts, so several
+local worker processes can be pointed at a temp directory to exercise it.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SharedJobQueue:
+    """Directory-backed job queue with atomic claims and job leases"""
+
+    def __init__(self, root: Path, lease_ttl_s: float = 60.0):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.lease_ttl_s = float(lease_ttl_s)
+        self.pending_dir = self.root / 'queue' / 'pending'
+        self.claimed_dir = self.root / 'queue' / 'claimed'
+        self.done_dir = self.root / 'queue' / 'done'
+        self.failed_dir = self.root / 'queue' / 'failed'
+        self.leases_dir = self.root / 'leases'
+        for d in [self.pending_dir, self.claimed_dir, self.done_dir, self.failed_dir, self.leases_dir]:
+            d.mkdir(parents=True, exist_ok=True)
+        # Reclaimer side: when each claimed job was first seen without a lease
+        self._leaseless_since: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def enqueue(self, job: Dict[str, Any], not_before: float = 0.0) -> str:
+        """Add a job dict (must contain 'id'); eligible once `not_before` (epoch s) has passed"""
+        job = dict(job)
+        job['not_before'] = float(not_before or 0.0)
+        job.setdefault('enqueued_at', time.time())
+        name = f"{int(job['enqueued_at'] * 1000):015d}_{job['id']}.json"
+        _write_json_atomic(self.pending_dir / name, job)
+        return job['id']
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically claim the oldest eligible pending job, or return None"""
+        now = time.time()
+        for path in sorted(self.pending_dir.glob('*.json')):
+            job = _read_json(path)
+            if job is None or float(job.get('not_before') or 0.0) > now:
+                continue
+            target = self.claimed_dir / f"{job['id']}.json"
+            try:
+                os.rename(path, target)
+            except (FileNotFoundError, FileExistsError, PermissionError):
+                continue  # another worker won the race
+            self._write_lease(job['id'], worker_id)
+            job['claimed_by'] = worker_id
+            return job
+        return None
+
+    def heartbeat(self, worker_id: str, job_id: str) -> bool:
+        """Extend the lease; False if the job is no longer ours (reclaimed)"""
+        lease = _read_json(self.leases_dir / f"{job_id}.lease")
+        if not lease or lease.get('worker_id') != worker_id:
+            return False
+        if not (self.claimed_dir / f"{job_id}.json").exists():
+            return False
+        self._write_lease(job_id, worker_id)
+        return True
+
+    def complete(self, worker_id: str, job: Dict[str, Any], success: bool) -> bool:
+        """Move an owned job to done/ or failed/ with its final state"""
+        dest_dir = self.done_dir if success else self.failed_dir
+        return self._release(worker_id, job, dest_dir / f"{job['id']}.json")
+
+    def requeue(self, worker_id: str, job: Dict[str, Any], not_before: float = 0.0) -> bool:
+        """Give an owned job back to the queue (e.g. retry with backoff)"""
+        job = dict(job)
+        job['not_before'] = float(not_before or 0.0)
+        job['enqueued_at'] = time.time()
+        name = f"{int(job['enqueued_at'] * 1000):015d}_{job['id']}.json"
+        return self._release(worker_id, job, self.pending_dir / name)
+
+    def _release(self, worker_id: str, job: Dict[str, Any], dest: Path) -> bool:
+        claimed = self.claimed_dir / f"{job['id']}.json"
+        lease = _read_json(self.leases_dir / f"{job['id']}.lease")
+        if not claimed.exists() or not lease or lease.get('worker_id') != worker_id:
+            self.logger.warning(f"Job {job['id']} is no longer owned by {worker_id}; result discarded")
+            return False
+        _write_json_atomic(claimed, job)
+        try:
+            os.rename(claimed, dest)
+        except FileNotFoundError:
+            return False
+        self._remove_lease(job['id'])
+        return True
+
+    # ------------------------------------------------------------------
+    # Leader side
+    # ------------------------------------------------------------------
+    def reclaim_expired(self) -> List[str]:
+        """Return jobs whose worker stopped heartbeating to the pending queue"""
+        now = time.time()
+        reclaimed = []
+        leaseless: Dict[str, float] = {}
+        for path in self.claimed_dir.glob('*'):
+            name = path.name
+            if name.startswith('.'):
+                continue
+            if '.reclaim-' in name:
+                # Interrupted reclaim: finish it once it is clearly stale
+                try:
+                    if now - path.stat().st_mtime < self.lease_ttl_s:
+                        continue
+                except FileNotFoundError:
+                    continue  # another reclaimer finished it
+                job_id = name.split('.json', 1)[0]
+            else:
+                job_id = path.stem
+                lease = _read_json(self.leases_dir / f"{job_id}.lease")
+                if lease:
+                    expires = float(lease['expires_at'])
+                else:
+                    # The claimer renames first and writes the lease right after, and the
+                    # rename keeps the enqueue-time mtime; so a lease-less claim only
+                    # expires a full TTL after this reclaimer first saw it without one
+                    leaseless[job_id] = self._leaseless_since.get(job_id, now)
+                    expires = leaseless[job_id] + self.lease_ttl_s
+                if expires > now:
+                    continue
+            staging = self.claimed_dir / f"{job_id}.json.reclaim-{uuid.uuid4().hex[:8]}"
+            try:
+                os.rename(path, staging)  # atomic: only one reclaimer proceeds
+            except FileNotFoundError:
+                continue
+            job = _read_json(staging) or {'id': job_id}
+            job['reclaim_count'] = int(job.get('reclaim_count', 0)) + 1
+            job['current_step'] = 'reclaimed'
+            job.pop('claimed_by', None)
+            # Drop the stale lease before the job is claimable again, or it could
+            # delete the lease of the next worker to claim it
+            self._remove_lease(job_id)
+            leaseless.pop(job_id, None)
+            self.enqueue(job)
+            staging.unlink(missing_ok=True)
+            reclaimed.append(job_id)
+            self.logger.warning(f"Reclaimed job {job_id} from an expired lease")
+        self._leaseless_since = leaseless
+        return reclaimed
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            'pending': sum(1 for _ in self.pending_dir.glob('*.json')),
+            'claimed': sum(1 for _ in self.claimed_dir.glob('*.json')),
+            'done': sum(1 for _ in self.done_dir.glob('*.json')),
+            'failed': sum(1 for _ in self.failed_dir.glob('*.json')),
+        }
+
+    # ------------------------------------------------------------------
+    def _write_lease(self, job_id: str, worker_id: str) -> None:
+        _write_json_atomic(self.leases_dir / f"{job_id}.lease", {
+            'job_id': job_id,
+            'worker_id': worker_id,
+            'expires_at': time.time() + self.lease_ttl_s,
+        })
+
+    def _remove_lease(self, job_id: str) -> None:
+        try:
+            (self.leases_dir / f"{job_id}.lease").unlink()
+        except FileNotFoundError:
+            pass
+
+
+class LeaderLease:
+    """Generation-numbered leader lease; exactly one live leader per directory.
+
+    Taking over creates `leader-<gen+1>.lease` with O_EXCL, so concurrent
+    candidates cannot both win. A leader only acts while its generation is
+    the highest one present and unexpired.
+    """
+
+    def __init__(self, root: Path, worker_id: str, ttl_s: float = 30.0):
+        self.dir = Path(root) / 'leader'
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.worker_id = worker_id
+        self.ttl_s = float(ttl_s)
+        self.generation: Optional[int] = None
+
+    def _current(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+        gens = []
+        for p in self.dir.glob('leader-*.lease'):
+            try:
+                gens.append(int(p.stem.split('-', 1)[1]))
+            except ValueError:
+                continue
+        if not gens:
+            return 0, None
+        gen = max(gens)
+        return gen, _read_json(self.dir / f"leader-{gen}.lease")
+
+    def try_acquire(self) -> bool:
+        """Acquire or renew leadership; returns True while we are the leader"""
+        now = time.time()
+        gen, lease = self._current()
+        if lease and lease.get('worker_id') == self.worker_id and gen == self.generation:
+            _write_json_atomic(self.dir / f"leader-{gen}.lease",
+                               {'worker_id': self.worker_id, 'expires_at': now + self.ttl_s})
+            return True
+        self.generation = None
+        if lease is not None and float(lease.get('expires_at', 0)) > now:
+            return False
+        if lease is None and gen:
+            path = self.dir / f"leader-{gen}.lease"
+            try:
+                if now - path.stat().st_mtime < self.ttl_s:
+                    return False  # being written right now
+            except FileNotFoundError:
+                pass
+        new_gen = gen + 1
+        try:
+            fd = os.open(str(self.dir / f"leader-{new_gen}.lease"), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'worker_id': self.worker_id, 'expires_at': now + self.ttl_s}, f)
+        self.generation = new_gen
+        # Old generations are no longer authoritative
+        for p in self.dir.glob('leader-*.lease'):
+            if p.name != f"leader-{new_gen}.lease":
+                p.unlink(missing_ok=True)
+        return True
+
+    def release(self) -> None:
+        if self.generation is not None:
+            (self.dir / f"leader-{self.generation}.lease").unlink(missing_ok=True)
+            self.generation = None
+
+
+# execute(job) -> (outcome, job_dict, not_before); outcome is "completed" | "failed" | "retry"
+ExecuteFn = Callable[[Dict[str, Any]], Awaitable[Tuple[str, Dict[str, Any], float]]]
+
+
+class QueueWorker:
+    """Claims jobs from a SharedJobQueue and runs them with lease heartbeats"""
+
+    def __init__(self, root: Path, execute: ExecuteFn,
+                 worker_id: Optional[str] = None,
+                 leader_tick: Optional[Callable[[bool], Awaitable[None]]] = None,  # arg: newly elected
+                 lease_ttl_s: float = 60.0, poll_interval_s: float = 2.0):
+        self.logger = logging.getLogger(__name__)
+        self.worker_id = worker_id or default_worker_id()
+        self.queue = SharedJobQueue(root, lease_ttl_s=lease_ttl_s)
+        self.leader = LeaderLease(root, self.worker_id, ttl_s=lease_ttl_s / 2)
+        self.execute = execute
+        self.leader_tick = leader_tick
+        self.poll_interval_s = float(poll_interval_s)
+        self.is_running = False
+        self._was_leader = False
+
+    async def run(self, max_jobs: Optional[int] = None) -> int:
+        """Worker loop; returns the number of jobs processed"""
+        self.is_running = True
+        processed = 0
+        self.logger.info(f"Worker {self.worker_id} started on {self.queue.root}")
+        try:
+            while self.is_running and (max_jobs is None or processed < max_jobs):
+                await self._leader_duties()
+                job = self.queue.claim(self.worker_id)
+                if job is None:
+                    await asyncio.sleep(self.poll_interval_s)
+                    continue
+                await self._run_job(job)
+                processed += 1
+        finally:
+            self.leader.release()
+            self.is_running = False
+            self.logger.info(f"Worker {self.worker_id} stopped after {processed} jobs")
+        return processed
+
+    def stop(self) -> None:
+        self.is_running = False
+
+    async def _leader_duties(self) -> None:
+        is_leader = self.leader.try_acquire()
+        newly_elected = is_leader and not self._was_leader
+        if newly_elected:
+            self.logger.info(f"Worker {self.worker_id} became leader")
+        self._was_leader = is_leader
+        if not is_leader:
+            return
+        self.queue.reclaim_expired()
+        if self.leader_tick:
+            try:
+                await self.leader_tick(newly_elected)
+            except Exception as e:
+                self.logger.error(f"Leader tick failed: {e}")
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        job_id = job['id']
+        self.logger.info(f"Worker {self.worker_id} claimed job {job_id}")
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            outcome, result, not_before = await self.execute(job)
+        except Exception as e:
+            self.logger.error(f"Job {job_id} crashed in worker: {e}")
+            outcome, result, not_before = "failed", dict(job, error_message=str(e)), 0.0
+        finally:
+            heartbeat.cancel()
+        if outcome == "retry":
+            self.queue.requeue(self.worker_id, result, not_before)
+        else:
+            self.queue.complete(self.worker_id, result, success=(outcome == "completed"))
+
+    async def _heartbeat(self, job_id: str) -> None:
+        interval = max(1.0, self.queue.lease_ttl_s / 3)
+        while True:
+            await asyncio.sleep(interval)
+            if not self.queue.heartbeat(self.worker_id, job_id):
+                self.logger.warning(f"Lost lease on job {job_id}")
+                return
+            # Leader duties continue while this worker is busy with a long job
+            await self._leader_duties()
@@ -10,38 +10,54 @@ from __future__ import annotations
 from typing import List, Dict, Any, Optional
 import logging
 
+from .script_index import ScriptIndex
+
 
 logger = logging.getLogger(__name__)
 
 
-def force_align(audio_path: str, script_text: str, mode: str = "heuristic") -> Dict[str, Any]:
+def force_align(audio_path: str, script_text: str, mode: str = "heuristic",
+                index: Optional[ScriptIndex] = None) -> Dict[str, Any]:
     """Return alignment data.
 
     Stub: returns sentence-level boundaries via simple heuristics if an external
-    aligner is not available. Structure is intentionally generic.
+    aligner is not available. Structure is intentionally generic. Token indexes
+    follow `index` (built from `script_text` if not given); spans carry
+    start_s/end_s when the index has token times.
     """
-    # Heuristic fallback
-    sentences = [s.strip() for s in script_text.replace('\n', ' ').split('.') if s.strip()]
-    num = max(1, len(sentences))
-    # Without audio decoding here, we return indexes only; mapping to time is a
-    # separate step that will use the actual audio duration in the pipeline.
+    if index is None:
+        index = ScriptIndex.from_text(script_text)
     spans = []
-    token_cursor = 0
-    for s in sentences:
-        tokens = s.split()
-        start = token_cursor
-        end = token_cursor + max(1, len(tokens))
-        spans.append({"start_token": start, "end_token": end, "text": s})
-        token_cursor = end + 1
+    for start, end in index.sentences:
+        span = {"start_token": start, "end_token": end, "text": index.span_text(start, end)}
+        if index.has_times:
+            span["start_s"], span["end_s"] = index.span_times(start, end)
+        spans.append(span)
     return {"granularity": "sentence", "spans": spans}
 
 
-def map_beats_to_times(beats: List[Dict[str, Any]], alignment_data: Dict[str, Any], total_audio_seconds: float) -> List[Dict[str, Any]]:
+def map_beats_to_times(beats: List[Dict[str, Any]], alignment_data: Dict[str, Any], total_audio_seconds: float,
+                       index: Optional[ScriptIndex] = None) -> List[Dict[str, Any]]:
     """Map beat narration spans to approximate start/end times.
 
-    If we have sentence spans, assign each beat a time window proportional to
-    its token length. Ensures non-overlapping, contiguous coverage of audio.
+    With a timed `index`, beats take the times of their token spans. Otherwise
+    each beat gets a time window proportional to its token length. Ensures
+    non-overlapping, contiguous coverage of audio.
     """
+    if index is not None and index.has_times and beats:
+        result = []
+        t = 0.0
+        for b in beats:
+            span = b.get("narration_span", {})
+            end_s = min(total_audio_seconds, max(t, index.time_at(int(span.get("end_token", 0)))))
+            out = dict(b)
+            out["start_s"] = float(t)
+            out["end_s"] = float(end_s)
+            result.append(out)
+            t = end_s
+        result[-1]["end_s"] = float(total_audio_seconds)
+        return result
+
     # Compute token lengths per beat
     total_tokens = 0
     beat_tokens = []
@@ -2,9 +2,11 @@
 
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
 
+from .script_index import ScriptIndex
+
 
 class ContentType(str, Enum):
     """Types of content that can be generated"""
@@ -98,6 +100,7 @@ class VideoScript(BaseModel):
     total_duration: float  # Seconds
     total_word_count: int
     image_prompts: List[ImagePrompt] = []
+    _script_index: Optional[ScriptIndex] = PrivateAttr(default=None)
     
     def get_full_script_text(self) -> str:
         """Get the complete script as a single text"""
@@ -105,6 +108,12 @@ class VideoScript(BaseModel):
         parts.extend([chapter.script_text for chapter in self.chapters])
         parts.append(self.conclusion)
         return "\n\n".join(parts)
+
+    def get_script_index(self) -> ScriptIndex:
+        """Tokenized full script, built on first use (the script is final once generated)"""
+        if self._script_index is None:
+            self._script_index = ScriptIndex.from_text(self.get_full_script_text())
+        return self._script_index
     
     def get_chapter_at_time(self, timestamp: float) -> Optional[Chapter]:
         """Get the chapter that's playing at a specific timestamp"""
@@ -14,6 +14,7 @@ from .visual_planner import VisualPlanner
 from .alignment import force_align, map_beats_to_times
 from ..media_generation.image_prompt_builder import build_prompts
 from .topic_queue import TopicQueue, TopicItem
+from ..utils import tracing
 
 
 class ContentPipeline:
@@ -33,10 +34,16 @@ class ContentPipeline:
         self.output_dir = Path(config.paths.output)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
+    @tracing.traced("content.generate")
     async def generate_content(self, topic: Optional[str] = None, 
                              subtopic: Optional[str] = None,
-                             progress_callback=None) -> ContentGenerationResult:
-        """Generate complete content for a video"""
+                             progress_callback=None,
+                             narration_sink=None) -> ContentGenerationResult:
+        """Generate complete content for a video.
+        
+        `narration_sink` is handed to the script generator so narration can be
+        synthesized while later beats are still being written.
+        """
         
         start_time = datetime.now()
         
@@ -68,14 +75,18 @@ class ContentPipeline:
             if progress_callback:
                 progress_callback(10, "Researching topic...")
             self.logger.info("Step 1: Researching topic...")
-            async with self.research_engine:
-                research_report = await self.research_engine.research_topic(request)
+            with tracing.span("content.research", topic=request.topic, subtopic=request.subtopic):
+                async with self.research_engine:
+                    research_report = await self.research_engine.research_topic(request)
             
             # Step 2: Generate script
             if progress_callback:
                 progress_callback(50, "Generating script...")
             self.logger.info("Step 2: Generating script...")
-            video_script = await self.script_generator.generate_script(research_report, request)
+            with tracing.span("content.script", target_minutes=request.target_length_minutes):
+                video_script = await self.script_generator.generate_script(
+                    research_report, request, narration_sink=narration_sink
+                )
             # Detailed logging for verification
             try:
                 self.logger.info(
@@ -85,7 +96,7 @@ class ContentPipeline:
                 logs_dir = Path(getattr(self.config.paths, 'output', './output')) / 'content_results'
                 logs_dir.mkdir(parents=True, exist_ok=True)
                 script_dump = logs_dir / f"{request.topic}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_script.txt"
-                script_dump.write_text(video_script.get_full_script_text(), encoding='utf-8')
+                script_dump.write_text(video_script.get_script_index().text, encoding='utf-8')
                 self.logger.info(f"Full narration saved to: {script_dump}")
             except Exception as e:
                 self.logger.warning(f"Failed to dump full script text: {e}")
@@ -96,7 +107,8 @@ class ContentPipeline:
                     progress_callback(60, "Planning visuals...")
                 self.logger.info("Step 3: Planning visuals (visual planner enabled)...")
                 # Phase wiring (non-invasive): produce plan artifact
-                plan = self.visual_planner.plan_visuals(script_text=video_script.get_full_script_text(), topic=request.topic)
+                with tracing.span("content.visual_plan"):
+                    plan = self.visual_planner.plan_visuals(topic=request.topic, index=video_script.get_script_index())
                 try:
                     self.logger.info(f"Visual plan: beats={len(plan.beats)}, entities={len(plan.entities)}")
                 except Exception:
@@ -105,6 +117,7 @@ class ContentPipeline:
                 run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
                 art_dir = Path(getattr(self.config.visual_planner, 'artifacts_dir', './output/artifacts')) / run_id
                 art_dir.mkdir(parents=True, exist_ok=True)
+                tracing.annotate(run_id=run_id)
                 # Save latest run id for downstream consumers
                 try:
                     latest = Path(getattr(self.config.visual_planner, 'artifacts_dir', './output/artifacts')) / "latest_run_id.txt"
@@ -119,7 +132,8 @@ class ContentPipeline:
                 if progress_callback:
                     progress_callback(65, "Aligning beats to audio (heuristic)...")
                 target_seconds = max(1.0, request.target_length_minutes * 60)
-                alignment_placeholder = force_align("", video_script.get_full_script_text())
+                script_index = video_script.get_script_index()
+                alignment_placeholder = force_align("", script_index.text, index=script_index)
                 (art_dir / "alignment.json").write_text(json.dumps(alignment_placeholder, indent=2), encoding='utf-8')
 
                 beats_with_times = map_beats_to_times([b for b in plan.model_dump()["beats"]], alignment_placeholder, target_seconds)
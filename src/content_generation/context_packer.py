@@ -0,0 +1,115 @@
+"""Token-budgeted research context for LLM prompts
+
+A `ContextPacker` is fitted once per research report on a pool of compiled
+facts/figures/locations (plus source summaries when the corpus has nothing
+for the topic). Each prompt passes its own query (beat title + summary):
+the research corpus's BM25 hits for that query are packed first, then the
+pool, scored with TF-IDF cosine similarity, greedily fills what is left of
+the token budget, so every beat gets the material relevant to it and
+prompts stay small.
+
+Token counts use tiktoken for the target model when installed, otherwise a
+~4 characters/token estimate.
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset({
+    "the", "and", "for", "that", "with", "this", "from", "are", "was", "were", "his", "her",
+    "its", "their", "has", "have", "had", "but", "not", "into", "than", "then", "also", "which",
+    "who", "what", "when", "where", "how", "why", "about", "over", "after", "before", "they",
+})
+
+_encoders: Dict[str, object] = {}
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count for `model` (tiktoken) or a chars/4 estimate"""
+    if not text:
+        return 0
+    key = model or ""
+    encoder = _encoders.get(key)
+    if encoder is None:
+        try:
+            import tiktoken
+            try:
+                encoder = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+            except KeyError:
+                encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            encoder = False
+        _encoders[key] = encoder
+    if encoder:
+        return len(encoder.encode(text))
+    return max(1, (len(text) + 3) // 4)
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 2 and t not in _STOPWORDS]
+
+
+class ContextPacker:
+    """TF-IDF relevance ranking + greedy token-budget packing over a passage pool"""
+
+    def __init__(self, passages: List[str], model: Optional[str] = None):
+        self.logger = logging.getLogger("video_ai.context_packer")
+        self.model = model
+        # Drop exact duplicates, keep first-seen order as the tie-breaker
+        self.passages = [p for p in dict.fromkeys(p.strip() for p in passages) if p]
+        self.token_counts = [count_tokens(p, model) for p in self.passages]
+
+        docs = [Counter(_terms(p)) for p in self.passages]
+        df = Counter(term for doc in docs for term in doc)
+        n = len(docs) or 1
+        self.idf = {term: math.log((1 + n) / (1 + c)) + 1.0 for term, c in df.items()}
+        self.vectors = [self._normalize({t: tf * self.idf[t] for t, tf in doc.items()}) for doc in docs]
+
+    @staticmethod
+    def _normalize(vec: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        return {t: v / norm for t, v in vec.items()} if norm else {}
+
+    def scores(self, query: str) -> List[float]:
+        """Cosine similarity of every pool passage to `query`"""
+        q = self._normalize({t: tf * self.idf.get(t, 0.0) for t, tf in Counter(_terms(query)).items()})
+        if not q:
+            return [0.0] * len(self.passages)
+        return [sum(w * vec.get(t, 0.0) for t, w in q.items()) for vec in self.vectors]
+
+    def pack(self, query: str, budget_tokens: int, prefix: str = "- ",
+             ranked: Optional[List[str]] = None) -> str:
+        """Most relevant passages for `query` whose total fits in `budget_tokens`.
+
+        `ranked` passages (already ordered, e.g. corpus search hits) are taken
+        first in their given order; the pool fills whatever budget is left.
+        """
+        ranked = [p for p in dict.fromkeys(p.strip() for p in (ranked or [])) if p]
+        if (not self.passages and not ranked) or budget_tokens <= 0:
+            return ""
+        candidates = [(p, count_tokens(p, self.model)) for p in ranked]
+        if self.passages:
+            scores = self.scores(query)
+            order = sorted(range(len(self.passages)), key=lambda i: (-scores[i], i))
+            if scores[order[0]] > 0:
+                # Don't pad the prompt with passages that share nothing with the query
+                order = [i for i in order if scores[i] > 0]
+            seen = set(ranked)
+            candidates.extend((self.passages[i], self.token_counts[i]) for i in order
+                              if self.passages[i] not in seen)
+        prefix_tokens = count_tokens(prefix, self.model) if prefix else 0
+
+        chosen, used = [], 0
+        for text, tokens in candidates:
+            cost = tokens + prefix_tokens + 1
+            if used + cost > budget_tokens:
+                continue  # a shorter, lower-ranked passage may still fit
+            chosen.append(text)
+            used += cost
+        return "\n".join(f"{prefix}{text}" for text in chosen)
@@ -0,0 +1,115 @@
+"""On-disk HTTP response cache for research fetches
+
+Responses are keyed by URL + sorted query params and stored as
+<root>/<key[:2]>/<key>.body with a JSON sidecar holding the validators
+(ETag / Last-Modified), the fetch time and the TTL class. Fresh entries are
+served without touching the network; stale ones are revalidated with a
+conditional request and a 304 just refreshes the timestamp.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..utils import metrics
+
+
+# TTL class -> seconds
+DEFAULT_TTLS = {
+    "rss": 30 * 60,
+    "academic": 24 * 3600,
+    "encyclopedia": 7 * 24 * 3600,
+    "default": 3600,
+}
+
+
+# stats key -> metric label (hit ratio counts hit + revalidated)
+_RESULT_LABELS = {"hits": "hit", "revalidated": "revalidated", "misses": "miss", "stale_served": "stale"}
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return hashlib.sha256(json.dumps([url, items]).encode("utf-8")).hexdigest()
+
+
+class HttpCache:
+    """File-per-response cache with TTL classes and HTTP validators"""
+
+    def __init__(self, root: Path, ttls: Optional[Dict[str, float]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stale_served": 0}
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup outcome (hits / revalidated / misses / stale_served)"""
+        self.stats[outcome] += 1
+        metrics.cache_requests().labels(cache="http", result=_RESULT_LABELS[outcome]).inc()
+
+    def _paths(self, key: str):
+        folder = self.root / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def ttl_for(self, ttl_class: Optional[str]) -> float:
+        return float(self.ttls.get(ttl_class or "default", self.ttls["default"]))
+
+    # ------------------------------------------------------------------
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return {'meta': ..., 'body': bytes} or None"""
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, json.JSONDecodeError):
+            return None
+        return {"meta": meta, "body": body}
+
+    def is_fresh(self, entry: Dict[str, Any], ttl_class: Optional[str]) -> bool:
+        return time.time() - float(entry["meta"].get("fetched_at", 0)) < self.ttl_for(ttl_class)
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            meta = entry["meta"]
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, key: str, url: str, body: bytes, headers: Dict[str, str], ttl_class: Optional[str]) -> None:
+        meta_path, body_path = self._paths(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "ttl_class": ttl_class,
+            "fetched_at": time.time(),
+        }
+        # Body first, then the sidecar: a sidecar always points at a complete body
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def touch(self, key: str, entry: Dict[str, Any]) -> None:
+        """Mark a revalidated (304) entry fresh again"""
+        meta_path, _ = self._paths(key)
+        meta = dict(entry["meta"], fetched_at=time.time())
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
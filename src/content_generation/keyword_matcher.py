@@ -0,0 +1,166 @@
+"""Compiled keyword matching for research relevance and extraction
+
+One compiled regex alternation per (topic, subtopic) holds every keyword the
+research engine looks for: the topic/subtopic names, the built-in relevance,
+scoring and concept tables, `config.topics[*].keywords` and the fact trigger
+words. `TopicMatcher.analyze()` scans the text once with that regex and once
+with a single combined regex for figure/location candidates, and
+returns everything enrichment needs, so cost stays linear in corpus size no
+matter how many keywords are configured.
+
+Matching is case-insensitive substring matching, the same semantics as the
+`keyword in text.lower()` checks it replaces.
+"""
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Built-in tables (topic -> keywords)
+RELEVANCE_KEYWORDS = {
+    "mythology": ["myth", "legend", "god", "goddess", "ancient", "story"],
+    "space": ["space", "planet", "star", "galaxy", "cosmic", "universe"],
+    "history": ["historical", "ancient", "empire", "civilization", "era"],
+    "science": ["research", "study", "discovery", "scientific", "experiment"],
+}
+
+SCORE_KEYWORDS = {
+    "mythology": ["myth", "legend", "god", "goddess", "ancient"],
+    "space": ["space", "planet", "star", "galaxy", "cosmic"],
+    "history": ["historical", "ancient", "empire", "civilization"],
+    "science": ["research", "study", "discovery", "scientific"],
+}
+
+CONCEPT_KEYWORDS = {
+    "mythology": ["pantheon", "deity", "legend", "myth", "ritual"],
+    "space": ["galaxy", "planet", "star", "orbit", "cosmic"],
+    "history": ["civilization", "empire", "dynasty", "era", "culture"],
+    "science": ["theory", "hypothesis", "experiment", "discovery", "principle"],
+}
+
+FACT_TRIGGERS = ["discovered", "invented", "created", "established", "founded"]
+
+# Figures (titled names, "Firstname Lastname was/is/became") and locations
+# ("in/at/near/from/located Capitalized") in one alternation
+_CANDIDATES_RE = re.compile(
+    r"(?P<title>King|Queen|Emperor|President|Dr\.|Professor|Sir|Lord) (?P<titled>\w+ \w+)"
+    r"|(?P<name>[A-Z][a-z]+ [A-Z][a-z]+) (?:was|is|became)"
+    r"|\b(?i:in|at|near|from|located)\s+(?P<place>[A-Z][^\s.,;:!?()\"']{3,})"
+)
+
+
+class KeywordRegex:
+    """Multi-pattern substring matcher; each pattern carries a set of labels.
+
+    One compiled alternation inside a lookahead, tried at every position, so
+    overlapping occurrences are found ("god" in "demigod", "era" in "federal").
+    At a given position the alternation reports only the longest pattern, so
+    every shorter pattern that is a prefix of it is reported alongside.
+    """
+
+    def __init__(self, patterns: Dict[str, Set[str]]):
+        self._labels = {p: set(labels) for p, labels in patterns.items() if p}
+        ordered = sorted(self._labels, key=len, reverse=True)
+        self._prefixes = {p: [q for q in ordered if q != p and p.startswith(q)] for p in ordered}
+        self._regex = (re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+                       if ordered else None)
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, str, Set[str]]]:
+        """Yield (end_index, pattern, labels) for every occurrence in `text`"""
+        if self._regex is None:
+            return
+        labels, prefixes = self._labels, self._prefixes
+        for m in self._regex.finditer(text):
+            start, pattern = m.start(), m.group(1)
+            yield start + len(pattern) - 1, pattern, labels[pattern]
+            for prefix in prefixes[pattern]:
+                yield start + len(prefix) - 1, prefix, labels[prefix]
+
+
+@dataclass
+class TextAnalysis:
+    """Everything one pass over a text produced"""
+    matched: Dict[str, Set[str]] = field(default_factory=dict)  # label -> patterns
+    fact_sentences: List[str] = field(default_factory=list)
+    figures: List[str] = field(default_factory=list)
+    locations: List[str] = field(default_factory=list)
+
+    def has(self, label: str) -> bool:
+        return bool(self.matched.get(label))
+
+    def patterns(self, label: str) -> Set[str]:
+        return self.matched.get(label, set())
+
+
+class TopicMatcher:
+    """Compiled matcher for one topic (+ optional subtopic)"""
+
+    def __init__(self, topic: str, subtopic: Optional[str] = None,
+                 config_keywords: Optional[Iterable[str]] = None):
+        self.topic = topic
+        self.subtopic = subtopic
+        self.concepts = list(CONCEPT_KEYWORDS.get(topic, []))
+
+        extra = [k.lower() for k in (config_keywords or []) if k]
+        tables = {
+            "topic": [topic.lower()],
+            "subtopic": [subtopic.lower()] if subtopic else [],
+            "relevance": RELEVANCE_KEYWORDS.get(topic, []) + extra,
+            "score": SCORE_KEYWORDS.get(topic, []) + extra,
+            "concept": self.concepts,
+            "fact": FACT_TRIGGERS,
+        }
+        patterns: Dict[str, Set[str]] = {}
+        for label, words in tables.items():
+            for word in words:
+                patterns.setdefault(word, set()).add(label)
+        self._keywords = KeywordRegex(patterns)
+
+    def analyze(self, text: str, max_fact_sentences: int = 10) -> TextAnalysis:
+        analysis = TextAnalysis()
+        if not text:
+            return analysis
+
+        # Sentence boundaries use the same '.' split as the old extractor
+        dots = [i for i, ch in enumerate(text) if ch == '.']
+        fact_sentence_ids: Set[int] = set()
+
+        for end, pattern, labels in self._keywords.iter_matches(text.lower()):
+            for label in labels:
+                analysis.matched.setdefault(label, set()).add(pattern)
+            if "fact" in labels:
+                # '.' never occurs inside the trigger words, so the match sits in one sentence
+                sentence_id = bisect_left(dots, end)
+                if sentence_id < max_fact_sentences:
+                    fact_sentence_ids.add(sentence_id)
+
+        for sentence_id in sorted(fact_sentence_ids):
+            start = dots[sentence_id - 1] + 1 if sentence_id else 0
+            stop = dots[sentence_id] if sentence_id < len(dots) else len(text)
+            sentence = text[start:stop].strip()
+            if len(sentence) > 50:
+                analysis.fact_sentences.append(sentence)
+
+        for m in _CANDIDATES_RE.finditer(text):
+            if m.group("title"):
+                analysis.figures.append(f"{m.group('title')} {m.group('titled')}")
+            elif m.group("name"):
+                analysis.figures.append(m.group("name"))
+            else:
+                analysis.locations.append(m.group("place"))
+
+        return analysis
+
+    def relevance(self, analysis: TextAnalysis) -> float:
+        score = 0.0
+        if analysis.has("topic"):
+            score += 0.5
+        if analysis.has("subtopic"):
+            score += 0.3
+        score += min(len(analysis.patterns("score")) * 0.1, 0.2)
+        return min(score, 1.0)
+
+    def is_relevant(self, analysis: TextAnalysis) -> bool:
+        return analysis.has("topic") or analysis.has("subtopic") or analysis.has("relevance")
@@ -0,0 +1,258 @@
+"""Persistent local research corpus (SQLite FTS5)
+
+Every fetched source is stored once and chunked into sentence-aligned
+passages indexed with FTS5 (porter stemming). Research for a topic reads
+the corpus first and only goes to the network for source families that
+have no fresh coverage; prompts are built from the BM25-ranked passages
+rather than the first N characters of a summary.
+
+Falls back to a plain table with naive term-count ranking when the SQLite
+build lacks FTS5.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, Iterable, List, Optional
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_TERM_RE = re.compile(r"[A-Za-z0-9]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    source_key TEXT UNIQUE NOT NULL,
+    origin TEXT,
+    topic TEXT,
+    subtopic TEXT,
+    title TEXT,
+    url TEXT,
+    source_type TEXT,
+    credibility REAL,
+    relevance REAL,
+    content TEXT,
+    content_hash TEXT,
+    fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sources_topic ON sources(topic, subtopic, origin);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text, title, topic UNINDEXED, source_id UNINDEXED, tokenize='porter unicode61'
+);
+"""
+
+_PLAIN_SCHEMA = """
+CREATE TABLE IF NOT EXISTS passages (text TEXT, title TEXT, topic TEXT, source_id INTEGER);
+CREATE INDEX IF NOT EXISTS idx_passages_source ON passages(source_id);
+"""
+
+_open_corpora: Dict[str, "ResearchCorpus"] = {}
+
+
+def chunk_passages(text: str, max_chars: int = 700) -> List[str]:
+    """Greedy sentence packing into passages of at most ~max_chars"""
+    passages, current = [], ""
+    for sentence in _SENTENCE_RE.split(text or ""):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            passages.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        passages.append(current)
+    return passages
+
+
+def open_corpus(config) -> Optional["ResearchCorpus"]:
+    """Shared corpus for the configured data dir (None if disabled)"""
+    research_cfg = getattr(config, 'research', None)
+    if not getattr(research_cfg, 'corpus_enabled', True):
+        return None
+    data_dir = getattr(getattr(config, 'paths', None), 'data', './data')
+    db_path = str(Path(data_dir) / 'research_corpus.db')
+    corpus = _open_corpora.get(db_path)
+    if corpus is None:
+        corpus = ResearchCorpus(Path(db_path))
+        _open_corpora[db_path] = corpus
+    return corpus
+
+
+class ResearchCorpus:
+    """SQLite-backed source store with BM25 passage retrieval"""
+
+    def __init__(self, db_path: Path, passage_chars: int = 700):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.passage_chars = passage_chars
+
+        self._lock = RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.logger.warning("SQLite FTS5 unavailable; research corpus uses naive ranking")
+            self._conn.executescript(_PLAIN_SCHEMA)
+            self.fts = False
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    @staticmethod
+    def source_key(url: Optional[str], title: str, origin: Optional[str]) -> str:
+        return url or hashlib.sha1(f"{origin}:{title}".encode("utf-8")).hexdigest()
+
+    def add_sources(self, sources: Iterable[Dict[str, Any]], topic: str,
+                    subtopic: Optional[str] = None) -> int:
+        """Insert or refresh sources; passages are rebuilt only when content changed.
+
+        Each source dict has title, content and optionally url, origin,
+        source_type, credibility and relevance. Returns the number of sources (re)indexed.
+        """
+        changed = 0
+        now = time.time()
+        with self._lock:
+            for src in sources:
+                content = (src.get("content") or "").strip()
+                if not content:
+                    continue
+                key = f"{topic}|{subtopic or ''}|" + self.source_key(src.get("url"), src.get("title", ""), src.get("origin"))
+                digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+                row = self._conn.execute(
+                    "SELECT id, content_hash FROM sources WHERE source_key=?", (key,)
+                ).fetchone()
+                if row and row["content_hash"] == digest:
+                    self._conn.execute("UPDATE sources SET fetched_at=? WHERE id=?", (now, row["id"]))
+                    continue
+                values = (src.get("origin"), topic, subtopic, src.get("title"), src.get("url"),
+                          src.get("source_type"), src.get("credibility"), src.get("relevance"),
+                          content, digest, now)
+                if row:
+                    source_id = row["id"]
+                    self._conn.execute(
+                        "UPDATE sources SET origin=?, topic=?, subtopic=?, title=?, url=?, source_type=?, "
+                        "credibility=?, relevance=?, content=?, content_hash=?, fetched_at=? WHERE id=?",
+                        values + (source_id,),
+                    )
+                    self._conn.execute("DELETE FROM passages WHERE source_id=?", (source_id,))
+                else:
+                    cur = self._conn.execute(
+                        "INSERT INTO sources (source_key, origin, topic, subtopic, title, url, source_type, "
+                        "credibility, relevance, content, content_hash, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key,) + values,
+                    )
+                    source_id = cur.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO passages (text, title, topic, source_id) VALUES (?, ?, ?, ?)",
+                    [(p, src.get("title"), topic, source_id)
+                     for p in chunk_passages(content, self.passage_chars)],
+                )
+                changed += 1
+            self._conn.commit()
+        return changed
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def fresh_origins(self, topic: str, subtopic: Optional[str] = None,
+                      max_age_s: float = 7 * 24 * 3600) -> Dict[str, int]:
+        """origin -> number of sources stored for this topic newer than max_age_s"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT origin, COUNT(*) FROM sources WHERE topic=? AND subtopic IS ? AND fetched_at >= ? "
+                "GROUP BY origin",
+                (topic, subtopic, time.time() - max_age_s),
+            ).fetchall()
+        return {row[0]: int(row[1]) for row in rows}
+
+    def sources_for(self, topic: str, subtopic: Optional[str] = None,
+                    origins: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM sources WHERE topic=? AND subtopic IS ?"
+        params: List[Any] = [topic, subtopic]
+        origins = list(origins or [])
+        if origins:
+            sql += f" AND origin IN ({','.join('?' * len(origins))})"
+            params.extend(origins)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", tuple(params)).fetchall()
+        return [dict(row) for row in rows]
+
+    def passages_for(self, topic: str, subtopic: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        """Passages of the sources stored for a topic/subtopic"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.text, p.title, s.url FROM passages p JOIN sources s ON s.id = p.source_id "
+                "WHERE s.topic=? AND s.subtopic IS ? ORDER BY s.id LIMIT ?",
+                (topic, subtopic, int(limit)),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, query: str, topic: Optional[str] = None, limit: int = 8,
+               subtopic: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top passages for `query` (BM25), optionally restricted to a topic/subtopic"""
+        terms = list(dict.fromkeys(t.lower() for t in _TERM_RE.findall(query or "") if len(t) > 2))
+        if not terms:
+            return []
+        if not self.fts:
+            return self._search_plain(terms, topic, limit, subtopic)
+        match = " OR ".join(f'"{t}"' for t in terms)
+        sql = (
+            "SELECT p.text, p.title, s.url, s.source_type, s.credibility, bm25(passages) AS rank "
+            "FROM passages p JOIN sources s ON s.id = p.source_id WHERE passages MATCH ?"
+        )
+        params: List[Any] = [match]
+        if topic:
+            sql += " AND p.topic = ?"
+            params.append(topic)
+        if subtopic:
+            sql += " AND s.subtopic = ?"
+            params.append(subtopic)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params)).fetchall()
+        # bm25() is lower-is-better; expose a higher-is-better score
+        return [dict(row, score=-row["rank"]) for row in rows]
+
+    def _search_plain(self, terms: List[str], topic: Optional[str], limit: int,
+                      subtopic: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = ("SELECT p.text, p.title, s.url, s.source_type, s.credibility FROM passages p "
+               "JOIN sources s ON s.id = p.source_id WHERE 1=1")
+        params: List[Any] = []
+        if topic:
+            sql += " AND p.topic = ?"
+            params.append(topic)
+        if subtopic:
+            sql += " AND s.subtopic = ?"
+            params.append(subtopic)
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params)).fetchall()
+        scored = []
+        for row in rows:
+            text = row["text"].lower()
+            score = sum(text.count(t) for t in terms)
+            if score:
+                scored.append(dict(row, score=float(score)))
+        scored.sort(key=lambda r: r["score"], reverse=True)
+        return scored[:limit]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -2,10 +2,11 @@
 
 import asyncio
 import logging
-import re
+import json
 from datetime import datetime
-from typing import List, Dict, Optional, Any
-from urllib.parse import quote
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Awaitable, Iterable
+from urllib.parse import quote, urlsplit
 import aiohttp
 import requests
 from bs4 import BeautifulSoup
@@ -16,6 +17,10 @@ from .content_models import (
     ContentGenerationRequest
 )
 from .prompt_templates import PromptTemplates
+from .http_cache import HttpCache, cache_key
+from .keyword_matcher import TopicMatcher, TextAnalysis
+from .research_corpus import open_corpus
+from ..utils import tracing
 
 
 class ResearchEngine:
@@ -26,12 +31,35 @@ class ResearchEngine:
         self.logger = logging.getLogger(__name__)
         self.session = None
         
+        # Fetch concurrency: a global connection cap plus a per-host limit so
+        # one slow/rate-limited API cannot starve the others
+        research_cfg = getattr(config, 'research', None)
+        self.max_concurrent_fetches = int(getattr(research_cfg, 'max_concurrent_fetches', 16) or 16)
+        self.per_host_concurrency = int(getattr(research_cfg, 'per_host_concurrency', 4) or 4)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        # On-disk response cache; offline mode serves only from it
+        self.offline = bool(getattr(research_cfg, 'offline', False))
+        self.http_cache = None
+        if getattr(research_cfg, 'cache_enabled', True) or self.offline:
+            cache_root = Path(getattr(getattr(config, 'paths', None), 'cache', './temp/cache')) / 'research_http'
+            self.http_cache = HttpCache(cache_root, getattr(research_cfg, 'cache_ttl_s', None))
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Local corpus of every fetched source; network only fills gaps
+        self.corpus = open_corpus(config)
+        self.corpus_max_age_s = float(getattr(research_cfg, 'corpus_max_age_days', 7) or 7) * 86400
+        
+        # Compiled keyword automata per (topic, subtopic)
+        self._matchers: Dict[tuple, TopicMatcher] = {}
+        
         # Research source configurations
         self.source_configs = {
             "wikipedia": {
                 "base_url": "https://en.wikipedia.org/api/rest_v1/page/summary/",
                 "search_url": "https://en.wikipedia.org/w/api.php",
-                "credibility": 0.7
+                "credibility": 0.7,
+                "cache_ttl": "encyclopedia"
             },
             "britannica": {
                 "search_url": "https://www.britannica.com/search?query=",
@@ -42,11 +70,13 @@ class ResearchEngine:
                     "https://www.nasa.gov/news/releases/latest/index.html",
                     "https://www.nasa.gov/rss/dyn/breaking_news.rss"
                 ],
-                "credibility": 0.95
+                "credibility": 0.95,
+                "cache_ttl": "rss"
             },
             "scientific_journals": {
                 "base_url": "https://api.crossref.org/works",
-                "credibility": 0.9
+                "credibility": 0.9,
+                "cache_ttl": "academic"
             }
         }
     
@@ -54,6 +84,8 @@ class ResearchEngine:
         """Async context manager entry"""
         self.session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=self.max_concurrent_fetches,
+                                           limit_per_host=self.per_host_concurrency),
             headers={
                 'User-Agent': 'Long-Video-AI-Research/1.0 (Educational Content Generation)'
             }
@@ -65,6 +97,153 @@ class ResearchEngine:
         if self.session:
             await self.session.close()
     
+    # ------------------------------------------------------------------
+    # Local corpus
+    # ------------------------------------------------------------------
+    # Origins backed by real fetches (the others are synthesized placeholders)
+    NETWORK_ORIGINS = ("wikipedia", "nasa", "academic")
+    
+    def _store_in_corpus(self, sources: List[ResearchSource], origin: str, topic: str,
+                         subtopic: Optional[str]) -> None:
+        try:
+            self.corpus.add_sources(
+                [
+                    {
+                        "title": s.title,
+                        "url": s.url,
+                        "origin": origin,
+                        "source_type": s.source_type.value,
+                        "credibility": s.credibility_score,
+                        "relevance": s.relevance_score,
+                        "content": s.content_summary,
+                    }
+                    for s in sources
+                ],
+                topic,
+                subtopic,
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to store {origin} sources in research corpus: {e}")
+    
+    def _sources_from_corpus(self, topic: str, subtopic: Optional[str], origins) -> List[ResearchSource]:
+        sources = []
+        for row in self.corpus.sources_for(topic, subtopic, origins):
+            try:
+                content = row.get("content") or ""
+                sources.append(ResearchSource(
+                    title=row.get("title") or "Unknown",
+                    url=row.get("url"),
+                    source_type=SourceType(row.get("source_type") or SourceType.WEB_RESOURCE.value),
+                    credibility_score=float(row.get("credibility") or 0.5),
+                    content_summary=content,
+                    key_facts=[content[:200] + '...'],
+                    relevance_score=float(row.get("relevance") or 0.5),
+                ))
+            except Exception as e:
+                self.logger.warning(f"Skipping unreadable corpus source: {e}")
+        return sources
+    
+    # ------------------------------------------------------------------
+    # Fetch helpers
+    # ------------------------------------------------------------------
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+    
+    @tracing.traced("research.fetch", cat="http")
+    async def _fetch(self, url: str, params: Optional[Dict[str, Any]] = None, kind: str = "json",
+                     ttl_class: Optional[str] = None) -> Any:
+        """GET through the shared session under the per-host limit, via the disk cache.
+        
+        Returns the decoded body ("json", "text" or "bytes") or None on a non-200.
+        Concurrent requests for the same URL share one fetch.
+        """
+        key = cache_key(url, params)
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_body(key, url, params, ttl_class))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _f, k=key: self._inflight.pop(k, None))
+        body = await asyncio.shield(inflight)
+        if body is None:
+            return None
+        if kind == "json":
+            return json.loads(body)
+        if kind == "text":
+            return body.decode("utf-8", errors="replace")
+        return body
+    
+    async def _fetch_body(self, key: str, url: str, params: Optional[Dict[str, Any]],
+                          ttl_class: Optional[str]) -> Optional[bytes]:
+        cache = self.http_cache
+        entry = await asyncio.to_thread(cache.lookup, key) if cache else None
+        
+        if entry and (self.offline or cache.is_fresh(entry, ttl_class)):
+            cache.record("hits")
+            return entry["body"]
+        if self.offline:
+            self.logger.debug(f"Offline: no cached response for {url}")
+            return None
+        
+        headers = HttpCache.conditional_headers(entry)
+        try:
+            async with self._host_semaphore(url):
+                async with self.session.get(url, params=params, headers=headers) as response:
+                    if response.status == 304 and entry:
+                        cache.record("revalidated")
+                        await asyncio.to_thread(cache.touch, key, entry)
+                        return entry["body"]
+                    if response.status != 200:
+                        self.logger.debug(f"GET {url} -> {response.status}")
+                        if entry:
+                            cache.record("stale_served")
+                            return entry["body"]
+                        return None
+                    body = await response.read()
+                    response_headers = dict(response.headers)
+        except Exception:
+            # Network failure: a stale copy beats no source at all
+            if entry:
+                cache.record("stale_served")
+                return entry["body"]
+            raise
+        
+        if cache:
+            cache.record("misses")
+            try:
+                await asyncio.to_thread(cache.store, key, url, body, response_headers, ttl_class)
+            except Exception as e:
+                self.logger.warning(f"Failed to cache response for {url}: {e}")
+        return body
+    
+    @staticmethod
+    async def _as_completed_ordered(aws: Iterable[Awaitable], on_result=None) -> List[Any]:
+        """Run awaitables concurrently, handing each `(index, result)` to `on_result`
+        as it completes; the returned list keeps submission order (exceptions
+        included) so downstream output stays deterministic."""
+        async def indexed(i, aw):
+            try:
+                return i, await aw
+            except Exception as e:
+                return i, e
+        
+        tasks = [asyncio.ensure_future(indexed(i, aw)) for i, aw in enumerate(aws)]
+        results: List[Any] = [None] * len(tasks)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                i, result = await next_done
+                results[i] = result
+                if on_result is not None:
+                    on_result(i, result)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return results
+    
     async def research_topic(self, request: ContentGenerationRequest) -> ResearchReport:
         """Main research method for any topic"""
         self.logger.info(f"Starting research for topic: {request.topic}")
@@ -75,39 +254,62 @@ class ResearchEngine:
         )
         
         try:
-            # Multi-source research approach
-            tasks = []
+            # Multi-source research approach: (origin, research method) pairs
+            planned = []
             
             # Wikipedia research (always available)
-            tasks.append(self._research_wikipedia(request.topic, request.subtopic))
+            planned.append(("wikipedia", self._research_wikipedia))
             
             # Topic-specific research based on configuration
             topic_config = self.config.get_topic_config(request.topic)
             if topic_config:
                 for source in topic_config.sources:
                     if source == "NASA" and request.topic == "space":
-                        tasks.append(self._research_nasa(request.topic, request.subtopic))
+                        planned.append(("nasa", self._research_nasa))
                     elif source == "academic_papers":
-                        tasks.append(self._research_academic_sources(request.topic, request.subtopic))
+                        planned.append(("academic", self._research_academic_sources))
                     elif source == "historical_texts" and request.topic in ["history", "mythology"]:
-                        tasks.append(self._research_historical_sources(request.topic, request.subtopic))
+                        planned.append(("historical", self._research_historical_sources))
             
             # General web research
-            tasks.append(self._research_web_general(request.topic, request.subtopic))
+            planned.append(("web", self._research_web_general))
+            
+            # Networked origins with fresh local coverage are served from the corpus
+            local_origins = set()
+            if self.corpus:
+                fresh = self.corpus.fresh_origins(request.topic, request.subtopic, self.corpus_max_age_s)
+                local_origins = {origin for origin, _ in planned if origin in self.NETWORK_ORIGINS and fresh.get(origin)}
+                if local_origins:
+                    local_sources = self._sources_from_corpus(request.topic, request.subtopic, local_origins)
+                    research_report.sources.extend(local_sources)
+                    self.logger.info(f"Research corpus: {len(local_sources)} local sources for {sorted(local_origins)}")
             
-            # Execute all research tasks in parallel
-            research_results = await asyncio.gather(*tasks, return_exceptions=True)
+            planned = [(origin, method) for origin, method in planned if origin not in local_origins]
+            tasks = [method(request.topic, request.subtopic) for _, method in planned]
             
-            # Compile results
-            for result in research_results:
+            # Execute all research tasks concurrently; each result is stored and
+            # compiled as it lands while the slower sources are still in flight
+            compiled: List[List[ResearchSource]] = [[] for _ in planned]
+            
+            def on_result(i, result):
+                origin = planned[i][0]
                 if isinstance(result, Exception):
-                    self.logger.warning(f"Research task failed: {result}")
-                    continue
-                    
-                if isinstance(result, list):
-                    research_report.sources.extend(result)
-                elif isinstance(result, ResearchSource):
-                    research_report.sources.append(result)
+                    self.logger.warning(f"Research task failed ({origin}): {result}")
+                    return
+                if isinstance(result, ResearchSource):
+                    result = [result]
+                if not isinstance(result, list):
+                    return
+                self.logger.debug(f"Research task returned {len(result)} sources ({origin})")
+                if self.corpus and origin in self.NETWORK_ORIGINS:
+                    self._store_in_corpus(result, origin, request.topic, request.subtopic)
+                compiled[i] = result
+            
+            await self._as_completed_ordered(tasks, on_result)
+            
+            # Submission order, so the report does not depend on which source answered first
+            for sources in compiled:
+                research_report.sources.extend(sources)
             
             # Process and enrich the research data
             await self._enrich_research_data(research_report, request)
@@ -116,6 +318,8 @@ class ResearchEngine:
             research_report.research_quality_score = self._calculate_quality_score(research_report)
             
             self.logger.info(f"Research completed. Found {len(research_report.sources)} sources")
+            if self.http_cache:
+                self.logger.info(f"Research HTTP cache: {self.http_cache.stats}")
             
         except Exception as e:
             self.logger.error(f"Research failed: {e}")
@@ -132,28 +336,29 @@ class ResearchEngine:
             if subtopic:
                 search_terms.append(f"{topic} {subtopic}")
             
-            for term in search_terms:
-                # Search for articles
+            async def search(term: str) -> List[str]:
                 search_params = {
                     'action': 'opensearch',
                     'search': term,
                     'limit': 5,
                     'format': 'json'
                 }
-                
-                async with self.session.get(
-                    self.source_configs["wikipedia"]["search_url"],
-                    params=search_params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        titles = data[1] if len(data) > 1 else []
-                        
-                        # Get detailed info for each article
-                        for title in titles[:3]:  # Limit to top 3 results
-                            source = await self._get_wikipedia_article(title)
-                            if source:
-                                sources.append(source)
+                data = await self._fetch(self.source_configs["wikipedia"]["search_url"], params=search_params,
+                                         ttl_class=self.source_configs["wikipedia"]["cache_ttl"])
+                titles = data[1] if data and len(data) > 1 else []
+                return titles[:3]  # Limit to top 3 results
+            
+            # Search all terms at once, then fetch every article summary at once
+            title_lists = await self._as_completed_ordered([search(term) for term in search_terms])
+            titles: List[str] = []
+            for result in title_lists:
+                if isinstance(result, Exception):
+                    self.logger.warning(f"Wikipedia search failed: {result}")
+                    continue
+                titles.extend(t for t in result if t not in titles)
+            
+            articles = await self._as_completed_ordered([self._get_wikipedia_article(t) for t in titles])
+            sources = [a for a in articles if isinstance(a, ResearchSource)]
         
         except Exception as e:
             self.logger.warning(f"Wikipedia research failed: {e}")
@@ -165,19 +370,17 @@ class ResearchEngine:
         try:
             url = f"{self.source_configs['wikipedia']['base_url']}{quote(title)}"
             
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    return ResearchSource(
-                        title=data.get('title', title),
-                        url=data.get('content_urls', {}).get('desktop', {}).get('page'),
-                        source_type=SourceType.ENCYCLOPEDIA,
-                        credibility_score=0.7,
-                        content_summary=data.get('extract', ''),
-                        key_facts=[data.get('extract', '')[:200] + '...'],
-                        relevance_score=0.8
-                    )
+            data = await self._fetch(url, ttl_class=self.source_configs["wikipedia"]["cache_ttl"])
+            if data:
+                return ResearchSource(
+                    title=data.get('title', title),
+                    url=data.get('content_urls', {}).get('desktop', {}).get('page'),
+                    source_type=SourceType.ENCYCLOPEDIA,
+                    credibility_score=0.7,
+                    content_summary=data.get('extract', ''),
+                    key_facts=[data.get('extract', '')[:200] + '...'],
+                    relevance_score=0.8
+                )
         
         except Exception as e:
             self.logger.warning(f"Failed to get Wikipedia article for {title}: {e}")
@@ -188,14 +391,29 @@ class ResearchEngine:
         """Research using NASA APIs and feeds"""
         sources = []
         
+        async def parse_feed(feed_url: str):
+            # Fetch on the shared session; feedparser is synchronous CPU work
+            body = await self._fetch(feed_url, kind="bytes", ttl_class=self.source_configs["nasa"]["cache_ttl"])
+            if body is None:
+                return None
+            return await asyncio.to_thread(feedparser.parse, body)
+        
         try:
-            # NASA RSS feeds
-            for feed_url in self.source_configs["nasa"]["rss_feeds"]:
-                try:
-                    feed = feedparser.parse(feed_url)
-                    
-                    for entry in feed.entries[:5]:  # Top 5 entries
-                        if self._is_relevant_to_topic(entry.title + entry.summary, topic, subtopic):
+            feed_urls = self.source_configs["nasa"]["rss_feeds"]
+            feeds = await self._as_completed_ordered([parse_feed(url) for url in feed_urls])
+            
+            for feed_url, feed in zip(feed_urls, feeds):
+                if isinstance(feed, Exception):
+                    self.logger.warning(f"Failed to parse NASA feed {feed_url}: {feed}")
+                    continue
+                if feed is None:
+                    continue
+                
+                for entry in feed.entries[:5]:  # Top 5 entries
+                    try:
+                        matcher = self._matcher(topic, subtopic)
+                        analysis = matcher.analyze(entry.title + entry.summary)
+                        if matcher.is_relevant(analysis):
                             source = ResearchSource(
                                 title=entry.title,
                                 url=entry.link,
@@ -203,14 +421,11 @@ class ResearchEngine:
                                 credibility_score=0.95,
                                 content_summary=entry.summary,
                                 key_facts=[entry.summary],
-                                relevance_score=self._calculate_relevance(
-                                    entry.title + entry.summary, topic, subtopic
-                                )
+                                relevance_score=matcher.relevance(analysis)
                             )
                             sources.append(source)
-                
-                except Exception as e:
-                    self.logger.warning(f"Failed to parse NASA feed {feed_url}: {e}")
+                    except Exception as e:
+                        self.logger.warning(f"Skipping NASA feed entry from {feed_url}: {e}")
         
         except Exception as e:
             self.logger.warning(f"NASA research failed: {e}")
@@ -234,27 +449,23 @@ class ResearchEngine:
                 'filter': 'type:journal-article'
             }
             
-            async with self.session.get(
-                self.source_configs["scientific_journals"]["base_url"],
-                params=params
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    for item in data.get('message', {}).get('items', []):
-                        if 'title' in item and 'abstract' in item:
-                            source = ResearchSource(
-                                title=item['title'][0] if item['title'] else 'Unknown',
-                                url=item.get('URL'),
-                                source_type=SourceType.ACADEMIC_PAPER,
-                                credibility_score=0.9,
-                                content_summary=item.get('abstract', ''),
-                                key_facts=[item.get('abstract', '')[:300] + '...'],
-                                citations=[f"{author.get('given', '')} {author.get('family', '')}" 
-                                         for author in item.get('author', [])],
-                                relevance_score=0.7
-                            )
-                            sources.append(source)
+            data = await self._fetch(self.source_configs["scientific_journals"]["base_url"], params=params,
+                                     ttl_class=self.source_configs["scientific_journals"]["cache_ttl"])
+            if data:
+                for item in data.get('message', {}).get('items', []):
+                    if 'title' in item and 'abstract' in item:
+                        source = ResearchSource(
+                            title=item['title'][0] if item['title'] else 'Unknown',
+                            url=item.get('URL'),
+                            source_type=SourceType.ACADEMIC_PAPER,
+                            credibility_score=0.9,
+                            content_summary=item.get('abstract', ''),
+                            key_facts=[item.get('abstract', '')[:300] + '...'],
+                            citations=[f"{author.get('given', '')} {author.get('family', '')}" 
+                                     for author in item.get('author', [])],
+                            relevance_score=0.7
+                        )
+                        sources.append(source)
         
         except Exception as e:
             self.logger.warning(f"Academic source research failed: {e}")
@@ -339,6 +550,21 @@ class ResearchEngine:
         
         return sources
     
+    def _matcher(self, topic: str, subtopic: Optional[str] = None) -> TopicMatcher:
+        """Compiled matcher for a topic, built once from config keywords + built-in tables"""
+        key = (topic, subtopic)
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            keywords = []
+            try:
+                topic_config = self.config.get_topic_config(topic)
+                keywords = list(topic_config.keywords) if topic_config else []
+            except Exception:
+                pass
+            matcher = TopicMatcher(topic, subtopic, keywords)
+            self._matchers[key] = matcher
+        return matcher
+    
     async def _enrich_research_data(self, research_report: ResearchReport, 
                                   request: ContentGenerationRequest):
         """Enrich research data with additional analysis"""
@@ -346,97 +572,49 @@ class ResearchEngine:
         # Extract key facts from all sources
         all_content = " ".join([source.content_summary for source in research_report.sources])
         
-        # Extract key information (this would use NLP in a full implementation)
-        research_report.key_facts = self._extract_key_facts(all_content, request.topic)
-        research_report.key_figures = self._extract_key_figures(all_content, request.topic)
-        research_report.locations = self._extract_locations(all_content, request.topic)
-        research_report.concepts = self._extract_concepts(all_content, request.topic)
+        # One pass over the corpus feeds every extractor
+        analysis = self._matcher(request.topic, request.subtopic).analyze(all_content)
+        research_report.key_facts = self._extract_key_facts(all_content, request.topic, analysis)
+        research_report.key_figures = self._extract_key_figures(all_content, request.topic, analysis)
+        research_report.locations = self._extract_locations(all_content, request.topic, analysis)
+        research_report.concepts = self._extract_concepts(all_content, request.topic, analysis)
         research_report.visual_elements = self._suggest_visual_elements(request.topic, request.subtopic)
     
-    def _extract_key_facts(self, content: str, topic: str) -> List[str]:
+    def _extract_key_facts(self, content: str, topic: str,
+                           analysis: Optional[TextAnalysis] = None) -> List[str]:
         """Extract key facts from research content"""
-        # Simplified fact extraction - in production, use NLP
-        facts = []
-        
-        # Look for common fact patterns
-        sentences = content.split('.')
-        for sentence in sentences[:10]:  # Top 10 sentences
-            sentence = sentence.strip()
-            if len(sentence) > 50 and any(word in sentence.lower() for word in 
-                                        ['discovered', 'invented', 'created', 'established', 'founded']):
-                facts.append(sentence)
-        
-        return facts[:5]  # Return top 5 facts
+        # Sentences among the first 10 that contain a fact trigger word
+        analysis = analysis or self._matcher(topic).analyze(content)
+        return analysis.fact_sentences[:5]  # Return top 5 facts
     
-    def _extract_key_figures(self, content: str, topic: str) -> List[Dict[str, str]]:
+    def _extract_key_figures(self, content: str, topic: str,
+                             analysis: Optional[TextAnalysis] = None) -> List[Dict[str, str]]:
         """Extract key people/figures from content"""
-        # Simplified name extraction
-        figures = []
-        
-        # Common title patterns that indicate important people
-        title_patterns = [
-            r'(King|Queen|Emperor|President|Dr\.|Professor|Sir|Lord) (\w+ \w+)',
-            r'([A-Z][a-z]+ [A-Z][a-z]+) (?:was|is|became)',
+        analysis = analysis or self._matcher(topic).analyze(content)
+        return [
+            {"name": name, "role": "Key figure", "relevance": "Primary"}
+            for name in analysis.figures[:5]
         ]
-        
-        for pattern in title_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches[:5]:
-                if isinstance(match, tuple):
-                    name = ' '.join(match)
-                else:
-                    name = match
-                
-                figures.append({
-                    "name": name,
-                    "role": "Key figure",
-                    "relevance": "Primary"
-                })
-        
-        return figures[:5]
     
-    def _extract_locations(self, content: str, topic: str) -> List[Dict[str, str]]:
+    def _extract_locations(self, content: str, topic: str,
+                           analysis: Optional[TextAnalysis] = None) -> List[Dict[str, str]]:
         """Extract important locations from content"""
-        locations = []
-        
-        # Look for location patterns
-        location_indicators = ['in', 'at', 'near', 'from', 'located']
-        words = content.split()
-        
-        for i, word in enumerate(words):
-            if word.lower() in location_indicators and i + 1 < len(words):
-                potential_location = words[i + 1]
-                if potential_location[0].isupper() and len(potential_location) > 3:
-                    locations.append({
-                        "name": potential_location,
-                        "type": "Geographic location",
-                        "significance": "Research context"
-                    })
-        
-        return locations[:5]
+        analysis = analysis or self._matcher(topic).analyze(content)
+        return [
+            {"name": name, "type": "Geographic location", "significance": "Research context"}
+            for name in analysis.locations[:5]
+        ]
     
-    def _extract_concepts(self, content: str, topic: str) -> List[Dict[str, str]]:
+    def _extract_concepts(self, content: str, topic: str,
+                          analysis: Optional[TextAnalysis] = None) -> List[Dict[str, str]]:
         """Extract key concepts that need explanation"""
-        concepts = []
-        
-        # Topic-specific concept extraction
-        topic_concepts = {
-            "mythology": ["pantheon", "deity", "legend", "myth", "ritual"],
-            "space": ["galaxy", "planet", "star", "orbit", "cosmic"],
-            "history": ["civilization", "empire", "dynasty", "era", "culture"],
-            "science": ["theory", "hypothesis", "experiment", "discovery", "principle"]
-        }
-        
-        relevant_concepts = topic_concepts.get(topic, [])
-        for concept in relevant_concepts:
-            if concept in content.lower():
-                concepts.append({
-                    "term": concept,
-                    "definition": f"Key concept in {topic}",
-                    "importance": "high"
-                })
-        
-        return concepts[:5]
+        matcher = self._matcher(topic)
+        analysis = analysis or matcher.analyze(content)
+        found = analysis.patterns("concept")
+        return [
+            {"term": concept, "definition": f"Key concept in {topic}", "importance": "high"}
+            for concept in matcher.concepts if concept in found
+        ][:5]
     
     def _suggest_visual_elements(self, topic: str, subtopic: Optional[str] = None) -> List[str]:
         """Suggest visual elements for the topic"""
@@ -481,53 +659,13 @@ class ResearchEngine:
     
     def _is_relevant_to_topic(self, text: str, topic: str, subtopic: Optional[str] = None) -> bool:
         """Check if text content is relevant to the research topic"""
-        text_lower = text.lower()
-        topic_lower = topic.lower()
-        
-        # Basic relevance check
-        if topic_lower in text_lower:
-            return True
-        
-        if subtopic and subtopic.lower() in text_lower:
-            return True
-        
-        # Topic-specific keywords
-        topic_keywords = {
-            "mythology": ["myth", "legend", "god", "goddess", "ancient", "story"],
-            "space": ["space", "planet", "star", "galaxy", "cosmic", "universe"],
-            "history": ["historical", "ancient", "empire", "civilization", "era"],
-            "science": ["research", "study", "discovery", "scientific", "experiment"]
-        }
-        
-        relevant_keywords = topic_keywords.get(topic, [])
-        return any(keyword in text_lower for keyword in relevant_keywords)
+        matcher = self._matcher(topic, subtopic)
+        return matcher.is_relevant(matcher.analyze(text))
     
     def _calculate_relevance(self, text: str, topic: str, subtopic: Optional[str] = None) -> float:
         """Calculate relevance score for text content"""
-        score = 0.0
-        text_lower = text.lower()
-        
-        # Topic mention
-        if topic.lower() in text_lower:
-            score += 0.5
-        
-        # Subtopic mention
-        if subtopic and subtopic.lower() in text_lower:
-            score += 0.3
-        
-        # Keyword relevance
-        topic_keywords = {
-            "mythology": ["myth", "legend", "god", "goddess", "ancient"],
-            "space": ["space", "planet", "star", "galaxy", "cosmic"],
-            "history": ["historical", "ancient", "empire", "civilization"],
-            "science": ["research", "study", "discovery", "scientific"]
-        }
-        
-        relevant_keywords = topic_keywords.get(topic, [])
-        keyword_matches = sum(1 for keyword in relevant_keywords if keyword in text_lower)
-        score += min(keyword_matches * 0.1, 0.2)
-        
-        return min(score, 1.0)
+        matcher = self._matcher(topic, subtopic)
+        return matcher.relevance(matcher.analyze(text))
     
     def _calculate_quality_score(self, research_report: ResearchReport) -> float:
         """Calculate overall quality score for research"""
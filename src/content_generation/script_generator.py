@@ -1,10 +1,12 @@
 """Script generation using local LLMs for any topic"""
 
 import asyncio
+import hashlib
 import logging
 import re
+import time
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable
 import json as _json
 import openai
 from pathlib import Path
@@ -14,13 +16,49 @@ from .content_models import (
     ResearchReport, ContentGenerationRequest, ContentType, NarrativeStructure
 )
 from .prompt_templates import PromptTemplates
+from .research_corpus import open_corpus
+from .context_packer import ContextPacker, count_tokens
 from src.utils.text_normalize import normalize_name_possessives
+from src.utils import metrics, tracing
+from src.utils.logger import sampled
 
 # Constants for accurate duration calculation
 WORDS_PER_SECOND = 2.5  # Average speaking rate for documentary narration
 MIN_WORDS_BUFFER = 0.9  # Allow 10% under target
 MAX_WORDS_BUFFER = 1.1  # Allow 10% over target
 
+_NARRATION_KEY_RE = re.compile(r'"narration"\s*:\s*"')
+
+
+def _partial_json_string(text: str, key_re=_NARRATION_KEY_RE) -> str:
+    """Decoded value of a JSON string field from a possibly incomplete JSON document.
+    
+    Returns the longest safely decodable prefix of the value (a prefix of what
+    the complete document will decode to).
+    """
+    m = key_re.search(text)
+    if not m:
+        return ""
+    start = i = m.end()
+    escaped = False
+    while i < len(text):
+        ch = text[i]
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch == '"':
+            break
+        i += 1
+    raw = text[start:i]
+    # Back off over a dangling escape such as a trailing "\" or partial "\u12"
+    for trim in range(0, 7):
+        try:
+            return _json.loads('"' + raw[:len(raw) - trim] + '"')
+        except ValueError:
+            continue
+    return ""
+
 
 class ScriptGenerator:
     """Generates video scripts using AI models (local or cloud)"""
@@ -59,6 +97,21 @@ class ScriptGenerator:
         
         # Initialize prompt templates
         self.prompt_templates = PromptTemplates()
+        
+        # Local research corpus for ranked prompt context (optional)
+        try:
+            self.research_corpus = open_corpus(config)
+        except Exception as e:
+            self.logger.warning(f"Research corpus unavailable, using compiled summaries: {e}")
+            self.research_corpus = None
+        
+        # Per-call research context budgets (tokens)
+        self.context_tokens_outline = int(getattr(config.llm, 'context_tokens_outline', 600) or 600)
+        self.context_tokens_beat = int(getattr(config.llm, 'context_tokens_beat', 400) or 400)
+        self.context_search_limit = int(getattr(config.llm, 'context_search_limit', 12) or 12)
+        self._packer_key = None
+        self._packer: Optional[ContextPacker] = None
+        self._packer_uses_corpus = False
     
     def _estimate_duration_from_words(self, word_count: int) -> float:
         """Estimate speech duration from word count"""
@@ -187,7 +240,9 @@ class ScriptGenerator:
     # -------------------- Chunked Longform Generation --------------------
     async def _generate_outline(self, research_report: ResearchReport, request: ContentGenerationRequest) -> Dict[str, Any]:
         """Ask the LLM for a beats outline with target words per beat (JSON)."""
-        research_data = self._compile_research_summary(research_report)
+        research_data = self._research_context(
+            research_report, f"{request.topic} {request.subtopic or ''}", self.context_tokens_outline
+        )
         target_words_total = int(request.target_length_minutes * 60 * WORDS_PER_SECOND)
         beats_min, beats_max = (8, 12) if request.target_length_minutes >= 20 else (6, 8)
         contract = (
@@ -218,7 +273,7 @@ class ScriptGenerator:
             "- Pure narration (no bullets, no headers, no labels, no bracketed directions)\n"
             "- Short-to-medium sentences; occasional rhetorical questions\n"
             "- Active voice; concrete nouns; avoid list dumps\n\n"
-            f"RESEARCH CONTEXT (concise):\n{research_data[:1800]}"
+            f"RESEARCH CONTEXT (concise):\n{research_data}"
         )
         try:
             data = await self._call_llm(prompt, max_tokens=1200, json_mode=True)
@@ -264,9 +319,18 @@ class ScriptGenerator:
         return norm
 
     async def _expand_beat(self, beat: Dict[str, Any], research_report: ResearchReport,
-                           request: ContentGenerationRequest) -> Dict[str, Any]:
-        """Generate narration (and optional image prompts) for one beat."""
-        research_data = self._compile_research_summary(research_report)
+                           request: ContentGenerationRequest,
+                           on_narration: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Generate narration (and optional image prompts) for one beat.
+        
+        `on_narration`, if given, receives the narration written so far while
+        the completion streams in.
+        """
+        research_data = self._research_context(
+            research_report,
+            f"{beat.get('title', '')} {beat.get('summary', '')}",
+            self.context_tokens_beat,
+        )
         target_words = int(max(120, min(800, beat.get("target_words", 350))))
         json_contract = (
             '{\n'
@@ -287,10 +351,15 @@ class ScriptGenerator:
             "- Cinematic cadence: hook → evidence → what-if (speculation) → temper with facts → reflection (as applicable to this beat)\n"
             "- Short-to-medium sentences; vary cadence; avoid list-like exposition\n"
             "- Active voice; concrete nouns; minimize jargon/filler\n\n"
-            f"RESEARCH CONTEXT (concise):\n{research_data[:1500]}"
+            f"RESEARCH CONTEXT (concise):\n{research_data}"
         )
+        on_json_text = None
+        if on_narration is not None:
+            def on_json_text(text: str):
+                on_narration(_partial_json_string(text))
         try:
-            data = await self._call_llm(prompt, max_tokens=min(2000, target_words * 3), json_mode=True)
+            data = await self._call_llm(prompt, max_tokens=min(2000, target_words * 3), json_mode=True,
+                                        on_text=on_json_text)
             if isinstance(data, dict) and isinstance(data.get("narration"), str):
                 return data
         except Exception:
@@ -298,7 +367,8 @@ class ScriptGenerator:
         # Fallback to plain text
         fallback = await self._call_llm(
             f"Write ~{target_words} words of narration for: {beat.get('title')}\nSummary: {beat.get('summary')}\n",
-            max_tokens=min(2000, target_words * 3)
+            max_tokens=min(2000, target_words * 3),
+            on_text=on_narration
         )
         return {"narration": str(fallback or ""), "image_prompts": []}
     
@@ -395,8 +465,13 @@ Create a 2-3 sentence description that would intrigue viewers."""
             self.logger.error(f"Failed to generate description: {e}")
             return f"An in-depth exploration of {request.topic}"
     
-    async def generate_script(self, research_report: ResearchReport, request: ContentGenerationRequest) -> VideoScript:
-        """Generate a complete video script from research data using outline+per-beat expansion."""
+    async def generate_script(self, research_report: ResearchReport, request: ContentGenerationRequest,
+                              narration_sink=None) -> VideoScript:
+        """Generate a complete video script from research data using outline+per-beat expansion.
+        
+        `narration_sink` (e.g. a NarrationStream) receives the narration written
+        so far via `update(text)` as beats stream in, and `reset()` on retries.
+        """
         self.logger.info(f"Generating script for '{request.topic}' - {request.target_length_minutes} minutes")
 
         # Calculate target word count for validation
@@ -408,6 +483,9 @@ Create a 2-3 sentence description that would intrigue viewers."""
 
         while retry_count < max_retries:
             try:
+                if narration_sink is not None and retry_count:
+                    narration_sink.reset()
+                
                 # 1) Outline
                 outline_raw = await self._generate_outline(research_report, request)
                 outline_beats = self._coerce_outline(outline_raw, request)
@@ -427,9 +505,21 @@ Create a 2-3 sentence description that would intrigue viewers."""
 
                 # 2) Expand each beat (sequential; you can switch to asyncio.gather later)
                 beat_results = []
+                done_parts: List[str] = []
                 for beat in outline_beats:
-                    br = await self._expand_beat(beat, research_report, request)
+                    on_narration = None
+                    if narration_sink is not None:
+                        def on_narration(partial: str, _done="\n\n".join(done_parts)):
+                            # Same joining as the final script_content below
+                            narration_sink.update(f"{_done}\n\n{partial}" if _done else partial)
+                    br = await self._expand_beat(beat, research_report, request, on_narration=on_narration)
                     beat_results.append({"beat": beat, "result": br})
+                    narration = str(br.get("narration", ""))
+                    if narration.strip():
+                        done_parts.append(narration)
+                        if narration_sink is not None:
+                            # Speculatively close the beat's last paragraph
+                            narration_sink.update("\n\n".join(done_parts) + "\n\n")
 
                 # Assemble narration
                 narration_parts = [str(x["result"].get("narration", "")) for x in beat_results]
@@ -573,16 +663,10 @@ Create a 2-3 sentence description that would intrigue viewers."""
                     )
                     raise
 
-        # Print detailed script content for verification (force console output)
-        print("\n" + "="*80)
-        print("📝 GENERATED SCRIPT DETAILS:")
-        print("="*80)
-        print(f"Title: {script.title}")
-        print(f"Chapters: {len(script.chapters)}, Words: {script.total_word_count}, Duration: {script.total_duration:.1f}s")
-        print("-"*80)
-        print(f"SCRIPT CONTENT ({script.total_word_count} words):")
-        print(f"{script.introduction[:500]}...")
-        print("="*80 + "\n")
+        # Script summary for verification; the opening text only at debug level
+        self.logger.info(f"📝 Generated script '{script.title}': {len(script.chapters)} chapters, "
+                         f"{script.total_word_count} words, {script.total_duration:.1f}s")
+        self.logger.debug(f"Script opening: {script.introduction[:500]}...")
 
         return script
     
@@ -819,15 +903,26 @@ Format: Just the image prompt, no explanations.
         description = await self._call_llm(prompt, max_tokens=1000)
         return description.strip()
     
-    async def _call_llm(self, prompt: str, max_tokens: int = None, json_mode: bool = False):
-        """Call the LLM (local or cloud)"""
+    @tracing.traced("llm.call", cat="llm")
+    async def _call_llm(self, prompt: str, max_tokens: int = None, json_mode: bool = False,
+                        on_text: Optional[Callable[[str], None]] = None):
+        """Call the LLM (local or cloud).
+        
+        With `on_text`, the completion is streamed on a worker thread and
+        `on_text(content_so_far)` is called on the event loop as text arrives;
+        the return value is the same as without streaming.
+        """
         
         # Use configured max_tokens if not specified
         if max_tokens is None:
             max_tokens = self.max_tokens_default
         
+        started = time.perf_counter()
+        response = None
         try:
-            if self.use_local_llm:
+            if on_text is not None:
+                content = await self._stream_completion(prompt, max_tokens, json_mode, on_text)
+            elif self.use_local_llm:
                 # Local LLM call (Ollama)
                 response = self.client.chat.completions.create(
                     model=self.model_name,
@@ -853,7 +948,9 @@ Format: Just the image prompt, no explanations.
                     kwargs["response_format"] = {"type": "json_object"}
                 response = self.client.chat.completions.create(**kwargs)
             
-            content = response.choices[0].message.content or ""
+            if on_text is None:
+                content = response.choices[0].message.content or ""
+            self._record_llm_metrics(prompt, content, response, time.perf_counter() - started)
             if json_mode:
                 try:
                     import json as _json
@@ -861,17 +958,142 @@ Format: Just the image prompt, no explanations.
                 except Exception:
                     # Fall back to raw string if parsing fails
                     return content
-            # Print the LLM response for debugging and verification (force console output)
-            print(f"\n🤖 LLM Response Preview: {content[:300]}...")
-            print(f"📊 LLM Response Length: {len(content)} characters")
+            # LLM response preview for debugging (sampled: chunked generation calls this per beat)
+            self.logger.info(f"🤖 LLM response ({len(content)} chars): {content[:300]}...",
+                             extra=sampled("llm.response"))
             if len(content) < 50:
-                print(f"⚠️ WARNING: LLM generated very short response: '{content}'")
+                self.logger.warning(f"⚠️ LLM generated very short response: '{content}'")
             return content
         
         except Exception as e:
+            metrics.counter("video_ai_llm_requests_total", "LLM calls by outcome", ["model", "outcome"]).labels(
+                model=self.model_name, outcome="error").inc()
             self.logger.error(f"LLM call failed: {e}")
             raise
     
+    def _record_llm_metrics(self, prompt: str, content: str, response, seconds: float) -> None:
+        """Token and latency counters; uses the API's usage block when present, else local counts"""
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or count_tokens(prompt, self.model_name)
+        completion_tokens = getattr(usage, "completion_tokens", None) or count_tokens(content, self.model_name)
+        tokens = metrics.counter("video_ai_llm_tokens_total", "LLM tokens by model and direction", ["model", "kind"])
+        tokens.labels(model=self.model_name, kind="prompt").inc(prompt_tokens)
+        tokens.labels(model=self.model_name, kind="completion").inc(completion_tokens)
+        metrics.counter("video_ai_llm_requests_total", "LLM calls by outcome", ["model", "outcome"]).labels(
+            model=self.model_name, outcome="ok").inc()
+        metrics.histogram("video_ai_llm_request_seconds", "LLM call latency", ["model"]).labels(
+            model=self.model_name).observe(seconds)
+    
+    async def _stream_completion(self, prompt: str, max_tokens: int, json_mode: bool,
+                                 on_text: Callable[[str], None]) -> str:
+        """Streamed chat completion; the blocking client iterates on a thread"""
+        loop = asyncio.get_running_loop()
+        kwargs = dict(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": "You are an expert documentary script writer and researcher. Write engaging, factual content suitable for narration."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            stream=True
+        )
+        if json_mode and not self.use_local_llm:
+            kwargs["response_format"] = {"type": "json_object"}
+        
+        def notify(text: str):
+            try:
+                on_text(text)
+            except Exception as e:
+                self.logger.debug(f"Streaming callback failed: {e}")
+        
+        def run() -> str:
+            parts: List[str] = []
+            last_notified = 0
+            for event in self.client.chat.completions.create(**kwargs):
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content or ""
+                if not delta:
+                    continue
+                parts.append(delta)
+                # Paragraph breaks are what consumers act on; don't flood the loop
+                if "\n" in delta or "\\n" in delta or len(parts) - last_notified >= 32:
+                    last_notified = len(parts)
+                    loop.call_soon_threadsafe(notify, "".join(parts))
+            return "".join(parts)
+        
+        content = await asyncio.to_thread(run)
+        notify(content)
+        return content
+    
+    @staticmethod
+    def _report_key(research_report: ResearchReport) -> tuple:
+        """Topic/subtopic plus a hash of the report's sources and compiled material"""
+        digest = hashlib.sha1()
+        for src in research_report.sources:
+            digest.update(f"{src.url}\x1f{src.title}\x1f{src.content_summary}\x1e".encode("utf-8"))
+        digest.update(_json.dumps([research_report.key_facts, research_report.key_figures,
+                                   research_report.locations], sort_keys=True, default=str).encode("utf-8"))
+        return (research_report.topic, research_report.subtopic, digest.hexdigest())
+    
+    def _corpus_has_passages(self, research_report: ResearchReport) -> bool:
+        if self.research_corpus is None:
+            return False
+        try:
+            return bool(self.research_corpus.passages_for(research_report.topic, research_report.subtopic, limit=1))
+        except Exception as e:
+            self.logger.warning(f"Research corpus read failed: {e}")
+            return False
+    
+    def _context_packer(self, research_report: ResearchReport) -> ContextPacker:
+        """Packer fitted on this report's compiled material (cached across beats)"""
+        key = self._report_key(research_report)
+        if self._packer is not None and self._packer_key == key:
+            return self._packer
+        
+        pool: List[str] = []
+        pool.extend(research_report.key_facts)
+        pool.extend(f"{f.get('name', 'Unknown')}: {f.get('role', 'Important figure')}" for f in research_report.key_figures)
+        pool.extend(f"{l.get('name', 'Unknown')}: {l.get('significance', 'Important location')}" for l in research_report.locations)
+        self._packer_uses_corpus = self._corpus_has_passages(research_report)
+        if not self._packer_uses_corpus:
+            # No stored passages to search: the source summaries stand in for them
+            pool.extend(f"[{s.title}] {s.content_summary}" for s in research_report.sources)
+        
+        self._packer = ContextPacker(pool, model=self.model_name)
+        self._packer_key = key
+        return self._packer
+    
+    def _corpus_hits(self, research_report: ResearchReport, query: str) -> List[str]:
+        """BM25-ranked corpus passages for `query` within the report's topic/subtopic"""
+        try:
+            hits = self.research_corpus.search(query, topic=research_report.topic,
+                                               subtopic=research_report.subtopic,
+                                               limit=self.context_search_limit)
+        except Exception as e:
+            self.logger.warning(f"Research corpus search failed: {e}")
+            return []
+        return [f"[{h.get('title') or 'Source'}] {h['text']}" for h in hits]
+    
+    def _research_context(self, research_report: ResearchReport, query: str, max_tokens: int) -> str:
+        """Most relevant research passages for `query`, packed into `max_tokens`.
+        
+        Corpus passages are ranked per query with BM25 and go first; the compiled
+        facts/figures/locations fill the rest. Falls back to the head of the
+        compiled summary when there is nothing to rank.
+        """
+        try:
+            packer = self._context_packer(research_report)
+            ranked = self._corpus_hits(research_report, query) if self._packer_uses_corpus else []
+            packed = packer.pack(query, max_tokens, ranked=ranked)
+        except Exception as e:
+            self.logger.warning(f"Context packing failed: {e}")
+            packed = ""
+        if not packed:
+            return self._compile_research_summary(research_report)[:max_tokens * 4]
+        return packed
+    
     def _compile_research_summary(self, research_report: ResearchReport) -> str:
         """Compile research data into a summary for prompts"""
         
@@ -944,7 +1166,7 @@ Format: Just the image prompt, no explanations.
                     'transition': f"Leads into Chapter {i + 2}" if i < expected_chapters - 1 else "Leads to conclusion"
                 })
         
-        print(f"📊 Chapter Structure: {len(chapters)} chapters for {target_minutes}-minute video")
+        self.logger.info(f"📊 Chapter Structure: {len(chapters)} chapters for {target_minutes}-minute video")
         
         return chapters
     
@@ -0,0 +1,172 @@
+"""Tokenized view of a narration script, built once and shared
+
+Planner spans (`narration_span.start_token/end_token`), alignment spans and
+QA reference text all count whitespace tokens of `VideoScript.get_full_script_text()`.
+`ScriptIndex` tokenizes that text once (same convention as `str.split()`) and
+keeps sentence and paragraph boundaries, char <-> token offsets and, once
+audio exists, token -> time, so consumers slice instead of re-splitting and
+can never disagree on what token N is. Instances are immutable; adding
+timings returns a new index.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+from dataclasses import dataclass, field, replace
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+
+_TOKEN = re.compile(r"\S+")
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t\r]*\n")
+_SENTENCE_END = re.compile(r"[.!?…][\"'”’)\]]*$")
+
+
+@dataclass(frozen=True)
+class ScriptIndex:
+    text: str
+    tokens: Tuple[str, ...]
+    char_starts: Tuple[int, ...]
+    char_ends: Tuple[int, ...]
+    sentences: Tuple[Tuple[int, int], ...]  # [start_token, end_token)
+    paragraphs: Tuple[Tuple[int, int], ...]
+    token_times: Optional[Tuple[float, ...]] = None  # n + 1 boundaries: token i spans [t[i], t[i+1])
+    # " ".join(tokens) and each token's offset in it, so span_text is one slice
+    _joined: str = field(default="", repr=False, compare=False)
+    _joined_starts: Tuple[int, ...] = field(default=(), repr=False, compare=False)
+
+    @classmethod
+    def from_text(cls, text: str) -> "ScriptIndex":
+        text = text or ""
+        matches = list(_TOKEN.finditer(text))
+        tokens = tuple(m.group() for m in matches)
+        starts = tuple(m.start() for m in matches)
+        ends = tuple(m.end() for m in matches)
+
+        # Paragraph of each token: count blank-line breaks before it
+        breaks = [m.start() for m in _PARAGRAPH_BREAK.finditer(text)]
+        paragraphs, sentences = [], []
+        para_start = sent_start = 0
+        for i, start in enumerate(starts):
+            if i and bisect.bisect_left(breaks, start) != bisect.bisect_left(breaks, starts[i - 1]):
+                paragraphs.append((para_start, i))
+                if sent_start < i:
+                    sentences.append((sent_start, i))
+                para_start = sent_start = i
+            if _SENTENCE_END.search(tokens[i]):
+                sentences.append((sent_start, i + 1))
+                sent_start = i + 1
+        if tokens:
+            paragraphs.append((para_start, len(tokens)))
+            if sent_start < len(tokens):
+                sentences.append((sent_start, len(tokens)))
+
+        joined_starts, offset = [], 0
+        for tok in tokens:
+            joined_starts.append(offset)
+            offset += len(tok) + 1
+        return cls(text=text, tokens=tokens, char_starts=starts, char_ends=ends,
+                   sentences=tuple(sentences), paragraphs=tuple(paragraphs),
+                   _joined=" ".join(tokens), _joined_starts=tuple(joined_starts))
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def _clamp(self, start: int, end: int) -> Tuple[int, int]:
+        n = len(self.tokens)
+        start = max(0, min(int(start), n))
+        return start, max(start, min(int(end), n))
+
+    # ------------------------ Text ------------------------
+    def span_text(self, start: int, end: int) -> str:
+        """Tokens [start, end) joined by single spaces (== " ".join(text.split()[start:end]))"""
+        start, end = self._clamp(start, end)
+        if start == end:
+            return ""
+        return self._joined[self._joined_starts[start]:self._joined_starts[end - 1] + len(self.tokens[end - 1])]
+
+    def window_text(self, start: int, end: int, min_tokens: int = 12, window: int = 80) -> str:
+        """The span, widened by `window` tokens each side when it is too short to describe"""
+        start, end = self._clamp(start, end)
+        if end - start >= min_tokens:
+            return self.span_text(start, end)
+        return self.span_text(start - window, end + window)
+
+    def paragraph_text(self, i: int) -> str:
+        return self.span_text(*self.paragraphs[i])
+
+    def sentence_text(self, i: int) -> str:
+        return self.span_text(*self.sentences[i])
+
+    # ------------------------ Offsets ------------------------
+    def token_at_char(self, offset: int) -> int:
+        """Token containing (or, in whitespace, preceding) char `offset`"""
+        return max(0, bisect.bisect_right(self.char_starts, offset) - 1)
+
+    def char_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Char range of tokens [start, end) in the original text"""
+        start, end = self._clamp(start, end)
+        if start == end:
+            pos = self.char_starts[start] if start < len(self.tokens) else len(self.text)
+            return pos, pos
+        return self.char_starts[start], self.char_ends[end - 1]
+
+    def sentence_at(self, token: int) -> int:
+        return max(0, bisect.bisect_right(self.sentences, (token, float("inf"))) - 1)
+
+    def paragraph_at(self, token: int) -> int:
+        return max(0, bisect.bisect_right(self.paragraphs, (token, float("inf"))) - 1)
+
+    # ------------------------ Timing ------------------------
+    @property
+    def has_times(self) -> bool:
+        return self.token_times is not None
+
+    def with_token_times(self, times: Sequence[float]) -> "ScriptIndex":
+        """Attach n + 1 token boundary times (e.g. from a forced aligner)"""
+        if len(times) != len(self.tokens) + 1:
+            raise ValueError(f"Expected {len(self.tokens) + 1} token boundaries, got {len(times)}")
+        bounded, last = [], 0.0
+        for t in times:
+            last = max(last, float(t))
+            bounded.append(last)
+        return replace(self, token_times=tuple(bounded))
+
+    def with_audio_segments(self, segments: Iterable[Any]) -> "ScriptIndex":
+        """Approximate token times from TTS segments (`text`, `start_time`, `duration`).
+
+        Tokens are spread evenly over each segment; segment word counts are scaled
+        to the index so text normalization (e.g. expanded numbers) cannot drift the
+        total. Pauses between segments are kept.
+        """
+        segs = sorted((s for s in segments if getattr(s, "duration", 0) > 0), key=lambda s: s.start_time)
+        n = len(self.tokens)
+        if not segs:
+            return self
+        words = [max(1, len((s.text or "").split())) for s in segs]
+        scale = n / float(sum(words))
+        times, seg, seg_start = [], 0, 0.0  # seg_start: token position where `seg` begins
+        for k in range(n + 1):
+            while seg < len(segs) - 1 and k >= seg_start + words[seg] * scale:
+                seg_start += words[seg] * scale
+                seg += 1
+            s = segs[seg]
+            frac = min(1.0, (k - seg_start) / (words[seg] * scale))
+            times.append(s.start_time + frac * s.duration)
+        return self.with_token_times(times)
+
+    def time_at(self, token: int) -> float:
+        """Start time of `token` (`len(index)` gives the narration end)"""
+        if self.token_times is None:
+            raise ValueError("ScriptIndex has no token times yet")
+        return self.token_times[max(0, min(int(token), len(self.tokens)))]
+
+    def token_at_time(self, seconds: float) -> int:
+        """Token being spoken at `seconds`"""
+        if self.token_times is None:
+            raise ValueError("ScriptIndex has no token times yet")
+        return max(0, min(len(self.tokens) - 1, bisect.bisect_right(self.token_times, seconds) - 1))
+
+    def span_times(self, start: int, end: int) -> Tuple[float, float]:
+        start, end = self._clamp(start, end)
+        return self.time_at(start), self.time_at(end)
@@ -0,0 +1,167 @@
+"""Near-duplicate topic detection (MinHash + LSH)
+
+Topics are reduced to word shingles (unigrams + bigrams after light
+normalization), summarized by a MinHash signature and bucketed into LSH
+bands, so looking up a new title only compares against the handful of
+topics that share a band instead of the whole backlog. Candidates are then
+confirmed with exact Jaccard similarity on the shingle sets.
+
+Two signatures are kept per topic: title (+ subtopic) and title + description,
+so "The Fall of Troy" matches "Fall of Troy: The Complete Story" (stopwords
+and punctuation fold away) without a description, and richly described
+topics can match on content. Extra content words dilute the score: "Fall of
+Troy: the Trojan War" is J~0.43 against "The Fall of Troy" and is kept.
+"""
+
+import hashlib
+import logging
+import random
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "of", "in", "on", "to", "for", "from", "with", "by",
+    "at", "as", "is", "are", "was", "were", "its", "it", "this", "that", "how",
+    "what", "why", "who", "when", "story", "history", "complete", "guide",
+})
+
+
+def _stem(word: str) -> str:
+    # Just enough to fold plurals/possessives ("gods" / "god's" / "god")
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Unigram + bigram shingles of the normalized content words"""
+    words = [_stem(w) for w in _WORD_RE.findall((text or "").lower().replace("'", ""))]
+    words = [w for w in words if w not in _STOPWORDS]
+    grams = set(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return frozenset(grams)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TopicDedupIndex:
+    """MinHash/LSH index over topic titles and descriptions"""
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.logger = logging.getLogger(__name__)
+        self.threshold = float(threshold)
+        self.num_perm = int(num_perm)
+        self.bands = int(bands)
+        self.rows = self.num_perm // self.bands
+
+        # One 64-bit hash per shingle; permutations are XOR masks over it
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(self.num_perm)]
+        self._np_masks = None
+
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = defaultdict(set)
+        self._entries: Dict[str, Tuple[FrozenSet[str], FrozenSet[str], List[Tuple]]] = {}
+        # query() followed by add() for the same topic is the common path
+        self._last_prepared = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, topic_id: str) -> bool:
+        return topic_id in self._entries
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _texts(title: str, description: Optional[str] = None, subtopic: Optional[str] = None) -> Tuple[str, str]:
+        head = " ".join(t for t in (title, subtopic) if t)
+        return head, " ".join(t for t in (head, description) if t)
+
+    @staticmethod
+    def _hash(shingle: str) -> int:
+        return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def _signature(self, grams: FrozenSet[str]) -> List[int]:
+        if not grams:
+            return []
+        hashes = [self._hash(g) for g in grams]
+        try:
+            import numpy as np
+            if self._np_masks is None:
+                self._np_masks = np.array(self._masks, dtype=np.uint64)
+            values = np.array(hashes, dtype=np.uint64)
+            return (values[:, None] ^ self._np_masks[None, :]).min(axis=0).tolist()
+        except ImportError:
+            return [min(h ^ m for h in hashes) for m in self._masks]
+
+    def _prepare(self, title: str, description: Optional[str], subtopic: Optional[str]):
+        texts = self._texts(title, description, subtopic)
+        if self._last_prepared and self._last_prepared[0] == texts:
+            return self._last_prepared[1]
+        head, full = texts
+        head_grams, full_grams = shingles(head), shingles(full)
+        head_keys = list(self._band_keys("t", self._signature(head_grams)))
+        full_keys = list(self._band_keys("f", self._signature(full_grams))) if full_grams != head_grams else []
+        prepared = (head_grams, full_grams, head_keys, full_keys)
+        self._last_prepared = (texts, prepared)
+        return prepared
+
+    def _band_keys(self, kind: str, signature: List[int]) -> Iterable[Tuple[str, int, Tuple[int, ...]]]:
+        if not signature:
+            return []
+        r = self.rows
+        return [(kind, b, tuple(signature[b * r:(b + 1) * r])) for b in range(self.bands)]
+
+    # ------------------------------------------------------------------
+    def add(self, topic_id: str, title: str, description: Optional[str] = None,
+            subtopic: Optional[str] = None) -> None:
+        """Index a topic (replaces any previous entry with the same id)"""
+        if topic_id in self._entries:
+            self.remove(topic_id)
+        head_grams, full_grams, head_keys, full_keys = self._prepare(title, description, subtopic)
+        keys = head_keys + full_keys
+        for key in keys:
+            self._buckets[key].add(topic_id)
+        self._entries[topic_id] = (head_grams, full_grams, keys)
+
+    def remove(self, topic_id: str) -> None:
+        entry = self._entries.pop(topic_id, None)
+        if not entry:
+            return
+        for key in entry[2]:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(topic_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def query(self, title: str, description: Optional[str] = None,
+              subtopic: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Best indexed match at or above the threshold, as (topic_id, similarity)"""
+        head_grams, full_grams, head_keys, full_keys = self._prepare(title, description, subtopic)
+        candidates: Set[str] = set()
+        for key in head_keys:
+            candidates |= self._buckets.get(key, set())
+        for key in full_keys:
+            candidates |= self._buckets.get(key, set())
+            # A described topic may still match a title-only entry
+            candidates |= self._buckets.get(("t",) + key[1:], set())
+
+        best: Optional[Tuple[str, float]] = None
+        for cid in candidates:
+            c_head, c_full, _ = self._entries[cid]
+            score = max(jaccard(head_grams, c_head), jaccard(full_grams, c_full))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (cid, score)
+        return best
@@ -1,13 +1,23 @@
 """Topic queue management system for automated video generation"""
 
+import heapq
+import itertools
 import json
+import os
 import yaml
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from threading import RLock
+from typing import List, Dict, Optional, Any, Tuple
 from pydantic import BaseModel, Field
 import logging
 
+from .topic_dedup import TopicDedupIndex
+
+# libyaml bindings are an order of magnitude faster for large snapshots
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YamlDumper = getattr(yaml, 'CDumper', yaml.Dumper)
+
 
 class TopicItem(BaseModel):
     """Individual topic/video to be generated"""
@@ -40,51 +50,151 @@ class CompletedTopic(TopicItem):
 
 
 class TopicQueue:
-    """Manages the queue of topics to be generated"""
+    """Manages the queue of topics to be generated.
+
+    In memory: an id index plus a lazily-invalidated priority heap (global and
+    per category). On disk: the YAML files are the snapshot and every mutation
+    is appended to a JSON-lines journal next to the queue file. The journal is
+    replayed on load and folded into the YAML snapshot every `compact_every`
+    operations (or via `compact()`), so single-topic updates never rewrite the
+    whole backlog.
+
+    Batch adds and imports are checked against pending and successfully
+    completed topics with a near-duplicate index; `duplicate_policy` is
+    "skip" (drop and report), "flag" (add with a `duplicate_of:<id>` tag)
+    or "allow".
+    """
     
     def __init__(self, config, queue_file: str = "data/topic_queue.yaml", 
-                 completed_file: str = "data/completed_topics.yaml"):
+                 completed_file: str = "data/completed_topics.yaml",
+                 compact_every: int = 1000, duplicate_policy: str = "skip",
+                 duplicate_threshold: float = 0.6):
         self.config = config
         self.logger = logging.getLogger(__name__)
         
         # File paths
         self.queue_file = Path(queue_file)
         self.completed_file = Path(completed_file)
+        self.journal_file = self.queue_file.with_suffix('.journal')
         
         # Ensure directories exist
         self.queue_file.parent.mkdir(parents=True, exist_ok=True)
         self.completed_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # Load existing data
-        self.pending_topics: List[TopicItem] = []
+        # In-memory state
+        self._lock = RLock()
+        self._pending: Dict[str, TopicItem] = {}
+        self._heaps: Dict[Optional[str], List[Tuple[int, float, int, str]]] = {None: []}
+        self._entry_seq: Dict[str, int] = {}
+        self._seq = itertools.count()
         self.completed_topics: List[CompletedTopic] = []
+        self._completed_ids: set = set()
+        self._next_suffix: Dict[str, int] = {}  # id prefix -> next "_<n>" to try
+        
+        # Journal
+        self.compact_every = max(1, int(compact_every))
+        self._journal_ops = 0
+        
+        # Near-duplicate detection (index built lazily on first check)
+        self.duplicate_policy = duplicate_policy
+        self.duplicate_threshold = duplicate_threshold
+        self._dedup: Optional[TopicDedupIndex] = None
+        self.last_duplicates: List[Dict[str, Any]] = []
         
         self._load_queues()
     
+    # ------------------------------------------------------------------
+    # Persistence: YAML snapshot + append-only journal
+    # ------------------------------------------------------------------
     def _load_queues(self):
-        """Load existing topic queues from files"""
+        """Load the YAML snapshot, then replay the journal on top of it"""
         try:
             # Load pending topics
             if self.queue_file.exists():
                 with open(self.queue_file, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
-                    topics_data = data.get('topics', [])
-                    self.pending_topics = [TopicItem(**item) for item in topics_data]
-                    self.logger.info(f"Loaded {len(self.pending_topics)} pending topics")
+                    data = yaml.load(f, Loader=_YamlLoader) or {}
+                    for item in data.get('topics', []):
+                        self._index_pending(TopicItem(**item))
+                    self.logger.info(f"Loaded {len(self._pending)} pending topics")
             
             # Load completed topics
             if self.completed_file.exists():
                 with open(self.completed_file, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
-                    completed_data = data.get('completed', [])
-                    self.completed_topics = [CompletedTopic(**item) for item in completed_data]
+                    data = yaml.load(f, Loader=_YamlLoader) or {}
+                    for item in data.get('completed', []):
+                        self._index_completed(CompletedTopic(**item))
                     self.logger.info(f"Loaded {len(self.completed_topics)} completed topics")
+            
+            replayed = self._replay_journal()
+            if replayed:
+                self.logger.info(f"Replayed {replayed} journal entries")
         
         except Exception as e:
             self.logger.error(f"Failed to load topic queues: {e}")
     
+    def _replay_journal(self) -> int:
+        if not self.journal_file.exists():
+            return 0
+        count = 0
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._apply(json.loads(line))
+                    count += 1
+                except Exception as e:
+                    # A torn final line from a crash is expected; anything else is logged
+                    self.logger.warning(f"Skipping unreadable journal entry: {e}")
+        self._journal_ops = count
+        return count
+    
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """Apply one journal operation to in-memory state"""
+        op = entry.get('op')
+        if op == 'add':
+            self._index_pending(TopicItem(**entry['topic']))
+        elif op == 'remove':
+            self._pending.pop(entry['id'], None)
+            if self._dedup is not None:
+                self._dedup.remove(entry['id'])
+        elif op == 'priority':
+            topic = self._pending.get(entry['id'])
+            if topic:
+                topic.priority = entry['priority']
+                self._push(topic)
+        elif op == 'complete':
+            topic = self._pending.pop(entry['id'], None)
+            if topic:
+                self._index_completed(CompletedTopic(**{**topic.model_dump(), **entry['fields']}))
+        elif op == 'clear_completed':
+            ids = set(entry.get('ids', []))
+            self.completed_topics = [t for t in self.completed_topics if t.id not in ids]
+            self._completed_ids -= ids
+            if self._dedup is not None:
+                for topic_id in ids:
+                    self._dedup.remove(topic_id)
+    
+    def _journal(self, entries: List[Dict[str, Any]]) -> None:
+        """Append operations (one JSON line each) and compact when the journal grows"""
+        if not entries:
+            return
+        try:
+            payload = "".join(json.dumps(e, default=str) + "\n" for e in entries)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_ops += len(entries)
+        except Exception as e:
+            self.logger.error(f"Failed to append topic journal: {e}")
+            return
+        if self._journal_ops >= self.compact_every:
+            self.compact()
+    
     def _save_queues(self):
-        """Save topic queues to files"""
+        """Save topic queues to files (full snapshot)"""
         try:
             # Save pending topics
             queue_data = {
@@ -92,8 +202,7 @@ class TopicQueue:
                 'last_updated': datetime.now().isoformat()
             }
             
-            with open(self.queue_file, 'w', encoding='utf-8') as f:
-                yaml.dump(queue_data, f, default_flow_style=False, sort_keys=False)
+            self._write_yaml_atomic(self.queue_file, queue_data)
             
             # Save completed topics
             completed_data = {
@@ -102,12 +211,144 @@ class TopicQueue:
                 'total_completed': len(self.completed_topics)
             }
             
-            with open(self.completed_file, 'w', encoding='utf-8') as f:
-                yaml.dump(completed_data, f, default_flow_style=False, sort_keys=False)
+            self._write_yaml_atomic(self.completed_file, completed_data)
+            return True
         
         except Exception as e:
             self.logger.error(f"Failed to save topic queues: {e}")
+            return False
+    
+    @staticmethod
+    def _write_yaml_atomic(path: Path, data: Dict[str, Any]) -> None:
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            yaml.dump(data, f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    
+    def compact(self) -> None:
+        """Fold the journal into the YAML snapshot and truncate it"""
+        with self._lock:
+            self._compact_locked()
+    
+    def _compact_locked(self) -> bool:
+        if not self._save_queues():
+            return False
+        try:
+            self.journal_file.unlink()
+        except FileNotFoundError:
+            pass
+        self._journal_ops = 0
+        self._rebuild_heaps()
+        self.logger.info(f"Compacted topic queue ({len(self._pending)} pending, {len(self.completed_topics)} completed)")
+        return True
+    
+    # ------------------------------------------------------------------
+    # Index / heap helpers
+    # ------------------------------------------------------------------
+    def _unique_id(self, topic_id: str) -> str:
+        if topic_id not in self._pending and topic_id not in self._completed_ids:
+            return topic_id
+        # Resume from the last suffix handed out for this prefix (ids made in the same second)
+        n = self._next_suffix.get(topic_id, 1)
+        while f"{topic_id}_{n}" in self._pending or f"{topic_id}_{n}" in self._completed_ids:
+            n += 1
+        self._next_suffix[topic_id] = n + 1
+        return f"{topic_id}_{n}"
+    
+    def _index_pending(self, topic: TopicItem) -> None:
+        self._pending[topic.id] = topic
+        self._push(topic)
+        if self._dedup is not None:
+            self._dedup.add(topic.id, topic.title, topic.description, topic.subtopic)
+    
+    def _index_completed(self, topic: CompletedTopic) -> None:
+        self.completed_topics.append(topic)
+        self._completed_ids.add(topic.id)
+        # Failed topics may be retried, so only successes stay in the dedup index
+        if self._dedup is not None and not topic.success:
+            self._dedup.remove(topic.id)
+    
+    def _dedup_index(self) -> TopicDedupIndex:
+        if self._dedup is None:
+            index = TopicDedupIndex(threshold=self.duplicate_threshold)
+            for topic in self._pending.values():
+                index.add(topic.id, topic.title, topic.description, topic.subtopic)
+            for topic in self.completed_topics:
+                if topic.success:
+                    index.add(topic.id, topic.title, topic.description, topic.subtopic)
+            self._dedup = index
+        return self._dedup
+    
+    def find_duplicate(self, title: str, description: Optional[str] = None,
+                       subtopic: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Closest pending/completed topic above the similarity threshold, if any"""
+        with self._lock:
+            match = self._dedup_index().query(title, description, subtopic)
+            if not match:
+                return None
+            topic_id, score = match
+            existing = self._pending.get(topic_id)
+            status = 'pending'
+            if existing is None:
+                status = 'completed'
+                existing = next((t for t in self.completed_topics if t.id == topic_id), None)
+            return {
+                'id': topic_id,
+                'title': existing.title if existing else None,
+                'status': status,
+                'similarity': round(score, 3),
+            }
+    
+    def _check_duplicate(self, topic: TopicItem, policy: str) -> bool:
+        """Apply the duplicate policy; returns False if the topic should be skipped"""
+        if policy == 'allow':
+            return True
+        match = self.find_duplicate(topic.title, topic.description, topic.subtopic)
+        if not match:
+            return True
+        self.last_duplicates.append({'title': topic.title, 'duplicate_of': match})
+        if policy == 'flag':
+            topic.tags = list(topic.tags) + [f"duplicate_of:{match['id']}"]
+            self.logger.warning(f"Topic '{topic.title}' looks like {match['status']} topic '{match['title']}' ({match['similarity']})")
+            return True
+        self.logger.info(f"Skipping '{topic.title}': near-duplicate of {match['status']} topic '{match['title']}' ({match['similarity']})")
+        return False
     
+    def _push(self, topic: TopicItem) -> None:
+        seq = next(self._seq)
+        self._entry_seq[topic.id] = seq
+        entry = (topic.priority, topic.added_date.timestamp(), seq, topic.id)
+        heapq.heappush(self._heaps[None], entry)
+        heapq.heappush(self._heaps.setdefault(topic.category, []), entry)
+    
+    def _rebuild_heaps(self) -> None:
+        """Drop stale heap entries accumulated by removals/priority changes"""
+        self._heaps = {None: []}
+        self._entry_seq = {}
+        for topic in self._pending.values():
+            self._push(topic)
+    
+    def _peek(self, category: Optional[str] = None) -> Optional[TopicItem]:
+        heap = self._heaps.get(category)
+        while heap:
+            _, _, seq, topic_id = heap[0]
+            topic = self._pending.get(topic_id)
+            if topic is not None and self._entry_seq.get(topic_id) == seq:
+                return topic
+            heapq.heappop(heap)  # stale: removed, completed or re-prioritized
+        return None
+    
+    @property
+    def pending_topics(self) -> List[TopicItem]:
+        """Pending topics in processing order (priority, then added date)"""
+        with self._lock:
+            return sorted(self._pending.values(), key=lambda x: (x.priority, x.added_date))
+    
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
     def add_topic(self, title: str, category: str, **kwargs) -> str:
         """Add a new topic to the queue"""
         topic = TopicItem(
@@ -116,67 +357,82 @@ class TopicQueue:
             **kwargs
         )
         
-        self.pending_topics.append(topic)
-        self._save_queues()
+        with self._lock:
+            topic.id = self._unique_id(topic.id)
+            # A single explicit add is never dropped, only flagged
+            self._check_duplicate(topic, 'allow' if self.duplicate_policy == 'allow' else 'flag')
+            self._index_pending(topic)
+            self._journal([{'op': 'add', 'topic': topic.model_dump()}])
         
         self.logger.info(f"Added topic '{title}' to queue (ID: {topic.id})")
         return topic.id
     
-    def add_topics_batch(self, topics: List[Dict[str, Any]]) -> List[str]:
-        """Add multiple topics at once"""
+    def add_topics_batch(self, topics: List[Dict[str, Any]],
+                         duplicate_policy: Optional[str] = None) -> List[str]:
+        """Add multiple topics at once (near-duplicates handled per `duplicate_policy`)"""
+        policy = duplicate_policy or self.duplicate_policy
         topic_ids = []
-        
-        for topic_data in topics:
-            if 'title' not in topic_data or 'category' not in topic_data:
-                self.logger.warning(f"Skipping invalid topic: {topic_data}")
-                continue
+        entries = []
+        
+        with self._lock:
+            self.last_duplicates = []
+            for topic_data in topics:
+                if 'title' not in topic_data or 'category' not in topic_data:
+                    self.logger.warning(f"Skipping invalid topic: {topic_data}")
+                    continue
+                
+                topic = TopicItem(**topic_data)
+                if not self._check_duplicate(topic, policy):
+                    continue
+                topic.id = self._unique_id(topic.id)
+                self._index_pending(topic)
+                topic_ids.append(topic.id)
+                entries.append({'op': 'add', 'topic': topic.model_dump()})
             
-            topic = TopicItem(**topic_data)
-            self.pending_topics.append(topic)
-            topic_ids.append(topic.id)
-        
-        self._save_queues()
-        self.logger.info(f"Added {len(topic_ids)} topics to queue")
+            # A batch that would trigger compaction anyway goes straight into one snapshot
+            if not (entries and self._journal_ops + len(entries) >= self.compact_every and self._compact_locked()):
+                self._journal(entries)
+        skipped = len(self.last_duplicates) if policy == 'skip' else 0
+        self.logger.info(f"Added {len(topic_ids)} topics to queue" + (f" ({skipped} near-duplicates skipped)" if skipped else ""))
         return topic_ids
     
-    def get_next_topic(self) -> Optional[TopicItem]:
-        """Get the next topic to process (highest priority first)"""
-        if not self.pending_topics:
-            return None
-        
-        # Sort by priority (1=highest) then by added date
-        self.pending_topics.sort(key=lambda x: (x.priority, x.added_date))
-        
-        return self.pending_topics[0]
+    def get_next_topic(self, category: Optional[str] = None) -> Optional[TopicItem]:
+        """Get the next topic to process (highest priority first), optionally within a category"""
+        with self._lock:
+            return self._peek(category)
+    
+    def get_topic(self, topic_id: str) -> Optional[TopicItem]:
+        """Look up a pending topic by id"""
+        with self._lock:
+            return self._pending.get(topic_id)
     
     def mark_completed(self, topic_id: str, video_path: Optional[str] = None, 
                       generation_time_minutes: float = 0.0, success: bool = True,
                       error_message: Optional[str] = None, stats: Dict[str, Any] = None) -> bool:
         """Mark a topic as completed and move it to completed list"""
         
-        # Find the topic in pending list
-        topic_to_complete = None
-        for i, topic in enumerate(self.pending_topics):
-            if topic.id == topic_id:
-                topic_to_complete = self.pending_topics.pop(i)
-                break
-        
-        if not topic_to_complete:
-            self.logger.warning(f"Topic ID {topic_id} not found in pending topics")
-            return False
-        
-        # Convert to completed topic
-        completed_topic = CompletedTopic(
-            **topic_to_complete.model_dump(),
-            video_path=video_path,
-            generation_time_minutes=generation_time_minutes,
-            success=success,
-            error_message=error_message,
-            stats=stats or {}
-        )
-        
-        self.completed_topics.append(completed_topic)
-        self._save_queues()
+        with self._lock:
+            # Find the topic in pending index
+            topic_to_complete = self._pending.pop(topic_id, None)
+            
+            if not topic_to_complete:
+                self.logger.warning(f"Topic ID {topic_id} not found in pending topics")
+                return False
+            
+            fields = {
+                'completed_date': datetime.now(),
+                'video_path': video_path,
+                'generation_time_minutes': generation_time_minutes,
+                'success': success,
+                'error_message': error_message,
+                'stats': stats or {}
+            }
+            
+            # Convert to completed topic
+            completed_topic = CompletedTopic(**{**topic_to_complete.model_dump(), **fields})
+            
+            self._index_completed(completed_topic)
+            self._journal([{'op': 'complete', 'id': topic_id, 'fields': fields}])
         
         self.logger.info(f"Marked topic '{topic_to_complete.title}' as completed")
         return True
@@ -212,7 +468,7 @@ class TopicQueue:
         )[:5]
         
         return {
-            'pending_count': len(self.pending_topics),
+            'pending_count': len(self._pending),
             'completed_count': len(self.completed_topics),
             'pending_by_category': pending_by_category,
             'completed_by_category': completed_by_category,
@@ -232,7 +488,7 @@ class TopicQueue:
         """List all pending topics, optionally filtered by category"""
         if category:
             return [t for t in self.pending_topics if t.category == category]
-        return self.pending_topics.copy()
+        return self.pending_topics
     
     def list_completed_topics(self, category: Optional[str] = None, 
                             success_only: bool = True) -> List[CompletedTopic]:
@@ -249,39 +505,41 @@ class TopicQueue:
     
     def remove_topic(self, topic_id: str) -> bool:
         """Remove a topic from the pending queue"""
-        for i, topic in enumerate(self.pending_topics):
-            if topic.id == topic_id:
-                removed_topic = self.pending_topics.pop(i)
-                self._save_queues()
-                self.logger.info(f"Removed topic '{removed_topic.title}' from queue")
-                return True
-        
-        return False
+        with self._lock:
+            removed_topic = self._pending.pop(topic_id, None)
+            if removed_topic is None:
+                return False
+            if self._dedup is not None:
+                self._dedup.remove(topic_id)
+            self._journal([{'op': 'remove', 'id': topic_id}])
+        self.logger.info(f"Removed topic '{removed_topic.title}' from queue")
+        return True
     
     def update_topic_priority(self, topic_id: str, new_priority: int) -> bool:
         """Update topic priority"""
-        for topic in self.pending_topics:
-            if topic.id == topic_id:
-                topic.priority = new_priority
-                self._save_queues()
-                return True
-        return False
+        with self._lock:
+            topic = self._pending.get(topic_id)
+            if topic is None:
+                return False
+            topic.priority = new_priority
+            self._push(topic)
+            self._journal([{'op': 'priority', 'id': topic_id, 'priority': new_priority}])
+            return True
     
     def clear_completed(self, older_than_days: Optional[int] = None) -> int:
         """Clear old completed topics"""
-        if older_than_days is None:
-            count = len(self.completed_topics)
-            self.completed_topics.clear()
-        else:
-            cutoff_date = datetime.now() - timedelta(days=older_than_days)
-            original_count = len(self.completed_topics)
-            self.completed_topics = [
-                t for t in self.completed_topics 
-                if t.completed_date > cutoff_date
-            ]
-            count = original_count - len(self.completed_topics)
+        with self._lock:
+            if older_than_days is None:
+                ids = [t.id for t in self.completed_topics]
+            else:
+                cutoff_date = datetime.now() - timedelta(days=older_than_days)
+                ids = [t.id for t in self.completed_topics if t.completed_date <= cutoff_date]
+            
+            entry = {'op': 'clear_completed', 'ids': ids}
+            self._apply(entry)
+            self._journal([entry])
+            count = len(ids)
         
-        self._save_queues()
         self.logger.info(f"Cleared {count} completed topics")
         return count
     
@@ -303,10 +561,11 @@ class TopicQueue:
                 json.dump(export_data, f, indent=2, default=str)
         else:
             with open(export_path, 'w', encoding='utf-8') as f:
-                yaml.dump(export_data, f, default_flow_style=False)
+                yaml.dump(export_data, f, Dumper=_YamlDumper, default_flow_style=False)
     
-    def import_topics_from_file(self, filepath: str) -> int:
-        """Import topics from a file"""
+    def import_topics_from_file(self, filepath: str, duplicate_policy: Optional[str] = None) -> int:
+        """Import topics from a file (near-duplicates handled per `duplicate_policy`)"""
+        policy = duplicate_policy or self.duplicate_policy
         import_path = Path(filepath)
         if not import_path.exists():
             raise FileNotFoundError(f"Import file not found: {filepath}")
@@ -316,24 +575,35 @@ class TopicQueue:
                 data = json.load(f)
         else:
             with open(import_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=_YamlLoader)
         
         imported_count = 0
+        entries = []
         
         # Import pending topics
         if 'pending_topics' in data:
-            for topic_data in data['pending_topics']:
-                try:
-                    topic = TopicItem(**topic_data)
-                    # Generate new ID to avoid conflicts
-                    topic.id = datetime.now().strftime("%Y%m%d_%H%M%S") + f"_{imported_count}"
-                    self.pending_topics.append(topic)
-                    imported_count += 1
-                except Exception as e:
-                    self.logger.warning(f"Failed to import topic: {e}")
-        
-        self._save_queues()
-        self.logger.info(f"Imported {imported_count} topics")
+            with self._lock:
+                self.last_duplicates = []
+                for topic_data in data['pending_topics']:
+                    try:
+                        topic = TopicItem(**topic_data)
+                        if not self._check_duplicate(topic, policy):
+                            continue
+                        # Generate new ID to avoid conflicts
+                        topic.id = self._unique_id(datetime.now().strftime("%Y%m%d_%H%M%S") + f"_{imported_count}")
+                        self._index_pending(topic)
+                        entries.append({'op': 'add', 'topic': topic.model_dump()})
+                        imported_count += 1
+                    except Exception as e:
+                        self.logger.warning(f"Failed to import topic: {e}")
+                
+                # Bulk imports go straight to a fresh snapshot instead of a huge journal;
+                # if the snapshot cannot be written, journal them so nothing is lost
+                if not (entries and self._journal_ops + len(entries) >= self.compact_every and self._compact_locked()):
+                    self._journal(entries)
+        
+        skipped = len(self.last_duplicates) if policy == 'skip' else 0
+        self.logger.info(f"Imported {imported_count} topics" + (f" ({skipped} near-duplicates skipped)" if skipped else ""))
         return imported_count
 
 
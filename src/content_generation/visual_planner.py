@@ -31,6 +31,7 @@ except Exception:  # pragma: no cover
     jsonschema_validate = None
 
 from .content_models import VisualPlan
+from .script_index import ScriptIndex
 
 
 class VisualPlanner:
@@ -93,21 +94,25 @@ class VisualPlanner:
                 self.logger.warning(f"Failed to load visual plan schema: {e}")
 
     # ------------------------ Public API ------------------------
-    def plan_visuals(self, *, script_text: str, topic: str) -> VisualPlan:
+    def plan_visuals(self, *, script_text: str = "", topic: str, index: Optional[ScriptIndex] = None) -> VisualPlan:
         """Generate a visual plan from full narration text.
 
+        Pass the script's `index` (VideoScript.get_script_index()) to share its
+        tokenization; narration spans are token indexes into it.
         Returns a Pydantic VisualPlan. Raises on fatal validation error.
         """
+        if index is None:
+            index = ScriptIndex.from_text(script_text)
         style_template = self._get_style_template(topic)
         system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(script_text, topic, style_template)
+        user_prompt = self._build_user_prompt(index, topic, style_template)
 
         plan: VisualPlan
         try:
             response_text = self._call_llm(system_prompt, user_prompt)
             raw_json = self._extract_json(response_text)
             # Normalize to contract before Pydantic
-            raw_json = self._coerce_plan(raw_json, topic, style_template, script_text)
+            raw_json = self._coerce_plan(raw_json, topic, style_template, index)
             # Dump raw response for diagnostics
             try:
                 diag_dir = Path(getattr(self.config.paths, 'output', './output')) / 'artifacts' / 'planner_debug'
@@ -129,7 +134,7 @@ class VisualPlanner:
         except Exception as e:
             # Robust fallback: build a minimal, valid plan from the script
             self.logger.warning(f"Visual planner failed to produce a valid plan, using fallback. Reason: {e}")
-            plan = self._build_fallback_plan(script_text=script_text, topic=topic, style_template=style_template)
+            plan = self._build_fallback_plan(index=index, topic=topic, style_template=style_template)
 
         # Persist artifact for audit
         out_path = self.output_dir / f"{topic}_visual_plan.json"
@@ -173,20 +178,20 @@ class VisualPlanner:
             "Output: JSON only. No markdown."
         )
 
-    def _build_user_prompt(self, script_text: str, topic: str, style_template: Dict[str, str]) -> str:
+    def _build_user_prompt(self, index: ScriptIndex, topic: str, style_template: Dict[str, str]) -> str:
         # Derive dynamic inputs
         style_json = json.dumps(style_template, ensure_ascii=False)
         config = self.config.visual_planner
         adapters = getattr(self.config, 'topic_adapters', {}) or {}
         adapter = adapters.get(topic, adapters.get('default', {}))
         adapter_json = json.dumps(adapter, ensure_ascii=False)
-        title = (script_text.splitlines()[0] or topic).strip()[:120]
-        logline = " ".join(script_text.split()[:40]) + ("…" if len(script_text.split()) > 40 else "")
+        script_text = index.text
+        title = ((script_text.splitlines() or [""])[0] or topic).strip()[:120]
+        logline = index.span_text(0, 40) + ("…" if len(index) > 40 else "")
         # Simple beats outline by paragraphs
-        paras = [p.strip() for p in script_text.split("\n\n") if p.strip()]
         outline = []
-        for i, p in enumerate(paras[:10]):
-            words = p.split()
+        for i, (p_start, p_end) in enumerate(index.paragraphs[:10]):
+            words = index.tokens[p_start:p_end]
             outline.append({
                 "id": f"b{i+1:02d}",
                 "title": (" ".join(words[:8]) + ("…" if len(words) > 8 else "")) or f"Section {i+1}",
@@ -242,7 +247,7 @@ class VisualPlanner:
             return json.loads(text[start:end + 1])
         raise ValueError("Could not extract JSON object from planner output")
 
-    def _coerce_plan(self, data: Dict[str, Any], topic: str, style_template: Dict[str, str], script_text: str) -> Dict[str, Any]:
+    def _coerce_plan(self, data: Dict[str, Any], topic: str, style_template: Dict[str, str], index: ScriptIndex) -> Dict[str, Any]:
         # Unwrap common wrapper
         if isinstance(data, dict) and "visual_plan" in data and isinstance(data["visual_plan"], dict):
             data = data["visual_plan"]
@@ -277,16 +282,16 @@ class VisualPlanner:
             beats = []
         norm_beats = []
         # Estimate total seconds from script
-        words = script_text.split()
+        words = index.tokens
         target_total_s = max(60.0, len(words) / float(getattr(self.config, 'planner', {}).get('target_wpm', 150)) * 60.0) if isinstance(getattr(self.config, 'planner', {}), dict) else max(60.0, len(words)/150*60)
         if not beats:
             # Build simple beats if missing
-            paras = [p.strip() for p in script_text.split("\n\n") if p.strip()]
-            for i, p in enumerate(paras[:8]):
+            for i, (p_start, p_end) in enumerate(index.paragraphs[:8]):
+                p = index.span_text(p_start, p_end)
                 norm_beats.append({
                     "id": f"beat_{i+1:03d}",
                     "title": (p.split(". ")[0][:80] if p else f"Section {i+1}"),
-                    "summary": (" ".join(p.split()[:28]) + ("…" if len(p.split())>28 else "")),
+                    "summary": (index.span_text(p_start, p_start + 28) + ("…" if p_end - p_start > 28 else "")),
                     "estimated_duration_s": 10.0,
                     "visuals": ["establishing wide", "insert detail"],
                 })
@@ -320,7 +325,7 @@ class VisualPlanner:
             "establishing","medium_detail","insert","map","diagram","archival","reenactment","abstract"
         ]
         total_secs = sum(b.get("estimated_duration_s", 0.0) for b in norm_beats) or 1.0
-        tokens = script_text.split()
+        tokens = index.tokens
         total_tokens = len(tokens) or 1
         cursor = 0
         fixed_beats = []
@@ -385,9 +390,8 @@ class VisualPlanner:
             for e in norm_entities:
                 bp_entities[e["id"]] = BPEntity(id=e["id"], kind=e.get("kind","entity"), descriptor=e.get("descriptor",""))
 
-            tokens = tokens  # already split script_text.split()
             from typing import List as _List
-            from src.visual.beat_planner import _window_tokens, tokens_to_duration_s, _avoid_repeats
+            from src.visual.beat_planner import tokens_to_duration_s, _avoid_repeats
             enriched_beats = []
             last_shots: _List[str] = []
             current_t: float = 0.0  # timeline cursor for chaining
@@ -396,7 +400,7 @@ class VisualPlanner:
                 et = int(b["narration_span"]["end_token"])
                 st = max(0, min(st, len(tokens)))
                 et = max(st, min(et, len(tokens)))
-                text_span = _window_tokens(tokens, st, et)
+                text_span = index.window_text(st, et)
                 # Shot diversity and timing
                 original_shot = str(b.get("shot_type","establishing"))
                 shot = _avoid_repeats(original_shot, last_shots)
@@ -487,9 +491,9 @@ class VisualPlanner:
         }
 
     # ------------------------ Fallback Builder ------------------------
-    def _build_fallback_plan(self, *, script_text: str, topic: str, style_template: Dict[str, str]) -> VisualPlan:
+    def _build_fallback_plan(self, *, index: ScriptIndex, topic: str, style_template: Dict[str, str]) -> VisualPlan:
         """Construct a minimal, schema-valid plan from the script when LLM output is invalid."""
-        words = script_text.split()
+        words = index.tokens
         total_words = max(1, len(words))
         # Estimate seconds at ~2.5 words/sec (150 wpm)
         est_total_s = total_words / 2.5
@@ -507,7 +511,7 @@ class VisualPlanner:
         start_idx = 0
         for i in range(num_beats):
             end_idx = total_words if i == num_beats - 1 else min(total_words, start_idx + tokens_per_beat)
-            snippet = " ".join(words[start_idx:end_idx])
+            snippet = index.span_text(start_idx, end_idx)
             shot = shot_types[i % len(shot_types)] if shot_types else "establishing"
             beat_id = f"beat_{i+1:03d}"
             beats.append({
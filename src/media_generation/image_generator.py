@@ -2,9 +2,10 @@
 
 import asyncio
 import logging
+import time
 import torch
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 import numpy as np
 from PIL import Image
 import hashlib
@@ -12,6 +13,10 @@ import json
 from datetime import datetime
 
 from .media_models import GeneratedImage, ImageGenerationRequest, StylePreset
+from .image_writer import ImageWriter
+from .render_plan import RenderSlot, plan_renders
+from ..utils import metrics, tracing
+from ..utils.logger import sampled
 
 
 class ImageGenerator:
@@ -24,6 +29,7 @@ class ImageGenerator:
         # Paths
         self.output_dir = Path(getattr(config.paths, 'output', './output')) / 'images'
         self.temp_dir = Path(getattr(config.paths, 'temp', './temp')) / 'images'
+        self.draft_dir = self.temp_dir / 'drafts'  # QA drafts: never cached, deleted after scoring
         self.models_dir = Path(getattr(config.paths, 'models', './models')) / 'image_generation'
         self.cache_dir = Path(getattr(config.paths, 'cache', './temp/cache'))
         
@@ -77,6 +83,7 @@ class ImageGenerator:
             self.logger.info(f"RTX 5080 Available VRAM: {(torch.cuda.get_device_properties(0).total_memory - torch.cuda.memory_allocated()) / 1024**3:.1f} GB")
                 # Model components
         self.pipeline = None
+        self.img2img_pipeline = None  # built lazily from self.pipeline's components
         self.is_loaded = False
         
         # Style presets
@@ -85,6 +92,23 @@ class ImageGenerator:
         # Generation cache
         self.cache_enabled = True
         self.cache_metadata = self._load_cache_metadata()
+
+        # Background writer: encoding/disk I/O never blocks the render loop
+        ig = config.image_generation
+        self.image_writer = ImageWriter(
+            fmt=getattr(ig, 'output_format', 'png'),
+            png_compress_level=getattr(ig, 'png_compress_level', 1),
+            webp_method=getattr(ig, 'webp_method', 4),
+            max_workers=getattr(ig, 'writer_workers', 2),
+            max_pending=getattr(ig, 'writer_max_pending', 8),
+            fsync=getattr(ig, 'writer_fsync', True),
+            on_failed=self._forget_failed_writes,
+        )
+
+        # Within-run dedup: identical requests render once, near-identical ones become img2img variants
+        self.dedupe_renders = getattr(ig, 'dedupe_renders', True)
+        self.variant_similarity = float(getattr(ig, 'variant_similarity', 0.9))
+        self.variant_strength = float(getattr(ig, 'variant_strength', 0.35))
     
     def _load_style_presets(self) -> Dict[str, StylePreset]:
         """Load predefined style presets for different topics"""
@@ -293,11 +317,18 @@ class ImageGenerator:
         except Exception as e:
             self.logger.warning(f"Pipeline optimization failed: {e}")
     
+    @tracing.traced("image.generate_images", cat="image")
     async def generate_images(self, prompts, topic: str,
-                            timestamps: List[float] = None, progress_callback=None) -> List[GeneratedImage]:
+                            timestamps: List[float] = None, progress_callback=None,
+                            variants: bool = True, draft: bool = False) -> List[GeneratedImage]:
         """Generate images from prompts.
         Accepts either List[str] or List[dict] with keys:
         prompt, negatives, seed, steps, guidance, width, height, timestamp.
+        
+        Rich prompts only: `variants=False` renders every distinct request from its
+        own seed (no img2img variants). `draft=True` is for throwaway QA drafts:
+        no variants, no image cache, and files go to the temp dir; remove them
+        with `discard_images` once scored.
         """
         if not self.is_loaded:
             await self.initialize()
@@ -350,18 +381,19 @@ class ImageGenerator:
 
             # Rich path (one-by-one to respect per-prompt seeds/settings)
             W, H = map(int, self.resolution.split('x'))
-            for idx, req in enumerate(prompts):
-                # Normalize request
-                # Truncate to CLIP-safe lengths (~75 tokens)
-                def _clip_sanitize(text: str, max_tokens: int = 75) -> str:
-                    if not text:
-                        return ""
-                    parts = text.replace("\n", " ").split()
-                    if len(parts) <= max_tokens:
-                        return " ".join(parts)
-                    return " ".join(parts[:max_tokens])
+            # Truncate to CLIP-safe lengths (~75 tokens)
+            def _clip_sanitize(text: str, max_tokens: int = 75) -> str:
+                if not text:
+                    return ""
+                parts = text.replace("\n", " ").split()
+                if len(parts) <= max_tokens:
+                    return " ".join(parts)
+                return " ".join(parts[:max_tokens])
 
-                r = {
+            requests = []
+            for req in prompts:
+                # Normalize request
+                requests.append({
                     "prompt": _clip_sanitize(req.get("prompt", "")),
                     "negatives": _clip_sanitize(req.get("negatives", style_preset.negative_prompt if hasattr(style_preset, 'negative_prompt') else "")),
                     "seed": req.get("seed"),
@@ -371,20 +403,80 @@ class ImageGenerator:
                     "height": req.get("height", H),
                     "timestamp": req.get("timestamp", req.get("start_s", 0.0)),
                     "model_id": req.get("model_id", self.model_name),
-                }
+                    # Variant families: only siblings of one shot type/seed group share a base
+                    "shot_type": req.get("shot_type"),
+                    "seed_group": req.get("seed_group"),
+                })
 
-                key = self._make_cache_key_rich(r)
-                try:
-                    self.logger.info(f"IMG gen {idx+1}/{len(prompts)} seed={r.get('seed')} steps={r.get('steps')} guidance={r.get('guidance')} {r.get('width')}x{r.get('height')} t={r.get('timestamp')} prompt='{r['prompt'][:90]}'")
-                except Exception:
-                    pass
-                cached = self._get_cached_image(key)
-                if cached:
-                    image_path = cached
+            if self.dedupe_renders:
+                slots = plan_renders(requests, self._make_cache_key_rich,
+                                     similarity=self.variant_similarity,
+                                     variants=variants and not draft and self.variant_strength > 0)
+            else:
+                slots = [RenderSlot(i) for i in range(len(requests))]
+            reused = sum(1 for s in slots if s.action == "reuse")
+            variant_count = sum(1 for s in slots if s.action == "variant")
+            if reused or variant_count:
+                self.logger.info(f"Render plan: {len(requests) - reused - variant_count} full renders, "
+                                 f"{variant_count} img2img variants, {reused} reused of {len(requests)} requests")
+
+            # Bases are kept in memory only until their last variant has rendered
+            variants_left: Dict[int, int] = {}
+            for s in slots:
+                if s.action == "variant":
+                    variants_left[s.source] = variants_left.get(s.source, 0) + 1
+            base_images: Dict[int, Image.Image] = {}
+            keys: Dict[int, str] = {}
+            paths: Dict[int, str] = {}
+            saved = metrics.counter("video_ai_image_renders_saved_total",
+                                    "Render requests served without a full txt2img pass", ["kind"])
+
+            for slot, r in zip(slots, requests):
+                idx = slot.index
+                settings = {
+                    "model": self.model_name,
+                    "resolution": f"{r['width']}x{r['height']}",
+                    "guidance_scale": r["guidance"],
+                    "num_inference_steps": r["steps"],
+                    "seed": r["seed"],
+                }
+                if slot.action == "reuse":
+                    image_path = paths[slot.source]
+                    saved.labels(kind="reuse").inc()
+                    settings["reused_from"] = slot.source
                 else:
-                    image_pil = await self._render_one(r)
-                    image_path = await self._save_image(image_pil, r["prompt"], safe_topic, r["timestamp"])
-                    self._cache_image(key, image_path)
+                    key = self._make_cache_key_rich(r)
+                    if slot.action == "variant":
+                        key = self._make_variant_key(key, keys[slot.source])
+                        settings["variant_of"] = slot.source
+                        settings["img2img_strength"] = self.variant_strength
+                    keys[idx] = key
+                    try:
+                        self.logger.info(f"IMG gen {idx+1}/{len(prompts)} {slot.action} seed={r.get('seed')} steps={r.get('steps')} guidance={r.get('guidance')} {r.get('width')}x{r.get('height')} t={r.get('timestamp')} prompt='{r['prompt'][:90]}'", extra=sampled("image.gen"))
+                    except Exception:
+                        pass
+                    image_pil = None
+                    cached = None if draft else self._get_cached_image(key)
+                    if cached:
+                        image_path = cached
+                    else:
+                        if slot.action == "variant":
+                            base = base_images.get(slot.source) or await self._load_image(paths[slot.source])
+                            image_pil = await self._render_variant(r, base)
+                            saved.labels(kind="variant").inc()
+                        else:
+                            image_pil = await self._render_one(r)
+                        image_path = await self._save_image(image_pil, r["prompt"], safe_topic, r["timestamp"],
+                                                            self.draft_dir if draft else None)
+                        if not draft:
+                            self._cache_image(key, image_path)
+                    if variants_left.get(idx):
+                        base_images[idx] = image_pil if image_pil is not None else await self._load_image(image_path)
+                    if slot.action == "variant":
+                        variants_left[slot.source] -= 1
+                        if not variants_left[slot.source]:
+                            base_images.pop(slot.source, None)
+                paths[idx] = image_path
 
                 gen = GeneratedImage(
                     id=f"{safe_topic}_{idx:03d}_{int(r['timestamp'])}",
@@ -393,13 +485,7 @@ class ImageGenerator:
                     timestamp=r["timestamp"],
                     duration=8.0,
                     style_used=style_preset.name,
-                    generation_settings={
-                        "model": self.model_name,
-                        "resolution": f"{r['width']}x{r['height']}",
-                        "guidance_scale": r["guidance"],
-                        "num_inference_steps": r["steps"],
-                        "seed": r["seed"],
-                    },
+                    generation_settings=settings,
                     quality_score=0.8
                 )
                 all_images.append(gen)
@@ -419,6 +505,7 @@ class ImageGenerator:
         s = f"{r['prompt']}||{r.get('negatives','')}||{r.get('seed')}||{r.get('steps')}||{r.get('guidance')}||{r.get('width')}x{r.get('height')}||{r.get('model_id','sdxl')}"
         return hashlib.md5(s.encode()).hexdigest()
 
+    @tracing.traced("image.render", cat="image")
     async def _render_one(self, r: Dict[str, Any]) -> Image.Image:
         # Render a single image honoring per-request seed and settings
         import gc
@@ -430,6 +517,7 @@ class ImageGenerator:
         negatives = r.get('negatives', '')
         seed = r.get('seed') if r.get('seed') is not None else 42
         generator = torch.Generator(device=self.device).manual_seed(int(seed))
+        started = time.perf_counter()
         with torch.no_grad():
             results = self.pipeline(
                 prompt=r['prompt'],
@@ -444,9 +532,62 @@ class ImageGenerator:
             )
         image = results.images[0]
         del results
+        self._record_renders(1, time.perf_counter() - started)
         torch.cuda.empty_cache(); gc.collect()
         return image
     
+    def _make_variant_key(self, key: str, base_key: str) -> str:
+        return hashlib.md5(f"{key}||img2img:{base_key}:{self.variant_strength}".encode()).hexdigest()
+
+    def _get_img2img_pipeline(self):
+        """Image-to-image view of the loaded pipeline (shares its weights; no extra VRAM)"""
+        if self.img2img_pipeline is None:
+            try:
+                from diffusers import AutoPipelineForImage2Image
+                self.img2img_pipeline = AutoPipelineForImage2Image.from_pipe(self.pipeline)
+                self.logger.info(f"img2img variants enabled via {type(self.img2img_pipeline).__name__}")
+            except Exception as e:
+                self.logger.warning(f"img2img pipeline unavailable, variants fall back to full renders: {e}")
+                self.img2img_pipeline = False
+        return self.img2img_pipeline or None
+
+    async def _load_image(self, image_path: str) -> Image.Image:
+        """Decode an already-written (or still queued) image, e.g. a cached variant base"""
+        await self.wait_for_image(image_path)
+
+        def _read() -> Image.Image:
+            with Image.open(image_path) as img:
+                return img.convert("RGB")
+
+        return await asyncio.to_thread(_read)
+
+    @tracing.traced("image.render_variant", cat="image")
+    async def _render_variant(self, r: Dict[str, Any], base_image: Image.Image) -> Image.Image:
+        """Low-strength img2img from a near-identical base: ~strength x steps denoising steps"""
+        pipe = self._get_img2img_pipeline()
+        if pipe is None:
+            return await self._render_one(r)
+        import gc
+        seed = r.get('seed') if r.get('seed') is not None else 42
+        generator = torch.Generator(device=self.device).manual_seed(int(seed))
+        started = time.perf_counter()
+        with torch.no_grad():
+            results = pipe(
+                prompt=r['prompt'],
+                negative_prompt=r.get('negatives', ''),
+                image=base_image,
+                strength=self.variant_strength,
+                num_inference_steps=int(r.get('steps')),
+                guidance_scale=float(r.get('guidance')),
+                generator=generator,
+            )
+        image = results.images[0]
+        del results
+        self._record_renders(1, time.perf_counter() - started)
+        torch.cuda.empty_cache(); gc.collect()
+        return image
+
+    @tracing.traced("image.render_batch", cat="image")
     async def _generate_batch(self, prompts: List[str], timestamps: List[float],
                             style_preset: StylePreset, topic: str) -> List[GeneratedImage]:
         """Generate a batch of images"""
@@ -479,7 +620,7 @@ class ImageGenerator:
                 cached_path = self._get_cached_image(cache_key)
                 
                 if cached_path:
-                    self.logger.info(f"Using cached image for prompt {i+1}")
+                    self.logger.info(f"Using cached image for prompt {i+1}", extra=sampled("image.cached"))
                     cached_results.append((i, cached_path))
                 else:
                     non_cached_prompts.append(prompt)
@@ -504,6 +645,7 @@ class ImageGenerator:
                 width, height = map(int, self.resolution.split('x'))
                 
                 # Generate images with clean output (no diffusers progress bars)
+                started = time.perf_counter()
                 with torch.no_grad():
                     try:
                         results = self.pipeline(
@@ -520,6 +662,7 @@ class ImageGenerator:
                         )
                         
                         generated_images = results.images
+                        self._record_renders(len(generated_images), time.perf_counter() - started)
                         
                         # Immediate memory cleanup after generation
                         del results
@@ -587,9 +730,15 @@ class ImageGenerator:
             self.logger.error(f"Batch generation failed: {e}")
             raise
     
+    def _record_renders(self, count: int, seconds: float) -> None:
+        metrics.counter("video_ai_images_generated_total", "Images rendered by the diffusion pipeline").inc(count)
+        metrics.rate("video_ai_images_per_minute", "Images rendered per minute (trailing 5 min)").mark(count)
+        if count:
+            metrics.histogram("video_ai_image_render_seconds", "Diffusion time per image").observe(seconds / count)
+    
     async def _save_image(self, image: Image.Image, prompt: str, topic: str, 
-                         timestamp: float) -> str:
-        """Save generated image to file"""
+                         timestamp: float, directory: Optional[Path] = None) -> str:
+        """Queue generated image for background encoding; returns its final path"""
         
         try:
             # Create safe filename
@@ -601,19 +750,42 @@ class ImageGenerator:
             safe_topic = str(topic) if topic else "generic"
             filename = f"{safe_topic}_{timestamp_str}_{safe_prompt}.png"
             
-            # Save to output directory
-            output_path = self.output_dir / safe_topic / filename
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Save image with high quality
-            image.save(output_path, "PNG", optimize=True, quality=95)
+            # Save to output directory (extension follows the writer format)
+            output_path = (directory or self.output_dir) / safe_topic / filename
+            image_path = await self.image_writer.submit(image, output_path)
             
-            self.logger.debug(f"Image saved: {output_path}")
-            return str(output_path)
+            self.logger.debug(f"Image queued: {image_path}")
+            return image_path
             
         except Exception as e:
             self.logger.error(f"Failed to save image: {e}")
             raise
+
+    async def wait_for_image(self, image_path: Optional[str]) -> None:
+        """Block until a queued image is on disk (e.g. before captioning it)"""
+        await self.image_writer.wait(image_path)
+
+    async def discard_images(self, image_paths: Iterable[Optional[str]]) -> None:
+        """Delete throwaway images (QA drafts) once their queued writes have finished"""
+        for path in dict.fromkeys(p for p in image_paths if p):
+            try:
+                await self.image_writer.wait(path)
+            except Exception:
+                pass  # the write failed, nothing on disk to remove
+            Path(path).unlink(missing_ok=True)
+    
+    async def flush_writes(self) -> int:
+        """Stage end: wait for all queued image writes and fsync them; raises if any failed"""
+        return await self.image_writer.flush()
+
+    def _forget_failed_writes(self, paths: List[str]) -> None:
+        """Drop cache entries whose file never reached disk"""
+        failed = set(paths)
+        stale = [k for k, meta in self.cache_metadata.items() if meta.get("path") in failed]
+        for k in stale:
+            del self.cache_metadata[k]
+        if stale:
+            self._save_cache_metadata()
     
     def _enhance_prompt(self, base_prompt: str, style_preset: StylePreset) -> str:
         """Enhance prompt with style preset"""
@@ -628,6 +800,10 @@ class ImageGenerator:
         
         return enhanced
     
+    def steps_for_topic(self, topic: Optional[str]) -> int:
+        """Full inference steps a request without its own `steps` renders at"""
+        return int(self._get_style_preset_for_topic(str(topic) if topic else "generic").num_inference_steps)
+    
     def _get_style_preset_for_topic(self, topic: str) -> StylePreset:
         """Get appropriate style preset for topic"""
         
@@ -670,15 +846,18 @@ class ImageGenerator:
         if not self.cache_enabled:
             return None
         
+        lookups = metrics.cache_requests()
         if cache_key in self.cache_metadata:
             cached_path = self.cache_metadata[cache_key]["path"]
-            if Path(cached_path).exists():
+            if Path(cached_path).exists() or self.image_writer.is_pending(cached_path):
+                lookups.labels(cache="image", result="hit").inc()
                 return cached_path
             else:
                 # Remove invalid cache entry
                 del self.cache_metadata[cache_key]
                 self._save_cache_metadata()
         
+        lookups.labels(cache="image", result="miss").inc()
         return None
     
     def _cache_image(self, cache_key: str, image_path: str):
@@ -755,6 +934,9 @@ class ImageGenerator:
             "device": str(self.device),
             "batch_size": self.batch_size,
             "cache_entries": len(self.cache_metadata),
+            "image_format": self.image_writer.format,
+            "images_written": self.image_writer.stats["written"],
+            "image_write_failures": self.image_writer.stats["failed"],
             "gpu_memory_allocated": torch.cuda.memory_allocated() / 1e9 if torch.cuda.is_available() else 0,
             "gpu_memory_reserved": torch.cuda.memory_reserved() / 1e9 if torch.cuda.is_available() else 0
         }
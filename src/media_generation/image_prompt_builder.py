@@ -86,6 +86,7 @@ def build_prompts(*, visual_plan: Dict[str, Any], style_template: Dict[str, str]
             out = {
                 "beat_id": beat_id,
                 "shot_type": _normalize_shot(shot_type),
+                "seed_group": seed_group,
                 "prompt": full_prompt,
                 "negatives": negatives_merged,
                 "seed": int(seed),
@@ -0,0 +1,193 @@
+"""Background image writer: encodes and persists rendered frames off the event loop.
+
+The generator hands a PIL image to `ImageWriter.submit()` and immediately gets
+back the final path; encoding and disk I/O run on a small thread pool so the
+GPU never waits on zlib or the filesystem. Call `flush()` at the end of a
+stage to wait for outstanding writes and fsync them; it raises if any write
+failed, since callers already hold (and may have cached) those paths.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image
+
+
+# format -> file extension (formats the captioner and assembler can open)
+SUPPORTED_FORMATS = {
+    "png": ".png",
+    "webp": ".webp",
+}
+
+
+class ImageWriter:
+    """Asynchronous, bounded image writer pool"""
+
+    def __init__(self, fmt: str = "png", png_compress_level: int = 1,
+                 webp_method: int = 4, max_workers: int = 2, max_pending: int = 8,
+                 fsync: bool = True, on_failed: Optional[Callable[[List[str]], None]] = None):
+        self.logger = logging.getLogger('video_ai.image_writer')
+        fmt = str(fmt or "png").lower()
+        if fmt not in SUPPORTED_FORMATS:
+            self.logger.warning(f"Unknown image output format '{fmt}', falling back to png")
+            fmt = "png"
+        self.format = fmt
+        self.extension = SUPPORTED_FORMATS[fmt]
+        self.png_compress_level = max(0, min(9, int(png_compress_level)))
+        self.webp_method = max(0, min(6, int(webp_method)))
+        self.max_pending = max(1, int(max_pending))
+        self.fsync_enabled = bool(fsync)
+        self.on_failed = on_failed  # called from flush() with the paths that were never written
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)),
+                                            thread_name_prefix="image_writer")
+        self._pending: Dict[str, Future] = {}
+        self._written: List[str] = []
+        self._failed: List[str] = []
+        self._lock = Lock()
+        self.stats = {"submitted": 0, "written": 0, "failed": 0, "bytes": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def resolve_path(self, output_path: Path) -> Path:
+        """Return the on-disk path for `output_path` in the configured format"""
+        return Path(output_path).with_suffix(self.extension)
+
+    async def submit(self, image: Image.Image, output_path: Path) -> str:
+        """Queue `image` for encoding and return its final path without waiting for disk.
+
+        Applies backpressure once `max_pending` writes are in flight so that a
+        slow disk cannot accumulate unbounded decoded frames in memory. A second
+        submit for the same path waits for the first write, so the file always
+        ends up holding the image submitted last.
+        """
+        path = self.resolve_path(output_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        key = str(path)
+
+        while True:
+            with self._lock:
+                blocker = self._pending.get(key)
+                if blocker is None and len(self._pending) >= self.max_pending:
+                    blocker = next(iter(self._pending.values()))
+                if blocker is None:
+                    # No await between this check and the insert, so the slot is ours
+                    future = self._executor.submit(self._encode_and_write, image, path)
+                    self._pending[key] = future
+                    self.stats["submitted"] += 1
+                    break
+            # A failed earlier write is reported by flush(); it must not fail this submit
+            await asyncio.gather(asyncio.wrap_future(blocker), return_exceptions=True)
+
+        future.add_done_callback(lambda f, k=key: self._on_done(k, f))
+        return key
+
+    def is_pending(self, path: str) -> bool:
+        """True while a write for `path` is queued or in progress"""
+        with self._lock:
+            return str(path) in self._pending
+
+    async def wait(self, path: Optional[str]) -> None:
+        """Wait until `path` (if queued) has been written; raises if the write failed"""
+        if not path:
+            return
+        with self._lock:
+            future = self._pending.get(str(path))
+        if future is not None:
+            await asyncio.wrap_future(future)
+
+    async def flush(self) -> int:
+        """Wait for every outstanding write, then fsync the files written since the last flush.
+
+        Returns the number of files made durable. Raises RuntimeError if any
+        write since the last flush failed (after `on_failed` has seen the paths).
+        """
+        with self._lock:
+            futures = list(self._pending.values())
+        if futures:
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True)
+        with self._lock:
+            written, self._written = self._written, []
+            failed, self._failed = self._failed, []
+        if self.fsync_enabled and written:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._fsync_paths, written)
+        if written:
+            self.logger.info(f"Image writer flushed {len(written)} files ({self.format})")
+        if failed:
+            if self.on_failed is not None:
+                self.on_failed(failed)
+            raise RuntimeError(f"{len(failed)} image write(s) failed, e.g. {failed[0]}")
+        return len(written)
+
+    def close(self) -> None:
+        """Block until queued writes finish and release the pool"""
+        self._executor.shutdown(wait=True)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def _encode_and_write(self, image: Image.Image, path: Path) -> str:
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.part")
+        with open(tmp_path, "wb") as f:
+            if self.format == "webp":
+                image.save(f, "WEBP", lossless=True, method=self.webp_method)
+            else:
+                # Low zlib effort: ~10x faster than optimize=True for a few % more bytes
+                image.save(f, "PNG", compress_level=self.png_compress_level)
+            size = f.tell()
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.stats["bytes"] += size
+        return str(path)
+
+    def _on_done(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(key) is future:
+                self._pending.pop(key)
+            if future.exception() is None:
+                self._written.append(key)
+                self.stats["written"] += 1
+            else:
+                self._failed.append(key)
+                self.stats["failed"] += 1
+        if future.exception() is not None:
+            self.logger.error(f"Failed to write image {key}: {future.exception()}")
+
+    @staticmethod
+    def _fsync_paths(paths: List[str]) -> None:
+        dirs = set()
+        for p in paths:
+            try:
+                fd = os.open(p, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                dirs.add(os.path.dirname(p))
+            except OSError:
+                pass
+        # Persist the directory entries too (POSIX only)
+        if os.name == "posix":
+            for d in dirs:
+                try:
+                    fd = os.open(d or ".", os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
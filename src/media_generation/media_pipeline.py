@@ -1,18 +1,21 @@
 """Main media generation pipeline that orchestrates TTS and image generation"""
 
 import asyncio
+import json
 import logging
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
 from ..content_generation.content_models import VideoScript, ImagePrompt
+from ..content_generation.script_index import ScriptIndex
 from .media_models import (
     MediaGenerationResult, AudioGenerationRequest, ImageGenerationRequest,
     AudioSegment, GeneratedImage, AudioQuality
 )
 from .tts_engine import TTSEngine
 from .image_generator import ImageGenerator
+from .render_plan import fallback_prompt
 from .qa.image_captioner import caption_image
 from .qa.qa_rules import passes_similarity, check_diversity
 from ..utils.seed import seed_for_image
@@ -23,6 +26,8 @@ from ..content_generation.alignment_providers import align_text_audio
 from ..media_generation.image_prompt_builder import build_prompts
 from ..utils.captions import captioner_mode_from_config
 from ..utils.similarity import similarity_mode_from_config
+from ..utils import tracing
+from ..utils.logger import sampled
 
 
 class MediaPipeline:
@@ -65,6 +70,42 @@ class MediaPipeline:
         # fallback to root
         self.artifacts_dir = self.artifacts_root
     
+    def _qa_history(self) -> Dict[str, Dict[str, float]]:
+        """Per-topic QA outcomes of earlier runs (decayed beat and fallback-render counts)"""
+        try:
+            return json.loads((self.artifacts_root / "qa_history.json").read_text(encoding='utf-8'))
+        except Exception:
+            return {}
+    
+    def _record_qa_history(self, topic: Optional[str], beats: int, fallback_renders: int) -> None:
+        history = self._qa_history()
+        prev = history.get(topic or "generic", {})
+        # Halve older runs so the estimate follows prompt/model changes
+        history[topic or "generic"] = {
+            "beats": prev.get("beats", 0.0) * 0.5 + beats,
+            "fallback_renders": prev.get("fallback_renders", 0.0) * 0.5 + fallback_renders,
+        }
+        try:
+            (self.artifacts_root / "qa_history.json").write_text(json.dumps(history, indent=2), encoding='utf-8')
+        except Exception as e:
+            self.logger.warning(f"Could not save QA history: {e}")
+    
+    def _drafts_pay_off(self, topic: Optional[str], full_steps: int, draft_steps: int) -> bool:
+        """Whether QA drafts would have saved steps on this topic's past runs.
+        
+        Per beat, full-step QA costs full * (1 + R) and drafting costs
+        draft * (1 + R) + full, R being fallback renders per beat; drafting
+        wins once R * (full - draft) > draft. No history means no drafts.
+        """
+        past = self._qa_history().get(topic or "generic")
+        if not past or past.get("beats", 0) <= 0:
+            return False
+        retries = past.get("fallback_renders", 0.0) / past["beats"]
+        saved = retries * (full_steps - draft_steps) - draft_steps
+        self.logger.info(f"QA drafts for '{topic}': {retries:.2f} fallback renders/beat historically, "
+                         f"{saved:+.1f} steps saved per beat -> {'on' if saved > 0 else 'off'}")
+        return saved > 0
+    
     async def generate_media(self, video_script: VideoScript, 
                            topic: Optional[str]) -> MediaGenerationResult:
         """Generate all media for a video script"""
@@ -87,19 +128,24 @@ class MediaPipeline:
                 self.logger.info(f"Audio generated: segments={len(audio_segments)}, total_s={sum(s.duration for s in audio_segments):.1f}")
             except Exception:
                 pass
+            # One tokenization of the script for alignment, planning and QA; now with audio times
+            script_index = video_script.get_script_index()
+            try:
+                script_index = script_index.with_audio_segments(audio_segments)
+            except Exception as e:
+                self.logger.warning(f"Token timings from audio segments failed: {e}")
             # Overwrite alignment.json based on actual audio (provider-selected)
             try:
                 import json
-                full_script = video_script.get_full_script_text()
                 mode = getattr(self.config.alignment, 'source', 'heuristic')
-                alignment_data = align_text_audio(full_script, "", mode=mode)
+                alignment_data = align_text_audio(script_index.text, "", mode=mode, index=script_index)
                 (self.artifacts_dir / "alignment.json").write_text(json.dumps(alignment_data, indent=2), encoding='utf-8')
             except Exception:
                 pass
 
             use_enhanced = bool(getattr(self.config.visual_planner, 'use_enhanced_prompts', False))
             if use_enhanced and getattr(self.config.visual_planner, 'enabled', True):
-                generated_images = await self._generate_images_with_enhanced_prompts(video_script, effective_topic)
+                generated_images = await self._generate_images_with_enhanced_prompts(video_script, effective_topic, script_index)
             else:
                 generated_images = await self._generate_images_async(video_script, effective_topic)
             
@@ -116,12 +162,17 @@ class MediaPipeline:
                 shot_types = []
                 accepted = []
                 for img in generated_images:
-                    cap = caption_image(img.file_path or img.id)
-                    # Map to a rough beat index by timestamp proportion
-                    idx = 0
-                    if beat_texts:
-                        idx = min(len(beat_texts)-1, int((img.timestamp / max(1.0, video_script.total_duration)) * len(beat_texts)))
-                    text = beat_texts[idx]
+                    with tracing.span("qa.caption", cat="qa"):
+                        cap = caption_image(img.file_path or img.id)
+                    if script_index.has_times and len(script_index):
+                        # Paragraph being narrated when the image is on screen
+                        text = script_index.paragraph_text(script_index.paragraph_at(script_index.token_at_time(img.timestamp)))
+                    else:
+                        # Map to a rough beat index by timestamp proportion
+                        idx = 0
+                        if beat_texts:
+                            idx = min(len(beat_texts)-1, int((img.timestamp / max(1.0, video_script.total_duration)) * len(beat_texts)))
+                        text = beat_texts[idx]
                     ok = passes_similarity(cap, text, threshold)
                     if ok:
                         accepted.append(img)
@@ -162,36 +213,52 @@ class MediaPipeline:
             self.logger.error(f"Media generation failed: {e}")
             raise
     
-    async def generate_audio(self, script: VideoScript, topic: Optional[str] = None, progress_callback=None) -> str:
-        """Generate audio from script and return final audio file path"""
+    def _audio_request(self, script_text: str) -> AudioGenerationRequest:
+        return AudioGenerationRequest(
+            script_text=script_text,
+            voice_model=self.config.tts.voice_model,
+            quality=AudioQuality(self.config.tts.output_quality),
+            speed=self.config.tts.speed,
+            pitch=self.config.tts.pitch,
+            volume=self.config.tts.volume
+        )
+    
+    def start_narration_stream(self, topic: Optional[str] = None):
+        """Start speculative TTS fed by the script generator (None if disabled)"""
+        if not getattr(self.config.tts, 'stream_from_script', False):
+            return None
+        return self.tts_engine.start_stream(self._audio_request(""), topic)
+    
+    @tracing.traced("media.generate_audio")
+    async def generate_audio(self, script: VideoScript, topic: Optional[str] = None, progress_callback=None,
+                             narration_stream=None) -> str:
+        """Generate audio from script and return final audio file path.
+        
+        With a `narration_stream` that was fed while the script was written,
+        already-synthesized chunks are reused; the result is the same.
+        """
         
         try:
             # Create audio generation request
             full_script = script.get_full_script_text()
             
             # Debug: Log the actual script content length for debugging
-            print(f"\n🎵 AUDIO DEBUG:")
-            print(f"📝 Full script length: {len(full_script)} characters")
-            print(f"📝 Estimated words: ~{len(full_script.split())} words")
-            print(f"📝 Estimated duration: ~{len(full_script.split()) / 150 * 60:.1f} seconds")
-            print(f"📝 Script preview: {full_script[:200]}...")
-            print(f"📝 Script ending: ...{full_script[-200:]}")
+            words = len(script.get_script_index())
+            self.logger.info(f"🎵 Audio script: {len(full_script)} characters, ~{words} words, "
+                             f"~{words / 150 * 60:.1f}s estimated")
+            self.logger.debug(f"📝 Script preview: {full_script[:200]}... ending: ...{full_script[-200:]}")
             
-            request = AudioGenerationRequest(
-                script_text=full_script,
-                voice_model=self.config.tts.voice_model,
-                quality=AudioQuality(self.config.tts.output_quality),
-                speed=self.config.tts.speed,
-                pitch=self.config.tts.pitch,
-                volume=self.config.tts.volume
-            )
+            request = self._audio_request(full_script)
             
             # Generate audio segments with progress tracking
             def tts_progress_callback(percent, message):
                 if progress_callback:
                     progress_callback(percent * 0.8, message)  # 80% for TTS, 20% for concatenation
             
-            segments = await self.tts_engine.generate_audio(request, topic, tts_progress_callback)
+            if narration_stream is not None:
+                segments = await narration_stream.finish(full_script, tts_progress_callback)
+            else:
+                segments = await self.tts_engine.generate_audio(request, topic, tts_progress_callback)
             
             # Concatenate into final audio file
             if progress_callback:
@@ -213,6 +280,7 @@ class MediaPipeline:
             self.logger.error(f"Audio generation failed: {e}")
             raise
     
+    @tracing.traced("media.generate_images")
     async def generate_images(self, image_prompts: List[ImagePrompt], 
                             topic: str, progress_callback=None) -> List[str]:
         """Generate images from prompts and return file paths"""
@@ -226,6 +294,8 @@ class MediaPipeline:
             generated_images = await self.image_generator.generate_images(
                 prompts, topic, timestamps, progress_callback
             )
+            # Stage end: make sure every queued image is on disk before assembly
+            await self.image_generator.flush_writes()
             
             # Return file paths
             return [img.file_path for img in generated_images if img.file_path]
@@ -291,19 +361,24 @@ class MediaPipeline:
         generated_images = await self.image_generator.generate_images(
             prompts, topic, timestamps
         )
+        await self.image_generator.flush_writes()
         
         self.logger.info(f"Generated {len(generated_images)} images")
         return generated_images
 
-    async def _generate_images_with_enhanced_prompts(self, video_script: VideoScript, topic: str) -> List[GeneratedImage]:
+    @tracing.traced("media.enhanced_images")
+    async def _generate_images_with_enhanced_prompts(self, video_script: VideoScript, topic: str,
+                                                     script_index: Optional[ScriptIndex] = None) -> List[GeneratedImage]:
         """Generate images using visual plan enhanced prompts and mapped times."""
         self.logger.info("Generating images using enhanced prompts from visual plan...")
+        index = script_index if script_index is not None else video_script.get_script_index()
         # Build plan → alignment → prompts on-the-fly to avoid tight coupling
         planner = VisualPlanner(self.config)
-        plan = planner.plan_visuals(script_text=video_script.get_full_script_text(), topic=topic)
+        plan = planner.plan_visuals(topic=topic, index=index)
         mode = getattr(self.config.alignment, 'source', 'heuristic')
-        alignment_data = align_text_audio(video_script.get_full_script_text(), "", mode=mode)
-        beats_with_times = map_beats_to_times([b for b in plan.model_dump()["beats"]], alignment_data, max(1.0, video_script.total_duration))
+        alignment_data = align_text_audio(index.text, "", mode=mode, index=index)
+        total_s = index.time_at(len(index)) if index.has_times else video_script.total_duration
+        beats_with_times = map_beats_to_times([b for b in plan.model_dump()["beats"]], alignment_data, max(1.0, total_s), index=index)
         try:
             self.logger.info(f"Planner produced {len(beats_with_times)} beats (after alignment)")
         except Exception:
@@ -340,22 +415,6 @@ class MediaPipeline:
             self.logger.info(f"Rich prompts ready: count={len(prompts)}; first='{(prompts[0].get('prompt') or '')[:120] if prompts else ''}'")
         except Exception:
             pass
-        # Build timestamps directly from prompts
-        timestamps = [p.get("start_s", 0.0) for p in prompts]
-        self.logger.info(f"Generating images with rich prompts: count={len(prompts)}")
-        generated = await self.image_generator.generate_images(
-            [{
-                "prompt": p.get("prompt"),
-                "negatives": p.get("negatives", ""),
-                "seed": p.get("seed"),
-                "steps": p.get("steps"),
-                "guidance": p.get("guidance"),
-                "width": p.get("width"),
-                "height": p.get("height"),
-                "timestamp": t
-            } for p, t in zip(prompts, timestamps)], topic
-        )
-
         # QA with deterministic fallback loop
         from ..utils.similarity import get_threshold_for_topic
         threshold = float(get_threshold_for_topic(self.config, topic))
@@ -364,79 +423,153 @@ class MediaPipeline:
         fallback_order = list(getattr(self.config.visual_planner, 'fallback_shot_order', ["diagram","map","insert"]))
         retry_enabled = bool(getattr(self.config.visual_planner, 'deterministic_retry', True))
         max_retries = int(getattr(self.config.visual_planner, 'max_retries_per_beat', 2))
+        # QA-first: candidates are rendered as low-step drafts (same seed and size, so the
+        # composition carries over); only the winning prompt/seed per beat gets full steps.
+        # "auto" drafts only topics whose QA history says the drafts pay for themselves.
+        draft_qa = getattr(self.config.visual_planner, 'draft_qa', 'auto')
+        draft_steps = int(getattr(self.config.visual_planner, 'draft_steps', 8))
+        if isinstance(draft_qa, str) and draft_qa.strip().lower() == "auto":
+            full_steps = int((prompts[0].get("steps") if prompts else None) or self.image_generator.steps_for_topic(topic))
+            use_drafts = retry_enabled and self._drafts_pay_off(topic, full_steps, draft_steps)
+        else:
+            use_drafts = retry_enabled and bool(draft_qa)
+        if not use_drafts:
+            draft_steps = None
         try:
-            self.logger.info(f"QA config: threshold={threshold} cap_mode={cap_mode} sim_mode={sim_mode} retry={retry_enabled} max_retries={max_retries} fallback_order={fallback_order}")
+            self.logger.info(f"QA config: threshold={threshold} cap_mode={cap_mode} sim_mode={sim_mode} retry={retry_enabled} max_retries={max_retries} fallback_order={fallback_order} draft_steps={draft_steps}")
         except Exception:
             pass
 
-        accepted: List[GeneratedImage] = []
-        qa_details = []
-        # Helper to fetch per-beat text using narration_span if present
-        full_script_text = video_script.get_full_script_text()
+        def render_request(p, prompt=None, seed=None, steps=None, shot_type=None):
+            req = {
+                "prompt": prompt or p.get("prompt"),
+                "shot_type": shot_type or p.get("shot_type"),
+                "seed_group": p.get("seed_group"),
+                "negatives": p.get("negatives", ""),
+                "seed": p.get("seed") if seed is None else seed,
+                "steps": steps or p.get("steps"),
+                "guidance": p.get("guidance"),
+                "width": p.get("width"),
+                "height": p.get("height"),
+                "timestamp": p.get("start_s", 0.0),
+            }
+            # Unset keys fall back to the style preset / configured resolution
+            return {k: v for k, v in req.items() if v is not None}
 
+        # Helper to fetch per-beat text using narration_span if present
         def text_for_prompt(pr):
             span = pr.get('narration_span')
             if span and isinstance(span, dict):
-                tokens = full_script_text.split()
-                s = max(0, int(span.get('start_token', 0)))
-                e = min(len(tokens), int(span.get('end_token', 0)))
-                return " ".join(tokens[s:e]) or full_script_text
-            return full_script_text
+                return index.span_text(span.get('start_token', 0), span.get('end_token', 0)) or index.text
+            return index.text
 
-        namespace = self.config.continuity.seed_namespace
-        topic_key = topic
-        for idx, (p, img) in enumerate(zip(prompts, generated)):
-            cap = caption_image(img.file_path or img.id, mode=cap_mode)
-            ref_text = text_for_prompt(p)
+        async def score(p, img, **span_args):
+            # Captioners may read pixels; only this image needs to be on disk
+            await self.image_generator.wait_for_image(img.file_path)
+            with tracing.span("qa.caption", cat="qa", beat=p.get('beat_id'), **span_args):
+                cap = caption_image(img.file_path or img.id, mode=cap_mode)
             # Bias retry: auto-fail if caption shows statue/wax artifacts
             bad_terms = ["statue", "wax", "engraving", "plaster", "doll"]
             if any(t in (cap or "").lower() for t in bad_terms):
-                sim = 0.0
-            else:
-                sim = cosine_sim(cap, ref_text, mode=sim_mode)
+                return cap, 0.0
+            return cap, cosine_sim(cap, text_for_prompt(p), mode=sim_mode)
+
+        self.logger.info(f"Generating {'draft ' if use_drafts else ''}images with rich prompts: count={len(prompts)}")
+        generated = await self.image_generator.generate_images(
+            [render_request(p, steps=draft_steps) for p in prompts], topic, draft=use_drafts
+        )
+
+        # Per beat: every candidate tried, primary first
+        candidates = []
+        for idx, (p, img) in enumerate(zip(prompts, generated)):
+            cap, sim = await score(p, img)
             try:
-                self.logger.info(f"QA initial: beat={p.get('beat_id')} idx={idx} sim={sim:.3f} file='{(img.file_path or '')[-64:]}' cap='{cap[:90]}'")
+                self.logger.info(f"QA initial: beat={p.get('beat_id')} idx={idx} sim={sim:.3f} file='{(img.file_path or '')[-64:]}' cap='{cap[:90]}'", extra=sampled("qa.initial"))
             except Exception:
                 pass
-            if sim >= threshold or not retry_enabled:
-                accepted.append(img)
-                qa_details.append({"beat_id": p.get('beat_id'), "first_try": {"similarity": float(sim), "image": img.file_path}, "final_status": "passed"})
-                continue
-            # Deterministic fallback loop
-            best_img, best_sim, best_fb = img, sim, None
-            tries = 0
-            for fb in fallback_order:
-                if tries >= max_retries:
-                    break
-                tries += 1
+            candidates.append([{"fallback": None, "prompt": p.get("prompt"), "seed": p.get("seed"),
+                                "image": img, "similarity": float(sim)}])
+
+        # Deterministic fallback rounds: one batched render per fallback shot type
+        namespace = self.config.continuity.seed_namespace
+        topic_key = topic
+        for tries, fb in enumerate(fallback_order[:max_retries] if retry_enabled else [], start=1):
+            pending = [i for i, c in enumerate(candidates) if max(x["similarity"] for x in c) < threshold]
+            if not pending:
+                break
+            alts = []
+            for i in pending:
+                p = prompts[i]
                 alt_seed = seed_for_image(namespace, topic_key, f"{p.get('beat_id')}:{fb}", 1, p.get("entity_id"))
-                alt_prompt = f"{fb} fallback: {p['prompt']}"
-                alt_req = dict(p)
-                alt_req.update({"prompt": alt_prompt, "seed": alt_seed, "timestamp": p.get("start_s", 0.0)})
-                alt_img = (await self.image_generator.generate_images([alt_req], topic))[0]
-                cap2 = caption_image(alt_img.file_path or alt_img.id, mode=cap_mode)
-                sim2 = cosine_sim(cap2, ref_text, mode=sim_mode)
+                alts.append((i, fallback_prompt(fb, p['prompt']), alt_seed))
+            alt_imgs = await self.image_generator.generate_images(
+                [render_request(prompts[i], prompt=alt_prompt, seed=alt_seed, steps=draft_steps, shot_type=fb)
+                 for i, alt_prompt, alt_seed in alts], topic, draft=use_drafts
+            )
+            for (i, alt_prompt, alt_seed), alt_img in zip(alts, alt_imgs):
+                p = prompts[i]
+                _, sim2 = await score(p, alt_img, retry=tries)
                 try:
-                    self.logger.info(f"QA retry: beat={p.get('beat_id')} try={tries} fb={fb} sim2={sim2:.3f} file='{(alt_img.file_path or '')[-64:]}'")
+                    self.logger.info(f"QA retry: beat={p.get('beat_id')} try={tries} fb={fb} sim2={sim2:.3f} file='{(alt_img.file_path or '')[-64:]}'", extra=sampled("qa.retry"))
                 except Exception:
                     pass
-                if sim2 > best_sim:
-                    best_img, best_sim, best_fb = alt_img, sim2, fb
-                if sim2 >= threshold:
-                    break
-            chosen = best_img if best_sim >= sim else img
-            final_status = "passed" if max(sim, best_sim) >= threshold else "failed"
-            accepted.append(chosen)
-            qa_details.append({
-                "beat_id": p.get('beat_id'),
-                "first_try": {"similarity": float(sim), "image": img.file_path},
-                "retry": {"used_fallback": best_fb, "similarity": float(best_sim), "image": chosen.file_path},
-                "final_status": final_status
-            })
+                candidates[i].append({"fallback": fb, "prompt": alt_prompt, "seed": alt_seed,
+                                      "image": alt_img, "similarity": float(sim2)})
+
+        # Winner per beat: highest similarity, the primary keeps ties
+        chosen = []
+        for c in candidates:
+            best = c[0]
+            for x in c[1:]:
+                if x["similarity"] > best["similarity"]:
+                    best = x
+            chosen.append(best)
+
+        if use_drafts:
+            self.logger.info(f"Refining {len(chosen)} chosen drafts at full steps "
+                             f"({sum(len(c) for c in candidates)} drafts at {draft_steps} steps)")
+            # Variants off: every winner is rendered from its own seed, as it was scored
             try:
-                self.logger.info(f"QA final: beat={p.get('beat_id')} status={final_status} best_sim={best_sim:.3f} used_fallback={best_fb}")
-            except Exception:
-                pass
+                accepted = await self.image_generator.generate_images(
+                    [render_request(p, prompt=best["prompt"], seed=best["seed"], shot_type=best["fallback"])
+                     for p, best in zip(prompts, chosen)],
+                    topic, variants=False
+                )
+            finally:
+                await self.image_generator.discard_images(x["image"].file_path for c in candidates for x in c)
+        else:
+            accepted = [best["image"] for best in chosen]
+        if retry_enabled:
+            self._record_qa_history(topic, len(prompts), sum(len(c) - 1 for c in candidates))
+
+        def candidate_path(img):
+            # Drafts are deleted once scored; only full renders are worth pointing at
+            return None if use_drafts else img.file_path
+
+        qa_details = []
+        for p, c, best, img in zip(prompts, candidates, chosen, accepted):
+            first = c[0]
+            final_status = "passed" if best["similarity"] >= threshold else "failed"
+            detail = {
+                "beat_id": p.get('beat_id'),
+                "first_try": {"similarity": first["similarity"], "image": candidate_path(first["image"])},
+            }
+            if len(c) > 1:
+                detail["retry"] = {"used_fallback": best["fallback"], "similarity": best["similarity"],
+                                   "image": candidate_path(best["image"])}
+            detail["final_status"] = final_status
+            if use_drafts:
+                detail["draft_steps"] = draft_steps
+                detail["image"] = img.file_path
+            qa_details.append(detail)
+            if len(c) > 1:
+                try:
+                    self.logger.info(f"QA final: beat={p.get('beat_id')} status={final_status} best_sim={best['similarity']:.3f} used_fallback={best['fallback']}")
+                except Exception:
+                    pass
+
+        # Stage end: flush + fsync all queued writes before artifacts reference them
+        await self.image_generator.flush_writes()
 
         # Write qa_report.json
         try:
@@ -449,6 +582,8 @@ class MediaPipeline:
                 "recovered_after_retry": sum(1 for d in qa_details if d.get("retry") and d["final_status"] == "passed"),
                 "failed_final": sum(1 for d in qa_details if d.get("final_status") == "failed"),
                 "threshold": threshold,
+                "draft_steps": draft_steps,
+                "fallback_renders": sum(len(c) - 1 for c in candidates),
             }
             qa_path.write_text(json.dumps({"summary": summary, "details": qa_details}, indent=2), encoding='utf-8')
         except Exception:
@@ -465,12 +600,12 @@ class MediaPipeline:
                         "start_s": float(p.get('start_s', 0.0)),
                         "end_s": float(p.get('end_s', 0.0)),
                         "shot_type": p.get('shot_type'),
-                        "seed_group": "",
+                        "seed_group": p.get('seed_group', ""),
                         "entity_ids": [],
-                        "image_candidates": [img.file_path],
+                        "image_candidates": [img.file_path] if use_drafts else [x["image"].file_path for x in c],
                         "chosen_image": img.file_path,
                     }
-                    for p, img in zip(prompts, accepted)
+                    for p, c, img in zip(prompts, candidates, accepted)
                 ],
             }
             (self.artifacts_dir / "timeline.json").write_text(json.dumps(timeline, indent=2), encoding='utf-8')
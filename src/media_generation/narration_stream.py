@@ -0,0 +1,157 @@
+"""Speculative script-to-speech streaming
+
+While the script generator is still writing later beats, `NarrationStream`
+receives the stable prefix of the script (complete paragraphs only), runs
+it through the exact TTS preparation path (possessive normalization,
+cleaning, chunking) and synthesizes every chunk that can no longer change
+on a background task.
+
+Nothing streamed is trusted blindly: `finish()` re-chunks the final script
+the same way `TTSEngine.generate_audio()` does, reuses a streamed segment
+only if its chunk text and index match, and synthesizes the rest. Audio
+files, segment ids and timings are therefore identical to the non-streamed
+path; streaming only changes when the work happens.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .media_models import AudioGenerationRequest, AudioSegment as AudioSegmentModel
+
+
+class NarrationStream:
+    """Background TTS over a growing script prefix"""
+
+    def __init__(self, tts_engine, request: AudioGenerationRequest, topic: Optional[str] = None):
+        self.logger = logging.getLogger('video_ai.narration_stream')
+        self.tts = tts_engine
+        self.request = request
+        self.topic = topic
+
+        self._generation = 0
+        self._emitted: List[str] = []
+        self._diverged = False
+        self._last_prefix_len = -1
+        # index -> (chunk text, audio file, duration)
+        self._results: Dict[int, Tuple[str, str, float]] = {}
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self.stats = {"streamed": 0, "reused": 0, "resynthesized": 0}
+
+    # ------------------------------------------------------------------
+    # Producer side (script generator)
+    # ------------------------------------------------------------------
+    def update(self, script_prefix: str) -> None:
+        """Offer the script written so far; only complete paragraphs are considered"""
+        cut = script_prefix.rfind("\n\n")
+        if cut <= 0 or cut == self._last_prefix_len or self._diverged:
+            return
+        self._last_prefix_len = cut
+
+        chunks = self.tts._prepare_chunks(script_prefix[:cut], quiet=True)
+        # The last chunk may still grow with the next paragraph
+        stable = chunks[:-1]
+        for i, chunk in enumerate(stable):
+            if i < len(self._emitted):
+                if self._emitted[i] != chunk:
+                    # The prefix was not really stable (e.g. a regenerated beat);
+                    # stop speculating and let finish() sort it out
+                    self._diverged = True
+                    self.logger.info(f"Narration stream diverged at chunk {i}; remaining chunks will be synthesized at the end")
+                    return
+                continue
+            self._emitted.append(chunk)
+            self._queue.put_nowait((self._generation, i, chunk))
+        if stable and self._worker is None:
+            self._worker = asyncio.ensure_future(self._run())
+
+    def reset(self) -> None:
+        """Discard speculative work (the script is being regenerated from scratch)"""
+        self._generation += 1
+        self._emitted = []
+        self._results = {}
+        self._diverged = False
+        self._last_prefix_len = -1
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    async def _run(self) -> None:
+        while True:
+            generation, index, chunk = await self._queue.get()
+            try:
+                if generation != self._generation:
+                    continue
+                if not self.tts.is_loaded:
+                    await self.tts.initialize()
+                file_path, duration = await self.tts._generate_chunk_audio(
+                    chunk, self.request, f"segment_{index:03d}"
+                )
+                if generation == self._generation:
+                    self._results[index] = (chunk, file_path, duration)
+                    self.stats["streamed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Left for finish() to retry on the normal path
+                self.logger.warning(f"Streamed TTS for chunk {index} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _stop_worker(self) -> None:
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def cancel(self) -> None:
+        """Abandon the stream (e.g. script generation failed)"""
+        self._generation += 1
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    # ------------------------------------------------------------------
+    # Completion
+    # ------------------------------------------------------------------
+    async def finish(self, script_text: str, progress_callback=None) -> List[AudioSegmentModel]:
+        """Segments for the final script, identical to `TTSEngine.generate_audio()`"""
+        if not self.tts.is_loaded:
+            await self.tts.initialize()
+        await self._stop_worker()
+
+        request = self.request.model_copy(update={"script_text": script_text})
+        chunks = self.tts._prepare_chunks(script_text)
+
+        segments = []
+        cumulative_time = 0.0
+        for i, chunk in enumerate(chunks):
+            if progress_callback:
+                progress_callback((i / max(1, len(chunks))) * 80, f"Processing audio chunk {i+1}/{len(chunks)}")
+            cached = self._results.get(i)
+            if cached and cached[0] == chunk:
+                _, file_path, duration = cached
+                self.stats["reused"] += 1
+            else:
+                file_path, duration = await self.tts._generate_chunk_audio(chunk, request, f"segment_{i:03d}")
+                self.stats["resynthesized"] += 1
+            segments.append(self.tts._build_segment(i, chunk, file_path, cumulative_time, duration, request))
+            cumulative_time += duration
+
+        if progress_callback:
+            progress_callback(100, f"Generated {len(segments)} audio segments")
+        self.logger.info(
+            f"Narration stream finished: {len(segments)} segments, {cumulative_time:.1f}s "
+            f"(reused {self.stats['reused']}, synthesized at end {self.stats['resynthesized']})"
+        )
+        return segments
@@ -0,0 +1,87 @@
+"""Within-run render planning: render each distinct request once.
+
+Beat splitting copies a beat's prompts into every sub-beat, so a run often
+asks for the same (prompt, negatives, seed, steps, size) several times, and
+for prompts that differ by a word or two. `plan_renders` decides per request:
+
+- "render":  full txt2img
+- "reuse":   identical to an earlier request -> fan out its file
+- "variant": near-identical to an earlier render of a true sibling (same
+             shot type and seed group, negatives, size, guidance and model;
+             prompt token overlap >= `similarity`) -> low-strength img2img
+             from that base at a fraction of the steps
+
+QA fallback prompts ("<shot> fallback: <prompt>") are never variants or
+variant bases: they exist to get away from a failed image, so they always
+render from their own seed.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_FALLBACK = re.compile(r"^\s*[\w-]+ fallback:")
+
+
+@dataclass
+class RenderSlot:
+    index: int
+    action: str = "render"  # render | reuse | variant
+    source: Optional[int] = None  # request index reused / used as the variant base
+
+
+def prompt_tokens(prompt: str) -> frozenset:
+    return frozenset(_WORD.findall((prompt or "").lower()))
+
+
+def prompt_similarity(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def fallback_prompt(shot_type: str, prompt: str) -> str:
+    return f"{shot_type} fallback: {prompt}"
+
+
+def is_fallback_prompt(prompt: str) -> bool:
+    return bool(_FALLBACK.match(prompt or ""))
+
+
+def _family(r: Dict[str, Any]) -> tuple:
+    # Everything but prompt and seed must match for an img2img variant to be a fair stand-in;
+    # the seed itself is only shared by siblings of one shot type in one seed group
+    return (r.get("shot_type"), r.get("seed_group"), r.get("negatives", ""), r.get("width"),
+            r.get("height"), r.get("guidance"), r.get("model_id"))
+
+
+def plan_renders(requests: Sequence[Dict[str, Any]], key_fn: Callable[[Dict[str, Any]], str],
+                 similarity: float = 0.9, variants: bool = True) -> List[RenderSlot]:
+    """One slot per request; bases always come before the requests that use them"""
+    slots: List[RenderSlot] = []
+    first_by_key: Dict[str, int] = {}
+    bases: Dict[tuple, List[tuple]] = {}  # family -> [(index, tokens)] of full renders
+    for i, r in enumerate(requests):
+        key = key_fn(r)
+        if key in first_by_key:
+            slots.append(RenderSlot(i, "reuse", first_by_key[key]))
+            continue
+        first_by_key[key] = i
+
+        if is_fallback_prompt(r.get("prompt", "")):
+            slots.append(RenderSlot(i, "render"))
+            continue
+        tokens = prompt_tokens(r.get("prompt", ""))
+        family = bases.setdefault(_family(r), [])
+        if variants and similarity < 1.0:
+            best = max(family, key=lambda b: prompt_similarity(tokens, b[1]), default=None)
+            if best is not None and prompt_similarity(tokens, best[1]) >= similarity:
+                slots.append(RenderSlot(i, "variant", best[0]))
+                continue
+        family.append((i, tokens))
+        slots.append(RenderSlot(i, "render"))
+    return slots
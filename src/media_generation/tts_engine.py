@@ -5,6 +5,7 @@ import logging
 import os
 import subprocess
 import sys
+import time
 import torch
 from pathlib import Path
 from typing import List, Optional, Dict, Any
@@ -13,6 +14,8 @@ import soundfile as sf
 from pydub import AudioSegment
 import librosa
 from src.utils.text_normalize import normalize_name_possessives
+from src.utils import metrics, tracing
+from src.utils.logger import sampled
 
 from .media_models import AudioSegment as AudioSegmentModel, AudioGenerationRequest, VoiceProfile
 
@@ -135,6 +138,7 @@ class TTSEngine:
             self.logger.error(f"Failed to initialize TTS engine: {e}")
             raise
     
+    @tracing.traced("tts.generate_audio", cat="tts")
     async def generate_audio(self, request: AudioGenerationRequest, 
                            topic: Optional[str] = None, progress_callback=None) -> List[AudioSegmentModel]:
         """Generate audio from text"""
@@ -174,20 +178,7 @@ class TTSEngine:
                     chunk, request, f"segment_{i:03d}"
                 )
                 
-                segment = AudioSegmentModel(
-                    id=f"segment_{i:03d}",
-                    text=chunk,
-                    file_path=audio_data,
-                    start_time=cumulative_time,
-                    duration=duration,
-                    speaker_voice=request.voice_model,
-                    processing_settings={
-                        "quality": request.quality.value,
-                        "speed": request.speed,
-                        "pitch": request.pitch,
-                        "volume": request.volume
-                    }
-                )
+                segment = self._build_segment(i, chunk, audio_data, cumulative_time, duration, request)
                 
                 audio_segments.append(segment)
                 cumulative_time += duration
@@ -203,6 +194,43 @@ class TTSEngine:
             self.logger.error(f"Audio generation failed: {e}")
             raise
     
+    def _build_segment(self, index: int, text: str, file_path: str, start_time: float,
+                       duration: float, request: AudioGenerationRequest) -> AudioSegmentModel:
+        return AudioSegmentModel(
+            id=f"segment_{index:03d}",
+            text=text,
+            file_path=file_path,
+            start_time=start_time,
+            duration=duration,
+            speaker_voice=request.voice_model,
+            processing_settings={
+                "quality": request.quality.value,
+                "speed": request.speed,
+                "pitch": request.pitch,
+                "volume": request.volume
+            }
+        )
+    
+    def start_stream(self, request: AudioGenerationRequest, topic: Optional[str] = None):
+        """Begin speculative synthesis of a script that is still being written.
+        
+        Feed script prefixes with `NarrationStream.update()`; `finish()` returns
+        exactly what `generate_audio()` would for the final text.
+        """
+        from .narration_stream import NarrationStream
+        return NarrationStream(self, request, topic)
+    
+    def _prepare_chunks(self, script_text: str, quiet: bool = False) -> List[str]:
+        """Possessive normalization + cleaning + chunking, as used by generate_audio"""
+        try:
+            script_text = normalize_name_possessives(script_text)
+        except Exception:
+            pass
+        if quiet:
+            return self._chunk_cleaned_text(self._clean_text(script_text))
+        return self._split_text_into_chunks(script_text)
+    
+    @tracing.traced("tts.chunk", cat="tts")
     async def _generate_chunk_audio(self, text: str, request: AudioGenerationRequest, 
                                   segment_id: str) -> tuple[str, float]:
         """Generate audio for a single text chunk"""
@@ -212,23 +240,24 @@ class TTSEngine:
             output_file = self.temp_dir / f"{segment_id}.wav"
             
             # Log the text being generated for debugging
-            self.logger.info(f"🎵 Generating TTS for text: '{text[:100]}...' (length: {len(text)} chars)")
+            self.logger.info(f"🎵 Generating TTS for text: '{text[:100]}...' (length: {len(text)} chars)", extra=sampled("tts.chunk"))
             
+            started = time.perf_counter()
             # Use different TTS methods based on available engines and mode
             if self.prefer_sapi:
                 # Force Windows SAPI regardless of test_mode
-                self.logger.info(f"Config forced SAPI: Using Windows SAPI for chunk {segment_id}")
+                self.logger.info(f"Config forced SAPI: Using Windows SAPI for chunk {segment_id}", extra=sampled("tts.engine"))
                 duration = await self._generate_with_sapi(text, output_file, request)
             elif self.test_mode:
                 # Use faster fallback method in test mode
-                self.logger.info(f"Test mode: Using fast SAPI TTS for chunk {segment_id}")
+                self.logger.info(f"Test mode: Using fast SAPI TTS for chunk {segment_id}", extra=sampled("tts.engine"))
                 duration = await self._generate_with_fallback(text, output_file, request)
             elif self._is_coqui_available():
-                self.logger.info(f"Using Coqui XTTS for chunk {segment_id}")
+                self.logger.info(f"Using Coqui XTTS for chunk {segment_id}", extra=sampled("tts.engine"))
                 duration = await self._generate_with_coqui(text, output_file, request)
             else:
                 # Fallback to system TTS or other engines
-                self.logger.info(f"Using fallback TTS for chunk {segment_id}")
+                self.logger.info(f"Using fallback TTS for chunk {segment_id}", extra=sampled("tts.engine"))
                 duration = await self._generate_with_fallback(text, output_file, request)
             
             # Post-process audio if needed
@@ -236,7 +265,11 @@ class TTSEngine:
                 await self._post_process_audio(output_file, request)
             
             # Log the duration for debugging
-            self.logger.info(f"🎵 Generated {duration:.1f}s of audio from {len(text)} characters")
+            self.logger.info(f"🎵 Generated {duration:.1f}s of audio from {len(text)} characters", extra=sampled("tts.chunk_done"))
+            metrics.counter("video_ai_tts_chunks_total", "Narration chunks synthesized").inc()
+            metrics.counter("video_ai_tts_audio_seconds_total", "Seconds of narration synthesized").inc(duration)
+            metrics.histogram("video_ai_tts_chunk_seconds", "Synthesis wall time per chunk").observe(
+                time.perf_counter() - started)
             
             return str(output_file), duration
             
@@ -356,7 +389,7 @@ $synth.Dispose()
             if output_file.exists():
                 audio_data, sample_rate = librosa.load(str(output_file), sr=None)
                 duration = len(audio_data) / sample_rate
-                self.logger.info(f"SAPI TTS generated {duration:.1f}s of audio")
+                self.logger.info(f"SAPI TTS generated {duration:.1f}s of audio", extra=sampled("tts.sapi"))
                 return duration
             else:
                 raise RuntimeError("SAPI TTS failed to generate audio file")
@@ -472,6 +505,17 @@ $synth.Dispose()
     def _clean_script_for_tts(self, text: str) -> str:
         """Clean script text for TTS by removing audio directions, music cues, and speaker labels"""
         
+        text = self._clean_text(text)
+        
+        # Log if text was actually cleaned (this will help debug)
+        self.logger.info(f"🧹 Script cleaned for TTS: {len(text)} characters ready for narration")
+        
+        return text
+    
+    @staticmethod
+    def _clean_text(text: str) -> str:
+        """The cleaning rules behind `_clean_script_for_tts` (no logging)"""
+        
         import re
         
         # Remove structural labels like Part/Chapter and 'Title:' lines
@@ -510,18 +554,17 @@ $synth.Dispose()
         text = re.sub(r'\n{3,}', '\n\n', text)
         
         # Remove leading/trailing whitespace only (preserve quotes in narration)
-        text = text.strip()
-        
-        # Log if text was actually cleaned (this will help debug)
-        self.logger.info(f"🧹 Script cleaned for TTS: {len(text)} characters ready for narration")
-        
-        return text
+        return text.strip()
     
     def _split_text_into_chunks(self, text: str, max_chunk_size: int = None) -> List[str]:
         """Split text into chunks suitable for TTS"""
         
         # First clean the text for TTS
         text = self._clean_script_for_tts(text)
+        return self._chunk_cleaned_text(text, max_chunk_size)
+    
+    def _chunk_cleaned_text(self, text: str, max_chunk_size: int = None) -> List[str]:
+        """Greedy paragraph/sentence packing of already-cleaned text"""
         
         max_size = max_chunk_size or self.chunk_size
         chunks = []
@@ -2,7 +2,7 @@
 
 import yaml
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -34,6 +34,9 @@ class LLMConfig(BaseModel):
     model_name: str = "gpt-4.1-mini"
     temperature: float = 0.7
     max_tokens: int = 4000
+    context_tokens_outline: int = 600
+    context_tokens_beat: int = 400
+    context_search_limit: int = 12
 
 
 class ResearchConfig(BaseModel):
@@ -44,6 +47,18 @@ class ResearchConfig(BaseModel):
     citation_required: bool = True
     source_diversity: bool = True
     update_frequency: str = "daily"
+    # Fetch concurrency (shared aiohttp session)
+    max_concurrent_fetches: int = 16
+    per_host_concurrency: int = 4
+    # On-disk response cache (under paths.cache/research_http)
+    cache_enabled: bool = True
+    offline: bool = False  # serve research only from cache
+    cache_ttl_s: Dict[str, float] = {
+        "rss": 1800, "academic": 86400, "encyclopedia": 604800, "default": 3600
+    }
+    # Local FTS corpus (paths.data/research_corpus.db)
+    corpus_enabled: bool = True
+    corpus_max_age_days: float = 7
 
 
 class TTSConfig(BaseModel):
@@ -54,6 +69,7 @@ class TTSConfig(BaseModel):
     pitch: float = 0.0
     volume: float = 0.8
     output_quality: str = "high"
+    stream_from_script: bool = True  # Synthesize finished paragraphs while the script is written
 
 
 class StyleTemplate(BaseModel):
@@ -70,6 +86,17 @@ class ImageGenerationConfig(BaseModel):
     batch_size: int = 4
     guidance_scale: float = 7.5
     num_inference_steps: int = 20
+    # Background image writer
+    output_format: str = "png"  # png | webp (lossless)
+    png_compress_level: int = 1  # zlib effort 0-9; optimize=True is ~10x slower
+    webp_method: int = 4  # 0 (fast) - 6 (smallest)
+    writer_workers: int = 2
+    writer_max_pending: int = 8
+    writer_fsync: bool = True
+    # Within-run render dedup
+    dedupe_renders: bool = True
+    variant_similarity: float = 0.9  # prompt token overlap for an img2img variant
+    variant_strength: float = 0.35  # img2img strength (0 disables variants); ~35% of the steps
     style_templates: Dict[str, StyleTemplate] = {}
     
     def get_style_for_topic(self, topic: str) -> StyleTemplate:
@@ -96,6 +123,10 @@ class VisualPlannerConfig(BaseModel):
     ]
     constraints: List[str] = []
     fallback_shots: List[str] = ["diagram", "map", "abstract"]
+    # QA-first rendering: score low-step drafts, spend full steps only on the chosen seeds.
+    # "auto" drafts only topics whose past QA retries make the drafts cheaper
+    draft_qa: Union[bool, str] = "auto"
+    draft_steps: int = 8
 
 
 class ContinuityConfig(BaseModel):
@@ -131,6 +162,15 @@ class VideoConfig(BaseModel):
     transition_duration: int = 1
     background_music: bool = True
     music_volume: float = 0.15
+    music_dir: Optional[str] = None  # default: <paths.assets>/music, with optional <mood>/ subfolders
+    music_duck_db: float = -12.0
+    music_duck_threshold_db: float = -40.0
+    preview_sprite: bool = True
+    preview_interval_s: float = 10.0
+    preview_tile_width: int = 160
+    preview_columns: int = 10
+    proxy_render: bool = False
+    proxy_profile: str = "540p"
 
 
 class PathsConfig(BaseModel):
@@ -1,16 +1,99 @@
 #!/usr/bin/env python3
 """
 Logging setup for Long Video AI Automation System
+
+Loggers only enqueue records (QueueHandler); a QueueListener thread does the
+formatting and the console/rotating-file writes, so a slow disk or terminal
+never blocks the event loop or a render. Hot-path messages can be sampled:
+
+    self.logger.info(f"IMG gen {i}/{n} ...", extra=sampled("image.gen"))
+
+Warnings and errors are never sampled.
 """
 
+import atexit
+import json
 import logging
 import logging.handlers
+import queue
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def sampled(key: str) -> Dict[str, str]:
+    """`extra=` marker for a hot-path message subject to sampling/rate limiting"""
+    return {"sample_key": key}
+
+
+class HotPathSampler(logging.Filter):
+    """Keep 1 in `sample_every` records per (logger, sample_key), at most `max_per_second`.
+
+    The next record that passes notes how many were suppressed since the last one.
+    """
+
+    def __init__(self, sample_every: int = 10, max_per_second: float = 5.0):
+        super().__init__()
+        self.sample_every = max(1, int(sample_every))
+        self.max_per_second = float(max_per_second)
+        self._state: Dict[tuple, list] = {}  # key -> [seen, suppressed, tokens, last_refill]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get((record.name, key))
+            if state is None:
+                state = self._state[(record.name, key)] = [0, 0, self.max_per_second, now]
+            state[0] += 1
+            keep = (state[0] - 1) % self.sample_every == 0
+            if keep and self.max_per_second > 0:
+                state[2] = min(self.max_per_second, state[2] + (now - state[3]) * self.max_per_second)
+                state[3] = now
+                keep = state[2] >= 1.0
+                if keep:
+                    state[2] -= 1.0
+            if not keep:
+                state[1] += 1
+                return False
+            suppressed, state[1] = state[1], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} [+{suppressed} similar suppressed]"
+            record.args = None
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        sample_key = getattr(record, "sample_key", None)
+        if sample_key:
+            entry["sample_key"] = sample_key
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
 
 def setup_logging(config: 'Config') -> logging.Logger:
     """Set up logging configuration"""
-    
+    global _listener
+
     # Get logging config from Pydantic model
     log_config = config.logging
     level = log_config.get('level', 'INFO')
@@ -18,21 +101,23 @@ def setup_logging(config: 'Config') -> logging.Logger:
     log_file = log_config.get('file', './logs/video_ai.log')
     max_size_mb = log_config.get('max_size_mb', 100)
     backup_count = log_config.get('backup_count', 5)
-    
+    json_lines = log_config.get('json_lines', False)
+
     # Create logs directory if it doesn't exist
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
-    
+
     # Set up logger
     logger = logging.getLogger('video_ai')
     logger.setLevel(getattr(logging, level.upper()))
-    
-    # Clear existing handlers
+
+    # Clear existing handlers (and drain the previous listener on re-setup)
+    stop_logging()
     logger.handlers.clear()
-    
+
     # Create formatter
     formatter = logging.Formatter(format_str)
-    
+
     # File handler with rotation
     file_handler = logging.handlers.RotatingFileHandler(
         log_file,
@@ -40,20 +125,43 @@ def setup_logging(config: 'Config') -> logging.Logger:
         backupCount=backup_count,
         encoding='utf-8'
     )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
+
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+
+    # Loggers only enqueue; the listener thread formats and writes
+    record_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(record_queue)
+    queue_handler.addFilter(HotPathSampler(
+        sample_every=log_config.get('sample_every', 10),
+        max_per_second=log_config.get('sample_max_per_second', 5.0),
+    ))
+    logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        record_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+
     return logger
 
 
+@atexit.register
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
 class LoggerMixin:
     """Mixin class to add logging capabilities to other classes"""
-    
+
     @property
     def logger(self) -> logging.Logger:
         """Get logger instance"""
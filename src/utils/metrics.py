@@ -0,0 +1,349 @@
+"""
+Process-wide metrics registry with Prometheus text exposition
+
+    from src.utils import metrics
+    metrics.counter("video_ai_images_generated_total", "Images rendered").inc(4)
+    metrics.histogram("video_ai_stage_seconds", "Stage duration", ["stage"]).labels(stage="tts").observe(12.3)
+    server = metrics.start_http_server(9464)          # GET /metrics
+
+Updates take a per-metric lock for a few dict operations; the HTTP
+listener runs on its own daemon thread and only reads the registry, so a
+scrape never waits on the event loop or on pipeline work. Ratios that
+Prometheus would normally derive (cache hit ratio) are also exported as
+gauges computed from the counters at scrape time.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[LabelKey, object] = {}
+
+    def labels(self, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def value(self, **labels) -> float:
+        return self.labels(**labels).value
+
+    def samples(self):
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_labels_text(self.labelnames, key)} {_fmt(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+
+class _RateChild:
+    __slots__ = ("window_s", "events", "_lock")
+
+    def __init__(self, window_s: float):
+        self.window_s = window_s
+        self.events = deque()
+        self._lock = threading.Lock()
+
+    def mark(self, count: float = 1.0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.events.append((now, count))
+            self._expire(now)
+
+    def _expire(self, now: float) -> None:
+        while self.events and self.events[0][0] < now - self.window_s:
+            self.events.popleft()
+
+    @property
+    def value(self) -> float:
+        """Events per minute over the trailing window"""
+        with self._lock:
+            self._expire(time.monotonic())
+            total = sum(n for _, n in self.events)
+        return total * 60.0 / self.window_s
+
+
+class Rate(_Metric):
+    """Gauge reporting events/minute over a trailing window, evaluated at scrape time"""
+    kind = "gauge"
+    samples = Counter.samples
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), window_s: float = 300.0):
+        super().__init__(name, help_text, labelnames)
+        self.window_s = float(window_s)
+
+    def _new_child(self):
+        return _RateChild(self.window_s)
+
+    def mark(self, count: float = 1.0) -> None:
+        self._default().mark(count)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self):
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, n in zip(child.buckets, counts):
+                cumulative += n
+                le = f'le="{_fmt(bound)}"'
+                yield f"{self.name}_bucket{_labels_text(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels_text(self.labelnames, key)} {_fmt(total)}"
+            yield f"{self.name}_count{_labels_text(self.labelnames, key)} {count}"
+
+
+class Registry:
+    """Named metrics plus scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, labelnames: Sequence[str] = (), **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = cls(name, help_text, labelnames, **kwargs)
+                    self._metrics[name] = metric
+        if not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return metric
+
+    def add_collector(self, fn: Callable[[], None]) -> None:
+        """`fn` runs on the scrape thread before rendering; it must only read cheap state"""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for fn in list(self._collectors):
+            try:
+                fn()
+            except Exception as e:
+                logger.debug(f"Metrics collector failed: {e}")
+        return "\n".join(m.render() for m in list(self._metrics.values())) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY._get(Counter, name, help_text, labelnames)
+
+
+def gauge(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY._get(Gauge, name, help_text, labelnames)
+
+
+def histogram(name: str, help_text: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+
+def rate(name: str, help_text: str, labelnames: Sequence[str] = (), window_s: float = 300.0) -> Rate:
+    return REGISTRY._get(Rate, name, help_text, labelnames, window_s=window_s)
+
+
+# ---------------------------------------------------------------------------
+# Shared pipeline metrics (one definition so every module uses the same names)
+# ---------------------------------------------------------------------------
+def cache_requests() -> Counter:
+    return counter("video_ai_cache_requests_total", "Cache lookups by cache and result (hit/miss/...)",
+                   ["cache", "result"])
+
+
+def _cache_hit_ratio() -> None:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), child in list(cache_requests()._children.items()):
+        hits_total = totals.setdefault(cache, [0.0, 0.0])
+        hits_total[1] += child.value
+        if result in ("hit", "revalidated"):
+            hits_total[0] += child.value
+    ratio = gauge("video_ai_cache_hit_ratio", "Cache hits / lookups since start", ["cache"])
+    for cache, (hits, total) in totals.items():
+        ratio.labels(cache=cache).set(hits / total if total else 0.0)
+
+
+REGISTRY.add_collector(_cache_hit_ratio)
+
+
+# ---------------------------------------------------------------------------
+# HTTP listener
+# ---------------------------------------------------------------------------
+class _Handler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] in ("/metrics", "/"):
+            body = self.registry.render().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/healthz":
+            body, content_type = b"ok\n", "text/plain"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # keep scrapes out of the console
+        pass
+
+
+def start_http_server(port: int, host: str = "127.0.0.1",
+                      registry: Optional[Registry] = None) -> ThreadingHTTPServer:
+    """Serve /metrics on a daemon thread; returns the server (call .shutdown() to stop)"""
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry or REGISTRY})
+    server = ThreadingHTTPServer((host, int(port)), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    logger.info(f"Metrics endpoint listening on http://{host}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,68 @@
+"""
+Startup timing for the CLI
+
+`StartupProfile` records how long each startup phase took (config load,
+logging, every lazily built subsystem) and which third-party packages the
+phase pulled into `sys.modules`, similar to `python -X importtime` but
+aggregated per subsystem. `report()` renders a small table and flags phases
+that blow the configured budget.
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+_STDLIB = frozenset(getattr(sys, 'stdlib_module_names', ()))
+
+
+def _top_level_packages(names) -> List[str]:
+    """Third-party top-level packages among `names` (stdlib and project modules skipped)"""
+    tops = {name.split('.', 1)[0] for name in names}
+    return sorted(t for t in tops
+                  if not t.startswith('_') and t not in _STDLIB and t not in ('src', 'main'))
+
+
+class StartupProfile:
+    """Phase timer with per-phase import attribution"""
+
+    def __init__(self, budget_ms: float = 1000.0):
+        self.budget_ms = float(budget_ms)
+        self.started = time.perf_counter()
+        # (phase, elapsed ms, newly imported top-level packages, module count)
+        self.phases: List[Tuple[str, float, List[str], int]] = []
+        self._active: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block and attribute modules it imported to `name`"""
+        # Nested phases (a subsystem building another) only count once
+        if name in self._active:
+            yield
+            return
+        before = set(sys.modules)
+        self._active[name] = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - self._active.pop(name)) * 1000.0
+            new = set(sys.modules) - before
+            self.phases.append((name, elapsed, _top_level_packages(new), len(new)))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def report(self, title: Optional[str] = None) -> str:
+        lines = [title or "Startup profile"]
+        for name, ms, packages, count in self.phases:
+            pkgs = ", ".join(packages[:8]) + (" ..." if len(packages) > 8 else "")
+            lines.append(f"  {name:<22} {ms:8.1f} ms  {count:4d} modules  {pkgs}")
+        total = self.elapsed_ms()
+        flag = "OK" if total <= self.budget_ms else "OVER BUDGET"
+        lines.append(f"  {'total':<22} {total:8.1f} ms  (budget {self.budget_ms:.0f} ms: {flag})")
+        return "\n".join(lines)
+
+
+# Process-wide profile; main.py resets it with the configured budget
+profile = StartupProfile()
@@ -0,0 +1,245 @@
+"""
+Span tracing with Chrome trace-event export
+
+    trace = tracing.begin("single video", config)     # None unless debug.trace is on
+    with tracing.span("content.research", topic=topic):
+        ...
+    @tracing.traced("tts.chunk", cat="tts")
+    async def _generate_chunk_audio(...): ...
+    tracing.end(trace)                                 # -> <artifacts>/<run_id>/trace.json
+
+The active trace lives in a context variable, so concurrent scheduler jobs
+each record into their own trace and spans opened inside `asyncio.gather`
+children or `asyncio.to_thread` calls land in the right one. Every asyncio
+task / thread gets its own track, so overlapping work shows up side by side
+in chrome://tracing or ui.perfetto.dev.
+
+When no trace is active `span()` returns a shared no-op object and
+`traced` calls straight through: one global integer check per call.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("video_ai_trace", default=None)
+_active_traces = 0
+_active_lock = threading.Lock()
+
+
+class Trace:
+    """Event buffer for one run"""
+
+    def __init__(self, name: str, config=None, max_events: int = 500_000):
+        self.name = name
+        self.config = config
+        self.max_events = max_events
+        self.meta: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self.pid = os.getpid()
+        self._t0 = time.perf_counter_ns()
+        self._tracks: Dict[Any, int] = {}
+        self._track_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._token = None
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self._t0) / 1000.0
+
+    def _track(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = ("task", id(task)) if task is not None else ("thread", threading.get_ident())
+        track = self._tracks.get(key)
+        if track is None:
+            with self._lock:
+                track = self._tracks.setdefault(key, len(self._tracks) + 1)
+                label = task.get_name() if task is not None else threading.current_thread().name
+                self._track_names[track] = label
+        return track
+
+    def add(self, name: str, cat: str, start_us: float, dur_us: float, track: int, args: Dict[str, Any]) -> None:
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        event = {"name": name, "cat": cat, "ph": "X", "ts": round(start_us, 3),
+                 "dur": round(dur_us, 3), "pid": self.pid, "tid": track}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def to_chrome(self) -> Dict[str, Any]:
+        meta = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": self.name}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": label}}
+                 for tid, label in sorted(self._track_names.items())]
+        return {
+            "traceEvents": meta + sorted(self.events, key=lambda e: e["ts"]),
+            "displayTimeUnit": "ms",
+            "otherData": dict(self.meta, name=self.name, dropped_events=self.dropped),
+        }
+
+    def write(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome()), encoding="utf-8")
+        return path
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "cat", "args", "start", "track")
+
+    def __init__(self, trace: Trace, name: str, cat: str, args: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.track = self.trace._track()
+        self.start = self.trace._now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = self.trace._now_us()
+        if exc_type is not None:
+            self.args["error"] = f"{exc_type.__name__}: {exc}"[:200]
+        self.trace.add(self.name, self.cat, self.start, end - self.start, self.track, self.args)
+        return False
+
+    def set(self, **attrs) -> None:
+        """Attach attributes known only after the span started"""
+        self.args.update(attrs)
+
+
+def span(name: str, cat: str = "pipeline", **args):
+    """Context manager timing a block as a span of the active trace"""
+    if not _active_traces:
+        return _NOOP
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, cat, args)
+
+
+def traced(name: Optional[str] = None, cat: str = "pipeline"):
+    """Decorator form of `span` for sync and async functions"""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*a, **kw):
+                if not _active_traces:
+                    return await fn(*a, **kw)
+                with span(span_name, cat):
+                    return await fn(*a, **kw)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not _active_traces:
+                return fn(*a, **kw)
+            with span(span_name, cat):
+                return fn(*a, **kw)
+        return wrapper
+    return decorate
+
+
+def run_command(cmd, **kwargs) -> subprocess.CompletedProcess:
+    """`subprocess.run` inside a span named after the executable"""
+    with span(Path(str(cmd[0])).name, cat="subprocess", argv=" ".join(map(str, cmd))[:300]):
+        return subprocess.run(cmd, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Run lifecycle
+# ---------------------------------------------------------------------------
+def enabled_in(config) -> bool:
+    if os.environ.get("VIDEO_AI_TRACE", "").strip() in ("1", "true", "yes"):
+        return True
+    debug = getattr(config, "debug", None) or {}
+    return bool(debug.get("trace", False)) if isinstance(debug, dict) else False
+
+
+def begin(name: str, config=None, enabled: Optional[bool] = None) -> Optional[Trace]:
+    """Start recording in the current context; None when tracing is disabled"""
+    global _active_traces
+    if enabled is None:
+        enabled = enabled_in(config)
+    if not enabled:
+        return None
+    debug = getattr(config, "debug", None) or {}
+    max_events = int(debug.get("trace_max_events", 500_000)) if isinstance(debug, dict) else 500_000
+    trace = Trace(name, config, max_events)
+    trace._token = _current.set(trace)
+    with _active_lock:
+        _active_traces += 1
+    return trace
+
+
+def annotate(**meta) -> None:
+    """Attach run metadata (e.g. run_id) to the active trace"""
+    trace = _current.get() if _active_traces else None
+    if trace is not None:
+        trace.meta.update(meta)
+
+
+def default_path(trace: Trace) -> Path:
+    """<artifacts>/<run_id>/trace.json, or <artifacts>/traces/<name>.json without a run id"""
+    vp = getattr(trace.config, "visual_planner", None)
+    root = Path(getattr(vp, "artifacts_dir", "./output/artifacts")) if vp else Path("./output/artifacts")
+    run_id = trace.meta.get("run_id")
+    if run_id:
+        return root / str(run_id) / "trace.json"
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in trace.name)
+    return root / "traces" / f"{safe}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+
+
+def end(trace: Optional[Trace], path: Optional[Path] = None) -> Optional[Path]:
+    """Stop recording and write the Chrome trace JSON; returns the file path"""
+    global _active_traces
+    if trace is None:
+        return None
+    with _active_lock:
+        _active_traces = max(0, _active_traces - 1)
+    try:
+        _current.reset(trace._token)
+    except ValueError:
+        # Ended from another context (e.g. a different task); just detach
+        _current.set(None)
+    try:
+        out = trace.write(path or default_path(trace))
+        logger.info(f"Trace written: {out} ({len(trace.events)} spans, {trace.dropped} dropped)")
+        return out
+    except Exception as e:
+        logger.warning(f"Failed to write trace: {e}")
+        return None
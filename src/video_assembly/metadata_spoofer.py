@@ -20,6 +20,8 @@ import logging
 import uuid
 import random
 
+from ..utils.tracing import run_command
+
 logger = logging.getLogger(__name__)
 
 class MetadataSpoofer:
@@ -93,7 +95,7 @@ class MetadataSpoofer:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True, text=True)
+            run_command(cmd, check=True, capture_output=True, text=True)
             logger.info(f"Successfully spoofed as iOS ReplayKit: {output_path}")
             return output_path
         except subprocess.CalledProcessError as e:
@@ -131,7 +133,7 @@ class MetadataSpoofer:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True, text=True)
+            run_command(cmd, check=True, capture_output=True, text=True)
             logger.info(f"Successfully spoofed as macOS QuickTime: {output_path}")
             return output_path
         except subprocess.CalledProcessError as e:
@@ -167,7 +169,7 @@ class MetadataSpoofer:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True, text=True)
+            run_command(cmd, check=True, capture_output=True, text=True)
             logger.info(f"Successfully spoofed as Android screen recording: {output_path}")
             return output_path
         except subprocess.CalledProcessError as e:
@@ -227,7 +229,7 @@ class MetadataSpoofer:
             str(output_path)
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        run_command(cmd, check=True, capture_output=True, text=True)
         return output_path
     
     def _spoof_dslr_camera(self, video_path: Path, output_path: Path) -> Path:
@@ -260,7 +262,7 @@ class MetadataSpoofer:
             str(output_path)
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        run_command(cmd, check=True, capture_output=True, text=True)
         return output_path
     
     def _spoof_webcam(self, video_path: Path, output_path: Path) -> Path:
@@ -289,7 +291,7 @@ class MetadataSpoofer:
             str(output_path)
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        run_command(cmd, check=True, capture_output=True, text=True)
         return output_path
     
     def _generate_realistic_timestamp(self) -> str:
@@ -388,7 +390,7 @@ class MetadataSpoofer:
             str(output_path)
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        run_command(cmd, check=True, capture_output=True, text=True)
         return output_path
     
     def apply_device_compression_artifacts(self, video_path: Path, device_type: str = "phone") -> Path:
@@ -432,7 +434,7 @@ class MetadataSpoofer:
                 str(output_path)
             ]
         
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        run_command(cmd, check=True, capture_output=True, text=True)
         logger.info(f"Applied {device_type} compression artifacts: {output_path}")
         return output_path
     
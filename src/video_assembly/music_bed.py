@@ -0,0 +1,154 @@
+"""
+Music bed mixing with sidechain ducking
+
+Loops (or trims) a music track to the narration length and mixes it under
+the narration in one block-wise pass: each block of narration PCM is
+reduced to 10 ms RMS frames, frames above the threshold mark speech, a
+sliding max holds the duck across word gaps and a one-pole filter (state
+carried between blocks) smooths it. Frame gains are interpolated to samples
+and applied to the music block. Memory stays at one block regardless of
+video length, and the result is a single track for the final render.
+"""
+
+import hashlib
+import logging
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import lfilter
+
+from ..utils import metrics
+from ..utils.tracing import run_command
+
+
+logger = logging.getLogger('video_ai.music_bed')
+
+MUSIC_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".m4a"}
+FRAME_S = 0.010
+
+
+def find_music_track(music_dir: Path, mood: Optional[str] = None, seed: str = "") -> Optional[Path]:
+    """A track from <music_dir>/<mood>/, else <music_dir>/; stable per `seed`"""
+    music_dir = Path(music_dir)
+    for folder in ([music_dir / mood] if mood else []) + [music_dir]:
+        if not folder.is_dir():
+            continue
+        tracks = sorted(p for p in folder.iterdir() if p.suffix.lower() in MUSIC_EXTENSIONS)
+        if tracks:
+            index = int(hashlib.sha1(seed.encode("utf-8")).hexdigest(), 16) % len(tracks)
+            return tracks[index]
+    return None
+
+
+def dominant_mood(moods: Iterable[str]) -> Optional[str]:
+    counts = Counter(m for m in moods if m)
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def _conform(path: Path, sample_rate: int, channels: int, work_dir: Path) -> Path:
+    """Decode/resample `path` to PCM WAV at the narration format (ffmpeg streams, no full load)"""
+    try:
+        info = sf.info(str(path))
+        if info.samplerate == sample_rate and info.channels == channels:
+            return path
+    except Exception:
+        pass
+    out = work_dir / f"{path.stem}_{sample_rate}_{channels}ch.wav"
+    start = time.perf_counter()
+    run_command(
+        ["ffmpeg", "-y", "-v", "error", "-i", str(path), "-ar", str(sample_rate), "-ac", str(channels),
+         "-c:a", "pcm_s16le", str(out)],
+        check=True, capture_output=True,
+    )
+    metrics.histogram("video_ai_ffmpeg_seconds", "ffmpeg wall time by operation", ["op"]).labels(
+        op="music_conform").observe(time.perf_counter() - start)
+    return out
+
+
+class DuckingFollower:
+    """Streaming speech envelope -> per-frame duck amount in [0, 1]"""
+
+    def __init__(self, sample_rate: int, threshold_db: float = -40.0, hold_ms: float = 300.0,
+                 smooth_ms: float = 120.0):
+        self.hop = max(1, int(round(sample_rate * FRAME_S)))
+        self.threshold = 10 ** (threshold_db / 20.0)
+        self.hold = max(1, int(round(hold_ms / 1000.0 / FRAME_S)))
+        a = float(np.exp(-FRAME_S / max(1e-3, smooth_ms / 1000.0)))
+        self._b, self._a = [1.0 - a], [1.0, -a]
+        self._zi = np.zeros(1)
+        self._tail = np.zeros(self.hold - 1, dtype=bool)
+
+    def process(self, mono: np.ndarray) -> np.ndarray:
+        """Duck amount per `hop` frame of `mono` (len(mono) must be a multiple of hop, except the last block)"""
+        frames = -(-len(mono) // self.hop)
+        padded = np.zeros(frames * self.hop, dtype=np.float32)
+        padded[:len(mono)] = mono
+        rms = np.sqrt(np.mean(padded.reshape(frames, self.hop) ** 2, axis=1))
+        speech = np.concatenate([self._tail, rms > self.threshold])
+        # Hold: a frame stays ducked if any of the previous `hold` frames had speech
+        held = np.lib.stride_tricks.sliding_window_view(speech, self.hold).any(axis=1)
+        self._tail = speech[len(speech) - (self.hold - 1):]
+        duck, self._zi = lfilter(self._b, self._a, held.astype(np.float64), zi=self._zi)
+        return duck
+
+
+def mix_music_bed(narration_path: Path, music_path: Path, output_path: Path,
+                  music_volume: float = 0.15, duck_db: float = -12.0, threshold_db: float = -40.0,
+                  hold_ms: float = 300.0, smooth_ms: float = 120.0, fade_s: float = 2.0,
+                  block_s: float = 10.0, work_dir: Optional[Path] = None) -> Path:
+    """Write narration + ducked, looped music as one WAV; streams in `block_s` blocks"""
+    narration_path, output_path = Path(narration_path), Path(output_path)
+    work_dir = Path(work_dir or output_path.parent)
+    info = sf.info(str(narration_path))
+    sr, channels, total = info.samplerate, info.channels, info.frames
+    music_path = _conform(Path(music_path), sr, channels, work_dir)
+
+    follower = DuckingFollower(sr, threshold_db, hold_ms, smooth_ms)
+    block = max(1, int(block_s / FRAME_S)) * follower.hop  # whole frames per block
+    fade = max(1, int(fade_s * sr))
+    duck_gain = 10 ** (duck_db / 20.0) - 1.0  # gain = 1 + duck * duck_gain
+
+    with sf.SoundFile(str(narration_path)) as voice, sf.SoundFile(str(music_path)) as music, \
+            sf.SoundFile(str(output_path), "w", samplerate=sr, channels=channels, subtype="PCM_16") as out:
+        if music.frames == 0:
+            raise ValueError(f"Empty music track: {music_path}")
+        position = 0
+        last_duck = 0.0  # previous block's final frame, so interpolation is continuous across blocks
+        while position < total:
+            speech = voice.read(min(block, total - position), dtype="float32", always_2d=True)
+            n = len(speech)
+            if n == 0:
+                break
+
+            # Music for this block, looping back to the start as needed
+            bed = np.empty((n, channels), dtype=np.float32)
+            filled = 0
+            while filled < n:
+                chunk = music.read(n - filled, dtype="float32", always_2d=True)
+                if len(chunk) == 0:
+                    music.seek(0)
+                    continue
+                bed[filled:filled + len(chunk)] = chunk
+                filled += len(chunk)
+
+            # Ducking envelope: frame gains -> per-sample gains
+            duck = np.concatenate([[last_duck], follower.process(speech.mean(axis=1))])
+            frame_pos = np.arange(len(duck)) * follower.hop - 1  # each value at its frame's last sample
+            gain = music_volume * (1.0 + duck_gain * np.interp(np.arange(n), frame_pos, duck))
+            last_duck = duck[-1]
+
+            # Fade the bed in at the start and out at the end of the narration
+            idx = np.arange(position, position + n)
+            gain *= np.clip(np.minimum(idx / fade, (total - idx) / fade), 0.0, 1.0)
+
+            mixed = speech + bed * gain[:, None].astype(np.float32)
+            np.clip(mixed, -1.0, 1.0, out=mixed)
+            out.write(mixed)
+            position += n
+
+    logger.info(f"Music bed mixed: {music_path.name} under {total / sr:.1f}s narration -> {output_path}")
+    return output_path
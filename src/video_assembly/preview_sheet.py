@@ -0,0 +1,113 @@
+"""Thumbnail and scrub-preview sprite from the timeline's source stills
+
+Both come straight from the images the segments are built from, so they can
+be produced while the segments encode instead of decoding the finished
+H.264 file afterwards. Every distinct source image is decoded and resized
+once (in parallel); the sprite samples the timeline every `interval_s`
+seconds and a WebVTT file maps time ranges to tiles (`sprite.jpg#xywh=...`).
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+from .video_models import VideoSegment
+
+
+logger = logging.getLogger('video_ai.preview_sheet')
+
+MAX_TILES = 400  # longer videos widen the interval instead of growing the sheet
+
+
+def _segment_at(segments: Sequence[VideoSegment], starts: List[float], t: float) -> VideoSegment:
+    i = max(0, bisect.bisect_right(starts, t) - 1)
+    return segments[i]
+
+
+def _fit(path: Path, size: Tuple[int, int]) -> Image.Image:
+    """Decode once and center-crop to `size`"""
+    with Image.open(path) as img:
+        img.draft("RGB", (size[0] * 2, size[1] * 2))  # JPEG: decode at reduced scale
+        return ImageOps.fit(img.convert("RGB"), size, Image.LANCZOS)
+
+
+def sample_times(total_duration: float, interval_s: float) -> Tuple[List[float], float]:
+    """Tile start times (and the effective interval) covering the whole duration"""
+    interval_s = max(0.5, float(interval_s))
+    if total_duration / interval_s > MAX_TILES:
+        interval_s = total_duration / MAX_TILES
+    count = max(1, int(total_duration // interval_s) + (1 if total_duration % interval_s else 0))
+    return [i * interval_s for i in range(count)], interval_s
+
+
+def _vtt_time(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    h, rem = divmod(ms, 3_600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+def generate_previews(segments: Sequence[VideoSegment], output_stem: Path,
+                      total_duration: Optional[float] = None,
+                      thumbnail_size: Tuple[int, int] = (1280, 720),
+                      tile_width: int = 160, columns: int = 10, interval_s: float = 10.0,
+                      sprite: bool = True, executor: Optional[Executor] = None) -> Dict[str, Path]:
+    """Write <stem>.jpg (thumbnail at 10%) and, with `sprite`, <stem>_sprite.jpg + <stem>_sprite.vtt"""
+    segments = sorted(segments, key=lambda s: s.start_time)
+    if not segments:
+        return {}
+    starts = [s.start_time for s in segments]
+    if not total_duration:
+        total_duration = segments[-1].start_time + segments[-1].duration
+    output_stem = Path(output_stem)
+    output_stem.parent.mkdir(parents=True, exist_ok=True)
+
+    tile_size = (int(tile_width), max(1, int(round(tile_width * 9 / 16))))
+    times, interval_s = sample_times(total_duration, interval_s) if sprite else ([], interval_s)
+    tile_sources = [Path(_segment_at(segments, starts, t).image_path) for t in times]
+    thumb_source = Path(_segment_at(segments, starts, total_duration * 0.1).image_path)
+
+    own_executor = executor is None
+    pool = executor or ThreadPoolExecutor(max_workers=4)
+    try:
+        thumb_future = pool.submit(_fit, thumb_source, thumbnail_size)
+        tiles = {}
+        for src in dict.fromkeys(tile_sources):
+            tiles[src] = pool.submit(_fit, src, tile_size)
+
+        outputs: Dict[str, Path] = {}
+        thumbnail_path = output_stem.with_suffix(".jpg")
+        thumb_future.result().save(thumbnail_path, "JPEG", quality=90)
+        outputs["thumbnail"] = thumbnail_path
+
+        if tile_sources:
+            rows = (len(tile_sources) + columns - 1) // columns
+            cols = min(columns, len(tile_sources))
+            sheet = Image.new("RGB", (cols * tile_size[0], rows * tile_size[1]))
+            sprite_path = output_stem.with_name(output_stem.name + "_sprite.jpg")
+            cues = ["WEBVTT", ""]
+            for i, (t, src) in enumerate(zip(times, tile_sources)):
+                x, y = (i % columns) * tile_size[0], (i // columns) * tile_size[1]
+                try:
+                    sheet.paste(tiles[src].result(), (x, y))
+                except Exception as e:
+                    logger.debug(f"Preview tile {src} failed: {e}")
+                end = min(total_duration, t + interval_s)
+                cues += [f"{_vtt_time(t)} --> {_vtt_time(end)}",
+                         f"{sprite_path.name}#xywh={x},{y},{tile_size[0]},{tile_size[1]}", ""]
+            sheet.save(sprite_path, "JPEG", quality=80)
+            vtt_path = sprite_path.with_suffix(".vtt")
+            vtt_path.write_text("\n".join(cues), encoding="utf-8")
+            outputs["sprite"] = sprite_path
+            outputs["sprite_vtt"] = vtt_path
+        return outputs
+    finally:
+        if own_executor:
+            pool.shutdown(wait=False)
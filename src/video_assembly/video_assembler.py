@@ -23,16 +23,39 @@ import numpy as np
 import ffmpeg
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from threading import Lock
+from contextlib import contextmanager
 
 from ..content_generation.content_models import VideoScript
 from .video_models import (
     VideoAssemblyRequest, VideoAssemblyResult, VideoSegment, 
     VideoMetadata, AudioTrack, RenderProgress, PerformanceProfile,
-    RTX_5080_PROFILES, VideoQuality, EffectType
+    RTX_5080_PROFILES, PROXY_PROFILES, VideoQuality, EffectType
 )
 from .video_effects import EffectsEngine
 from .audio_processor import AudioAuthenticityProcessor
 from .metadata_spoofer import MetadataSpoofer
+from .preview_sheet import generate_previews
+from .music_bed import dominant_mood, find_music_track, mix_music_bed
+from ..utils import metrics, tracing
+
+
+@contextmanager
+def _encode_metrics(op: str, video_seconds: float):
+    """Wall time, output seconds and realtime factor of a successful ffmpeg encode.
+
+    Nothing is recorded when the block raises, so callers must check the
+    ffmpeg return code (and raise) inside it.
+    """
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    metrics.histogram("video_ai_ffmpeg_seconds", "ffmpeg wall time by operation", ["op"]).labels(op=op).observe(elapsed)
+    metrics.counter("video_ai_encoded_video_seconds_total", "Seconds of video encoded", ["op"]).labels(
+        op=op).inc(video_seconds)
+    if elapsed > 0 and video_seconds > 0:
+        metrics.gauge("video_ai_encode_speed", "Video seconds encoded per wall second (last encode)",
+                      ["op"]).labels(op=op).set(video_seconds / elapsed)
+
 
 class VideoAssembler:
     """
@@ -73,12 +96,30 @@ class VideoAssembler:
         self.current_render: Optional[RenderProgress] = None
         self.render_lock = Lock()
         
-        # Executors for parallel processing
+        # Executors for parallel processing (process pool and FFmpeg probe
+        # are created on first use to keep startup cheap)
         self.thread_executor = ThreadPoolExecutor(max_workers=self.max_workers)
-        self.process_executor = ProcessPoolExecutor(max_workers=2)
-        
-        # Check FFmpeg and GPU capabilities
-        self._check_dependencies()
+        self._process_executor: Optional[ProcessPoolExecutor] = None
+        self._ffmpeg_available: Optional[bool] = None
+        self._nvenc_available = False
+    
+    @property
+    def process_executor(self) -> ProcessPoolExecutor:
+        if self._process_executor is None:
+            self._process_executor = ProcessPoolExecutor(max_workers=2)
+        return self._process_executor
+    
+    @property
+    def ffmpeg_available(self) -> bool:
+        if self._ffmpeg_available is None:
+            self._check_dependencies()
+        return self._ffmpeg_available
+    
+    @property
+    def nvenc_available(self) -> bool:
+        if self._ffmpeg_available is None:
+            self._check_dependencies()
+        return self._nvenc_available
     
     def _check_dependencies(self) -> None:
         """Check if required dependencies are available"""
@@ -87,26 +128,28 @@ class VideoAssembler:
             result = subprocess.run(['ffmpeg', '-version'], 
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0:
-                self.ffmpeg_available = True
+                self._ffmpeg_available = True
                 # Check for NVENC support
-                self.nvenc_available = 'nvenc' in result.stdout.lower()
-                self.logger.info(f"FFmpeg available, NVENC: {self.nvenc_available}")
+                self._nvenc_available = 'nvenc' in result.stdout.lower()
+                self.logger.info(f"FFmpeg available, NVENC: {self._nvenc_available}")
             else:
-                self.ffmpeg_available = False
-                self.nvenc_available = False
+                self._ffmpeg_available = False
+                self._nvenc_available = False
                 self.logger.error("FFmpeg not found - video rendering will not work")
         except Exception as e:
-            self.ffmpeg_available = False
-            self.nvenc_available = False
+            self._ffmpeg_available = False
+            self._nvenc_available = False
             self.logger.error(f"Failed to check FFmpeg: {e}")
     
+    @tracing.traced("assembly.assemble_video", cat="assembly")
     async def assemble_video(self, 
                            video_script: VideoScript,
                            audio_path: Path,
                            image_paths: List[Path],
                            topic_category: str,
                            progress_callback: Optional[Callable[[RenderProgress], None]] = None,
-                           timeline_path: Optional[str] = None) -> VideoAssemblyResult:
+                           timeline_path: Optional[str] = None,
+                           proxy: Optional[bool] = None) -> VideoAssemblyResult:
         """
         Assemble a complete video from generated content.
         
@@ -116,22 +159,23 @@ class VideoAssembler:
             image_paths: List of generated image paths
             topic_category: Topic category for styling
             progress_callback: Optional callback for progress updates
+            proxy: Also render a low-res review proxy alongside (default: video.proxy_render)
             
         Returns:
             VideoAssemblyResult with output path and statistics
         """
         start_time = time.time()
+        proxy_task = previews_task = music_task = None
         
         try:
             # Create assembly request
-            if timeline_path and Path(timeline_path).exists():
-                request = await self._create_assembly_request_from_timeline(
-                    video_script, audio_path, topic_category, timeline_path
-                )
-            else:
-                request = await self._create_assembly_request(
-                    video_script, audio_path, image_paths, topic_category
-                )
+            request = await self._build_request(video_script, audio_path, image_paths, topic_category, timeline_path)
+            
+            # Review proxy: one ultrafast pass from the same timeline, ready long before the full render
+            if proxy is None:
+                proxy = getattr(getattr(self.config, 'video', None), 'proxy_render', False)
+            if proxy:
+                proxy_task = asyncio.create_task(self._render_proxy(request))
             
             # Initialize progress tracking
             progress = RenderProgress(
@@ -145,6 +189,10 @@ class VideoAssembler:
             if progress_callback:
                 progress_callback(progress)
             
+            # Thumbnail + preview sprite from the source stills, alongside the segment encodes
+            previews_task = asyncio.create_task(self._generate_previews(request))
+            music_task = asyncio.create_task(self._mix_music_bed(request, video_script))
+            
             # Process video segments
             self.logger.info(f"Starting video assembly with {len(request.segments)} segments")
             processed_segments = await self._process_segments(request, progress, progress_callback)
@@ -155,6 +203,10 @@ class VideoAssembler:
             if progress_callback:
                 progress_callback(progress)
             
+            mixed_audio = await music_task
+            if mixed_audio is not None:
+                request.audio_tracks[0].file_path = mixed_audio
+            
             output_path = await self._render_final_video(request, processed_segments, progress)
             
             # Apply authenticity processing
@@ -171,7 +223,11 @@ class VideoAssembler:
             if progress_callback:
                 progress_callback(progress)
             
-            thumbnail_path = await self._generate_thumbnail(authentic_video_path, request.metadata)
+            previews = await previews_task
+            proxy_path = await proxy_task if proxy_task else None
+            thumbnail_path = previews.get("thumbnail")
+            if thumbnail_path is None:
+                thumbnail_path = await self._generate_thumbnail(authentic_video_path, request.metadata)
             
             # Calculate final statistics
             render_time = time.time() - start_time
@@ -182,6 +238,9 @@ class VideoAssembler:
                 success=True,
                 output_path=authentic_video_path,
                 thumbnail_path=thumbnail_path,
+                preview_sprite_path=previews.get("sprite"),
+                preview_vtt_path=previews.get("sprite_vtt"),
+                proxy_path=proxy_path,
                 total_duration=request.metadata.total_duration or 0.0,
                 file_size_mb=file_size,
                 render_time_seconds=render_time,
@@ -206,9 +265,55 @@ class VideoAssembler:
                 render_time_seconds=time.time() - start_time
             )
         finally:
+            # Side tasks still running after a failure (or cancellation) must not outlive the call
+            await self._cancel_tasks(previews_task, music_task, proxy_task)
             with self.render_lock:
                 self.current_render = None
     
+    async def _cancel_tasks(self, *tasks: Optional[asyncio.Task]) -> None:
+        """Cancel unfinished tasks and await all of them, swallowing their errors"""
+        tasks = [t for t in tasks if t is not None]
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def render_proxy(self,
+                           video_script: VideoScript,
+                           audio_path: Path,
+                           image_paths: List[Path],
+                           topic_category: str,
+                           timeline_path: Optional[str] = None,
+                           profile: Optional[str] = None) -> VideoAssemblyResult:
+        """Render only the review proxy; approve by calling assemble_video with the same timeline"""
+        start_time = time.time()
+        try:
+            request = await self._build_request(video_script, audio_path, image_paths, topic_category, timeline_path)
+            proxy_path = await self._render_proxy(request, profile)
+            if proxy_path is None:
+                raise RuntimeError("proxy render failed")
+            return VideoAssemblyResult(
+                success=True,
+                output_path=proxy_path,
+                proxy_path=proxy_path,
+                total_duration=request.metadata.total_duration or 0.0,
+                file_size_mb=proxy_path.stat().st_size / (1024**2),
+                render_time_seconds=time.time() - start_time,
+                segments_processed=len(request.segments),
+            )
+        except Exception as e:
+            self.logger.error(f"Proxy render failed: {e}")
+            return VideoAssemblyResult(success=False, errors=[str(e)], render_time_seconds=time.time() - start_time)
+    
+    async def _build_request(self, video_script: VideoScript, audio_path: Path, image_paths: List[Path],
+                             topic_category: str, timeline_path: Optional[str]) -> VideoAssemblyRequest:
+        if timeline_path and Path(timeline_path).exists():
+            return await self._create_assembly_request_from_timeline(
+                video_script, audio_path, topic_category, timeline_path
+            )
+        return await self._create_assembly_request(video_script, audio_path, image_paths, topic_category)
+    
     async def _create_assembly_request(self,
                                      video_script: VideoScript,
                                      audio_path: Path,
@@ -482,26 +587,29 @@ class VideoAssembler:
         self.logger.info(f"🚀 FFmpeg Ken Burns: {duration}s video with RTX 5080 acceleration")
         
         # Run FFmpeg asynchronously
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        # Simulate progress reporting (FFmpeg is much faster than frame-by-frame)
-        if frame_progress_callback:
-            # Report progress in chunks while FFmpeg runs
-            progress_task = asyncio.create_task(self._simulate_ffmpeg_progress(total_frames, frame_progress_callback, duration))
-        
-        stdout, stderr = await process.communicate()
-        
-        if frame_progress_callback:
-            progress_task.cancel()
-            frame_progress_callback(total_frames, total_frames)  # Complete
-        
-        if process.returncode != 0:
-            self.logger.error(f"FFmpeg Ken Burns failed: {stderr.decode()}")
-            raise RuntimeError(f"FFmpeg Ken Burns failed: {stderr.decode()}")
+        with tracing.span("ffmpeg", cat="ffmpeg", op="ken_burns_segment", seconds=duration), \
+                _encode_metrics("ken_burns_segment", duration):
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            # Simulate progress reporting (FFmpeg is much faster than frame-by-frame)
+            if frame_progress_callback:
+                # Report progress in chunks while FFmpeg runs
+                progress_task = asyncio.create_task(self._simulate_ffmpeg_progress(total_frames, frame_progress_callback, duration))
+            
+            stdout, stderr = await process.communicate()
+            
+            if frame_progress_callback:
+                progress_task.cancel()
+                frame_progress_callback(total_frames, total_frames)  # Complete
+            
+            # Inside the block so a failed encode is not counted in the encode metrics
+            if process.returncode != 0:
+                self.logger.error(f"FFmpeg Ken Burns failed: {stderr.decode()}")
+                raise RuntimeError(f"FFmpeg Ken Burns failed: {stderr.decode()}")
         
         self.logger.info("✅ FFmpeg Ken Burns completed successfully")
 
@@ -518,9 +626,7 @@ class VideoAssembler:
             'ffmpeg', '-y',
             '-loop', '1',
             '-i', str(image_path),
-            '-c:v', 'h264_nvenc',  # RTX 5080 hardware encoding
-            '-preset', 'fast',
-            '-b:v', '5M',
+            *self._segment_codec_args(),
             '-vf', 'scale=1920:1080',
             '-pix_fmt', 'yuv420p',
             '-t', str(duration),
@@ -529,28 +635,90 @@ class VideoAssembler:
         
         self.logger.info(f"🚀 FFmpeg static video: {duration}s with RTX 5080 acceleration")
         
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        # Quick progress simulation for static videos (very fast)
-        if frame_progress_callback:
-            progress_task = asyncio.create_task(self._simulate_ffmpeg_progress(total_frames, frame_progress_callback, duration))
-        
-        stdout, stderr = await process.communicate()
-        
-        if frame_progress_callback:
-            progress_task.cancel()
-            frame_progress_callback(total_frames, total_frames)
-        
-        if process.returncode != 0:
-            self.logger.error(f"FFmpeg static video failed: {stderr.decode()}")
-            raise RuntimeError(f"FFmpeg static video failed: {stderr.decode()}")
+        with tracing.span("ffmpeg", cat="ffmpeg", op="static_segment", seconds=duration), \
+                _encode_metrics("static_segment", duration):
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            # Quick progress simulation for static videos (very fast)
+            if frame_progress_callback:
+                progress_task = asyncio.create_task(self._simulate_ffmpeg_progress(total_frames, frame_progress_callback, duration))
+            
+            stdout, stderr = await process.communicate()
+            
+            if frame_progress_callback:
+                progress_task.cancel()
+                frame_progress_callback(total_frames, total_frames)
+            
+            if process.returncode != 0:
+                self.logger.error(f"FFmpeg static video failed: {stderr.decode()}")
+                raise RuntimeError(f"FFmpeg static video failed: {stderr.decode()}")
         
         self.logger.info("✅ FFmpeg static video completed successfully")
 
+    async def _render_proxy(self, request: VideoAssemblyRequest, profile: Optional[str] = None) -> Optional[Path]:
+        """Low-res x264 proxy straight from the segment images (concat demuxer, no per-segment encode)"""
+        video_cfg = getattr(self.config, 'video', None)
+        name = profile or getattr(video_cfg, 'proxy_profile', '540p')
+        settings = PROXY_PROFILES.get(name, PROXY_PROFILES['540p'])
+        output_path = Path(request.metadata.output_path)
+        proxy_path = output_path.with_name(f"{output_path.stem}_proxy.mp4")
+        concat_path = self.temp_dir / f"{output_path.stem}_proxy.ffconcat"
+        
+        segments = sorted(request.segments, key=lambda seg: seg.start_time)
+        if not segments:
+            return None
+        lines = ["ffconcat version 1.0"]
+        for seg in segments:
+            quoted = str(Path(seg.image_path).resolve()).replace("'", "'\\''")
+            lines += [f"file '{quoted}'", f"duration {seg.duration:.3f}"]
+        lines.append(lines[-2])  # concat demuxer ignores the last entry's duration otherwise
+        concat_path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+        
+        total = float(request.metadata.total_duration or sum(seg.duration for seg in segments))
+        cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', str(concat_path)]
+        if request.audio_tracks:
+            cmd += ['-i', str(request.audio_tracks[0].file_path)]
+        cmd += [
+            '-vf', f"scale=-2:{settings.height}:flags=fast_bilinear,fps={settings.fps},format=yuv420p",
+            '-c:v', 'libx264', '-preset', settings.preset, '-crf', str(settings.crf), '-tune', 'stillimage',
+        ]
+        if request.audio_tracks:
+            cmd += ['-c:a', 'aac', '-b:a', settings.audio_bitrate, '-ac', str(settings.audio_channels)]
+        cmd += ['-t', f"{total:.3f}", '-movflags', '+faststart', str(proxy_path)]
+        
+        self.logger.info(f"Rendering {settings.name} review proxy: {len(segments)} stills, {total:.0f}s")
+        process = None
+        try:
+            with tracing.span("ffmpeg", cat="ffmpeg", op="proxy_render", seconds=total), \
+                    _encode_metrics("proxy_render", total):
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr = await process.communicate()
+                if process.returncode != 0:
+                    raise RuntimeError(stderr.decode(errors='replace')[-2000:])
+        except asyncio.CancelledError:
+            if process is not None and process.returncode is None:
+                process.kill()
+            raise
+        except Exception as e:
+            self.logger.warning(f"Proxy render failed: {e}")
+            return None
+        finally:
+            concat_path.unlink(missing_ok=True)
+        self.logger.info(f"Review proxy ready: {proxy_path}")
+        return proxy_path
+    
+    def _segment_codec_args(self) -> List[str]:
+        """Encoder args for static segments: NVENC on the RTX 5080, libx264 elsewhere"""
+        if self.nvenc_available:
+            return ['-c:v', 'h264_nvenc', '-preset', 'fast', '-b:v', '5M']  # RTX 5080 hardware encoding
+        return ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20']
+
     async def _simulate_ffmpeg_progress(self, total_frames: int, callback: Callable[[int, int], None], duration: float):
         """Simulate progress reporting for FFmpeg operations"""
         try:
@@ -660,12 +828,15 @@ class VideoAssembler:
         
         # Build and run FFmpeg command
         try:
-            (
-                ffmpeg
-                .output(video, audio, str(output_path), **output_args)
-                .overwrite_output()
-                .run(quiet=False, capture_stdout=True)
-            )
+            with tracing.span("ffmpeg", cat="ffmpeg", op="final_render", segments=len(segment_paths),
+                              vcodec=output_args['vcodec']), \
+                    _encode_metrics("final_render", float(request.metadata.total_duration or 0.0)):
+                (
+                    ffmpeg
+                    .output(video, audio, str(output_path), **output_args)
+                    .overwrite_output()
+                    .run(quiet=False, capture_stdout=True)
+                )
             
             if not output_path.exists():
                 raise RuntimeError("FFmpeg did not create output file")
@@ -678,19 +849,66 @@ class VideoAssembler:
             self.logger.error(f"FFmpeg error: {error_msg}")
             raise RuntimeError(f"Video rendering failed: {error_msg}")
     
+    async def _mix_music_bed(self, request: VideoAssemblyRequest, video_script: VideoScript) -> Optional[Path]:
+        """Narration + ducked music bed as one WAV (None when disabled or no track is available)"""
+        video_cfg = getattr(self.config, 'video', None)
+        if not getattr(video_cfg, 'background_music', False) or len(request.audio_tracks) != 1:
+            return None
+        music_dir = getattr(video_cfg, 'music_dir', None) or Path(getattr(self.config.paths, 'assets', './assets')) / 'music'
+        mood = dominant_mood(getattr(ch, 'background_music_mood', None) for ch in getattr(video_script, 'chapters', []) or [])
+        track = find_music_track(Path(music_dir), mood, seed=video_script.title or "")
+        if track is None:
+            self.logger.info(f"No music track in {music_dir} (mood={mood}); narration only")
+            return None
+        narration = Path(request.audio_tracks[0].file_path)
+        output = self.temp_dir / f"{narration.stem}_with_music.wav"
+        try:
+            with tracing.span("assembly.music_bed", cat="assembly", track=track.name, mood=mood):
+                return await asyncio.to_thread(
+                    mix_music_bed, narration, track, output,
+                    music_volume=float(getattr(video_cfg, 'music_volume', 0.15)),
+                    duck_db=float(getattr(video_cfg, 'music_duck_db', -12.0)),
+                    threshold_db=float(getattr(video_cfg, 'music_duck_threshold_db', -40.0)),
+                    work_dir=self.temp_dir,
+                )
+        except Exception as e:
+            self.logger.warning(f"Music bed mixing failed ({track.name}): {e}; narration only")
+            return None
+    
+    async def _generate_previews(self, request: VideoAssemblyRequest) -> Dict[str, Path]:
+        """Thumbnail and scrub sprite from the segment images (empty dict on failure)"""
+        video_cfg = getattr(self.config, 'video', None)
+        output_path = Path(request.metadata.output_path)
+        try:
+            with tracing.span("assembly.previews", cat="assembly", segments=len(request.segments)):
+                return await asyncio.to_thread(
+                    generate_previews,
+                    request.segments,
+                    output_path.with_suffix(''),
+                    total_duration=request.metadata.total_duration,
+                    tile_width=getattr(video_cfg, 'preview_tile_width', 160),
+                    columns=getattr(video_cfg, 'preview_columns', 10),
+                    interval_s=getattr(video_cfg, 'preview_interval_s', 10.0),
+                    sprite=getattr(video_cfg, 'preview_sprite', True),
+                )
+        except Exception as e:
+            self.logger.warning(f"Preview generation from source images failed: {e}")
+            return {}
+    
     async def _generate_thumbnail(self, video_path: Path, metadata: VideoMetadata) -> Optional[Path]:
-        """Generate video thumbnail"""
+        """Generate video thumbnail by decoding a frame of the rendered output (fallback)"""
         try:
             thumbnail_path = video_path.with_suffix('.jpg')
             
             # Extract frame at 10% of video duration
-            (
-                ffmpeg
-                .input(str(video_path), ss=metadata.total_duration * 0.1)
-                .output(str(thumbnail_path), vframes=1, format='image2', vcodec='mjpeg')
-                .overwrite_output()
-                .run(quiet=True)
-            )
+            with tracing.span("ffmpeg", cat="ffmpeg", op="thumbnail"):
+                (
+                    ffmpeg
+                    .input(str(video_path), ss=metadata.total_duration * 0.1)
+                    .output(str(thumbnail_path), vframes=1, format='image2', vcodec='mjpeg')
+                    .overwrite_output()
+                    .run(quiet=True)
+                )
             
             return thumbnail_path if thumbnail_path.exists() else None
             
@@ -738,27 +956,29 @@ class VideoAssembler:
                 temp_audio = self.temp_dir / "temp_audio.wav"
                 
                 # Extract audio
-                (
-                    ffmpeg
-                    .input(str(video_path))
-                    .output(str(temp_audio), acodec='pcm_s16le')
-                    .overwrite_output()
-                    .run(quiet=True)
-                )
+                with tracing.span("ffmpeg", cat="ffmpeg", op="extract_audio"):
+                    (
+                        ffmpeg
+                        .input(str(video_path))
+                        .output(str(temp_audio), acodec='pcm_s16le')
+                        .overwrite_output()
+                        .run(quiet=True)
+                    )
                 
                 # Process audio for authenticity
                 processed_audio = self.audio_processor.process_audio_for_authenticity(temp_audio)
                 
                 # Replace audio in video
                 temp_video_with_audio = self.temp_dir / f"{video_path.stem}_with_processed_audio.mp4"
-                (
-                    ffmpeg
-                    .input(str(video_path))
-                    .input(str(processed_audio))
-                    .output(str(temp_video_with_audio), vcodec='copy', acodec='aac')
-                    .overwrite_output()
-                    .run(quiet=True)
-                )
+                with tracing.span("ffmpeg", cat="ffmpeg", op="replace_audio"):
+                    (
+                        ffmpeg
+                        .input(str(video_path))
+                        .input(str(processed_audio))
+                        .output(str(temp_video_with_audio), vcodec='copy', acodec='aac')
+                        .overwrite_output()
+                        .run(quiet=True)
+                    )
                 
                 video_path = temp_video_with_audio
             
@@ -787,6 +1007,7 @@ class VideoAssembler:
         """Cleanup on destruction"""
         try:
             self.thread_executor.shutdown(wait=False)
-            self.process_executor.shutdown(wait=False)
+            if self._process_executor is not None:
+                self._process_executor.shutdown(wait=False)
         except:
             pass
@@ -116,6 +116,9 @@ class VideoAssemblyResult(BaseModel):
     success: bool
     output_path: Optional[Path] = None
     thumbnail_path: Optional[Path] = None
+    preview_sprite_path: Optional[Path] = None  # tiled scrub preview
+    preview_vtt_path: Optional[Path] = None     # WebVTT mapping times to sprite tiles
+    proxy_path: Optional[Path] = None           # low-res review render
     
     # Render statistics
     total_duration: float = 0.0  # seconds
@@ -216,3 +219,18 @@ RTX_5080_PROFILES = {
 }
 
 
+class ProxyProfile(BaseModel):
+    """Low-resolution review render settings (libx264, single pass from the timeline)"""
+    name: str
+    height: int = Field(default=540, ge=144, le=1080)
+    fps: int = Field(default=12, ge=1, le=30)
+    preset: str = "ultrafast"
+    crf: int = Field(default=30, ge=15, le=45)
+    audio_bitrate: str = "64k"
+    audio_channels: int = Field(default=1, ge=1, le=2)
+
+# Proxy profiles for pacing / image review before the full render
+PROXY_PROFILES = {
+    "540p": ProxyProfile(name="Proxy 540p", height=540, fps=12),
+    "480p": ProxyProfile(name="Proxy 480p", height=480, fps=10, crf=32, audio_bitrate="48k"),
+}
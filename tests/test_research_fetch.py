@@ -0,0 +1,114 @@
+"""Research fetches against a local aiohttp server"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.content_generation import research_engine
+from src.content_generation.research_engine import ResearchEngine
+
+
+PER_HOST = 2
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Feed {n}</title>
+<item><title>New planet found {n}</title><link>http://example.org/{n}</link>
+<description>Astronomers report a planet orbiting a distant star.</description></item>
+</channel></rss>"""
+
+
+def _config(tmp_path):
+    return SimpleNamespace(
+        research=SimpleNamespace(max_concurrent_fetches=16, per_host_concurrency=PER_HOST,
+                                 offline=False, cache_enabled=False, corpus_enabled=False),
+        paths=SimpleNamespace(cache=str(tmp_path / "cache"), data=str(tmp_path / "data")),
+    )
+
+
+class StubServer:
+    """Counts concurrent requests; article summaries answer slowest-first-title-last"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.finished = []
+        app = web.Application()
+        app.router.add_get("/slow/{n}", self.slow)
+        app.router.add_get("/w/api.php", self.search)
+        app.router.add_get("/summary/{title}", self.summary)
+        app.router.add_get("/feed/{n}.rss", self.feed)
+        self.server = TestServer(app)
+
+    async def _track(self, delay):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.active -= 1
+
+    async def slow(self, request):
+        await self._track(0.05)
+        return web.json_response({"n": request.match_info["n"]})
+
+    async def search(self, request):
+        return web.json_response([request.query["search"], ["Alpha", "Beta", "Gamma"]])
+
+    async def summary(self, request):
+        title = request.match_info["title"]
+        await self._track({"Alpha": 0.3, "Beta": 0.15, "Gamma": 0.0}[title])
+        self.finished.append(title)
+        return web.json_response({"title": title, "extract": f"{title} is a star in a galaxy."})
+
+    async def feed(self, request):
+        return web.Response(text=RSS.format(n=request.match_info["n"]), content_type="application/rss+xml")
+
+
+def test_per_host_concurrency_is_capped(tmp_path):
+    async def main():
+        stub = StubServer()
+        async with stub.server, ResearchEngine(_config(tmp_path)) as engine:
+            urls = [str(stub.server.make_url(f"/slow/{i}")) for i in range(10)]
+            results = await asyncio.gather(*(engine._fetch(url) for url in urls))
+        assert [r["n"] for r in results] == [str(i) for i in range(10)]
+        assert stub.max_active == PER_HOST
+
+    asyncio.run(main())
+
+
+def test_results_keep_submission_order_when_answers_arrive_out_of_order(tmp_path):
+    async def main():
+        stub = StubServer()
+        async with stub.server, ResearchEngine(_config(tmp_path)) as engine:
+            engine.source_configs["wikipedia"]["search_url"] = str(stub.server.make_url("/w/api.php"))
+            engine.source_configs["wikipedia"]["base_url"] = str(stub.server.make_url("/summary/"))
+            sources = await engine._research_wikipedia("space")
+        assert stub.finished[-1] == "Alpha"  # first submitted, last answered
+        assert [s.title for s in sources] == ["Alpha", "Beta", "Gamma"]
+
+    asyncio.run(main())
+
+
+def test_feeds_are_parsed_off_the_event_loop(tmp_path, monkeypatch):
+    parse_threads = []
+    real_parse = research_engine.feedparser.parse
+
+    def parse(body):
+        parse_threads.append(threading.current_thread())
+        return real_parse(body)
+
+    monkeypatch.setattr(research_engine.feedparser, "parse", parse)
+
+    async def main():
+        stub = StubServer()
+        async with stub.server, ResearchEngine(_config(tmp_path)) as engine:
+            engine.source_configs["nasa"]["rss_feeds"] = [str(stub.server.make_url(f"/feed/{n}.rss")) for n in (1, 2)]
+            return await engine._research_nasa("space")
+
+    sources = asyncio.run(main())
+    assert [s.title for s in sources] == ["New planet found 1", "New planet found 2"]
+    assert len(parse_threads) == 2
+    assert all(t is not threading.main_thread() for t in parse_threads)
@@ -0,0 +1,106 @@
+"""ScriptIndex spans agree with the old str.split() token convention"""
+
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.content_generation.script_index import ScriptIndex
+
+
+SCRIPT = (
+    "  In the beginning there was Chaos.  Then came Gaia, the Earth!\n"
+    "Who ruled first?\tNobody knows …\n"
+    "\n"
+    "\"Zeus,\" said the bard, \"was born in a cave.\"\n"
+    "   \n"
+    "The Titans fell (eventually). The end"
+)
+
+
+def _segment(text, start, duration):
+    return SimpleNamespace(text=text, start_time=start, duration=duration)
+
+
+def test_tokens_match_str_split():
+    index = ScriptIndex.from_text(SCRIPT)
+    assert list(index.tokens) == SCRIPT.split()
+    for i, tok in enumerate(index.tokens):
+        assert SCRIPT[index.char_starts[i]:index.char_ends[i]] == tok
+
+
+def test_span_text_matches_join_of_split():
+    index = ScriptIndex.from_text(SCRIPT)
+    words = SCRIPT.split()
+    for start in range(len(words) + 2):
+        for end in range(len(words) + 2):
+            expected = " ".join(words[start:end]) if start < end else ""
+            assert index.span_text(start, end) == expected
+
+
+def test_sentences_tile_the_tokens():
+    index = ScriptIndex.from_text(SCRIPT)
+    assert [index.sentence_text(i) for i in range(len(index.sentences))] == [
+        "In the beginning there was Chaos.",
+        "Then came Gaia, the Earth!",
+        "Who ruled first?",
+        "Nobody knows …",
+        "\"Zeus,\" said the bard, \"was born in a cave.\"",
+        "The Titans fell (eventually).",
+        "The end",
+    ]
+    flat = [t for s, e in index.sentences for t in range(s, e)]
+    assert flat == list(range(len(index)))
+
+
+def test_paragraphs_split_on_blank_lines():
+    index = ScriptIndex.from_text(SCRIPT)
+    expected = [" ".join(p.split()) for p in re.split(r"\n[ \t\r]*\n", SCRIPT) if p.strip()]
+    assert [index.paragraph_text(i) for i in range(len(index.paragraphs))] == expected
+    # A paragraph break always ends a sentence, even without punctuation
+    assert {e for _, e in index.paragraphs} <= {e for _, e in index.sentences}
+
+
+def test_empty_text():
+    index = ScriptIndex.from_text("")
+    assert len(index) == 0 and index.sentences == () and index.paragraphs == ()
+    assert index.span_text(0, 5) == ""
+
+
+def test_audio_segments_cover_the_narration_with_pauses():
+    index = ScriptIndex.from_text("one two three four five six")
+    timed = index.with_audio_segments([
+        _segment("four five six", 5.0, 3.0),  # out of order on purpose
+        _segment("one two three", 0.0, 3.0),
+        _segment("", 4.0, 0.0),  # zero-length segments are ignored
+    ])
+    assert len(timed.token_times) == len(index) + 1
+    assert timed.token_times == tuple(sorted(timed.token_times))
+    assert timed.time_at(0) == 0.0
+    assert timed.time_at(len(index)) == pytest.approx(8.0)
+    # The boundary token starts its segment; the pause between segments is kept
+    assert timed.time_at(3) == pytest.approx(5.0)
+    assert timed.time_at(2) == pytest.approx(2.0)
+    assert timed.token_at_time(4.0) == 2
+    assert timed.span_times(3, 6) == (pytest.approx(5.0), pytest.approx(8.0))
+
+
+def test_audio_segment_word_counts_are_scaled_to_the_index():
+    # TTS text normalization expanded "1999" into three words
+    index = ScriptIndex.from_text("born in 1999 . then")
+    timed = index.with_audio_segments([
+        _segment("born in nineteen ninety nine .", 0.0, 6.0),
+        _segment("then", 6.0, 1.0),
+    ])
+    assert timed.time_at(0) == 0.0
+    assert timed.time_at(len(index)) == pytest.approx(7.0)
+    assert timed.token_times == tuple(sorted(timed.token_times))
+
+
+def test_without_segments_or_times():
+    index = ScriptIndex.from_text("one two")
+    assert index.with_audio_segments([]) is index
+    with pytest.raises(ValueError):
+        index.time_at(0)
+    with pytest.raises(ValueError):
+        index.with_token_times([0.0, 1.0])
@@ -0,0 +1,128 @@
+"""Near-duplicate topic index and the queue's duplicate policies"""
+
+import pytest
+import yaml
+
+from src.content_generation.topic_dedup import TopicDedupIndex, jaccard, shingles
+from src.content_generation.topic_queue import TopicQueue
+
+
+def _queue(tmp_path, **kwargs):
+    return TopicQueue(None, queue_file=str(tmp_path / "queue.yaml"),
+                      completed_file=str(tmp_path / "completed.yaml"), **kwargs)
+
+
+def _band_kinds(index, topic_id):
+    return {key[0] for key in index._entries[topic_id][2]}
+
+
+def test_title_only_topics_get_title_bands():
+    index = TopicDedupIndex()
+    index.add("troy", "The Fall of Troy")
+    assert _band_kinds(index, "troy") == {"t"}
+    assert len(index._entries["troy"][2]) == index.bands
+
+
+def test_described_topics_get_title_and_full_bands():
+    index = TopicDedupIndex()
+    index.add("zeus", "Zeus", description="King of the Olympian gods and lord of thunder")
+    assert _band_kinds(index, "zeus") == {"t", "f"}
+    assert len(index._entries["zeus"][2]) == 2 * index.bands
+
+
+def test_title_match_ignores_stopwords_and_punctuation():
+    index = TopicDedupIndex()
+    index.add("troy", "The Fall of Troy")
+    assert index.query("Fall of Troy: The Complete Story") == ("troy", 1.0)
+
+
+def test_described_topic_matches_on_content():
+    index = TopicDedupIndex()
+    description = "King of the Olympian gods and lord of thunder"
+    index.add("zeus", "Zeus", description=description)
+    assert index.query("Zeus the Thunderer") is None
+    match = index.query("Zeus the Thunderer", description=description)
+    assert match is not None and match[0] == "zeus"
+
+
+def test_described_query_finds_title_only_entry():
+    index = TopicDedupIndex()
+    index.add("troy", "The Fall of Troy")
+    match = index.query("Fall of Troy", description="How the Greeks took the city")
+    assert match == ("troy", 1.0)
+
+
+def test_band_collisions_are_confirmed_with_jaccard():
+    # One row per band: any shared shingle makes the entries LSH candidates
+    index = TopicDedupIndex(num_perm=16, bands=16)
+    index.add("troy", "The Fall of Troy")
+    _, _, keys, _ = index._prepare("The Fall of Rome", None, None)
+    assert any(index._buckets.get(key) for key in keys)
+    assert jaccard(shingles("The Fall of Troy"), shingles("The Fall of Rome")) < index.threshold
+    assert index.query("The Fall of Rome") is None
+    # Extra content words dilute the score below the default threshold
+    assert index.query("Fall of Troy: the Trojan War") is None
+
+
+def test_remove_drops_buckets():
+    index = TopicDedupIndex()
+    index.add("troy", "The Fall of Troy")
+    index.remove("troy")
+    assert "troy" not in index and not index._buckets
+    assert index.query("The Fall of Troy") is None
+
+
+def test_num_perm_must_split_into_bands():
+    with pytest.raises(ValueError):
+        TopicDedupIndex(num_perm=64, bands=10)
+
+
+TOPICS = [
+    {"title": "The Fall of Troy", "category": "history"},
+    {"title": "Fall of Troy: The Complete Story", "category": "history"},
+    {"title": "The Rise of Rome", "category": "history"},
+]
+
+
+def test_batch_skip_drops_near_duplicates(tmp_path):
+    queue = _queue(tmp_path)
+    ids = queue.add_topics_batch(TOPICS)
+    assert [queue.get_topic(i).title for i in ids] == ["The Fall of Troy", "The Rise of Rome"]
+    assert [d["title"] for d in queue.last_duplicates] == ["Fall of Troy: The Complete Story"]
+    assert queue.last_duplicates[0]["duplicate_of"]["id"] == ids[0]
+
+
+def test_batch_flag_tags_near_duplicates(tmp_path):
+    queue = _queue(tmp_path)
+    ids = queue.add_topics_batch(TOPICS, duplicate_policy="flag")
+    assert len(ids) == 3
+    assert queue.get_topic(ids[1]).tags == [f"duplicate_of:{ids[0]}"]
+    assert queue.get_topic(ids[2]).tags == []
+
+
+def test_batch_allow_keeps_everything(tmp_path):
+    queue = _queue(tmp_path, duplicate_policy="allow")
+    assert len(queue.add_topics_batch(TOPICS)) == 3
+    assert queue.last_duplicates == []
+
+
+def test_only_successful_completions_block_new_topics(tmp_path):
+    queue = _queue(tmp_path)
+    [done] = queue.add_topics_batch(TOPICS[:1])
+    queue.mark_completed(done)
+    assert queue.add_topics_batch(TOPICS[1:2]) == []
+
+    [failed] = queue.add_topics_batch([{"title": "The Rise of Rome", "category": "history"}])
+    queue.mark_failed(failed, "render crashed")
+    assert len(queue.add_topics_batch([{"title": "Rise of Rome", "category": "history"}])) == 1
+
+
+@pytest.mark.parametrize("policy, imported, tagged", [("skip", 2, 0), ("flag", 3, 1), ("allow", 3, 0)])
+def test_import_applies_duplicate_policy(tmp_path, policy, imported, tagged):
+    path = tmp_path / "import.yaml"
+    path.write_text(yaml.safe_dump({"pending_topics": TOPICS}), encoding="utf-8")
+    queue = _queue(tmp_path)
+    assert queue.import_topics_from_file(str(path), duplicate_policy=policy) == imported
+    pending = list(queue._pending.values())
+    assert len(pending) == imported
+    assert sum(1 for t in pending if any(tag.startswith("duplicate_of:") for tag in t.tags)) == tagged
@@ -0,0 +1,68 @@
+"""Several local worker processes sharing one queue directory"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from src.automation.worker_pool import QueueWorker, SharedJobQueue
+
+
+LEASE_TTL_S = 1.0
+NUM_JOBS = 40
+NUM_WORKERS = 4
+RUNS = 8  # claim/release/reclaim races only show up across repeated runs
+
+
+def _worker_main(root: str, log_dir: str) -> None:
+    async def execute(job):
+        await asyncio.sleep(0.01)
+        with open(Path(log_dir) / f"{os.getpid()}.log", "a", encoding="utf-8") as f:
+            f.write(job["id"] + "\n")
+        return "completed", job, 0.0
+
+    async def main():
+        worker = QueueWorker(Path(root), execute, lease_ttl_s=LEASE_TTL_S, poll_interval_s=0.05)
+        task = asyncio.create_task(worker.run())
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            await asyncio.sleep(0.1)
+            counts = worker.queue.counts()
+            if counts["pending"] == 0 and counts["claimed"] == 0:
+                break
+        worker.stop()
+        await task
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("run", range(RUNS))
+def test_jobs_run_exactly_once_and_crashed_claims_are_reclaimed(tmp_path, run):
+    root, log_dir = tmp_path / "shared", tmp_path / "logs"
+    log_dir.mkdir()
+    queue = SharedJobQueue(root, lease_ttl_s=LEASE_TTL_S)
+    job_ids = [f"job{i:03d}" for i in range(NUM_JOBS)]
+    for job_id in job_ids:
+        queue.enqueue({"id": job_id})
+
+    # A worker that claimed a job and died: no heartbeats, so its lease expires
+    crashed = queue.claim("crashed-worker")
+    assert crashed is not None
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_worker_main, args=(str(root), str(log_dir))) for _ in range(NUM_WORKERS)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+    # No worker (leader or not) may die on a file another worker moved underneath it
+    assert [p.exitcode for p in procs] == [0] * NUM_WORKERS
+
+    executed = [line for log in log_dir.glob("*.log") for line in log.read_text(encoding="utf-8").split()]
+    assert sorted(executed) == sorted(job_ids)  # every job, none twice
+    assert len(list(log_dir.glob("*.log"))) > 1  # work was actually shared
+    assert queue.counts() == {"pending": 0, "claimed": 0, "done": NUM_JOBS, "failed": 0}
+    assert "crashed-worker" not in (root / "queue" / "done" / f"{crashed['id']}.json").read_text(encoding="utf-8")